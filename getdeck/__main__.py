@@ -9,6 +9,7 @@ os.environ["PYOXIDIZER"] = "1"
 logger = logging.getLogger("deck")
 
 ARGUMENT_DECKFILE_HELP = "the deck.yaml location (as file, git or https)"
+ARGUMENT_OFFLINE_HELP = "only use the local caches, fail if anything is missing in them"
 
 
 def check_positive(value):
@@ -33,6 +34,16 @@ list_parser = action.add_parser("list")
 list_parser.add_argument(
     "Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default="."
 )
+list_parser.add_argument(
+    "--offline", help=ARGUMENT_OFFLINE_HELP, action="store_true", required=False
+)
+list_parser.add_argument(
+    "-r",
+    "--recursive",
+    help="list the decks of all Deckfiles in this folder and its subfolders, except for the ones in .gitignore",
+    action="store_true",
+    required=False,
+)
 
 # get
 get_parser = action.add_parser("get")
@@ -69,6 +80,9 @@ get_parser.add_argument(
     required=False,
 )
 get_parser.add_argument("Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default=".")
+get_parser.add_argument(
+    "--offline", help=ARGUMENT_OFFLINE_HELP, action="store_true", required=False
+)
 
 # remove
 remove_parser = action.add_parser("remove")
@@ -92,6 +106,9 @@ remove_parser.add_argument(
 remove_parser.add_argument(
     "Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default="."
 )
+remove_parser.add_argument(
+    "--offline", help=ARGUMENT_OFFLINE_HELP, action="store_true", required=False
+)
 
 # stop
 stop_parser = action.add_parser("stop")
@@ -105,6 +122,72 @@ stop_parser.add_argument(
 stop_parser.add_argument(
     "Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default="."
 )
+stop_parser.add_argument(
+    "--offline", help=ARGUMENT_OFFLINE_HELP, action="store_true", required=False
+)
+
+# fetch
+fetch_parser = action.add_parser("fetch")
+fetch_parser.add_argument(
+    "--name", help="the Deck whose sources will be fetched", required=False
+)
+fetch_parser.add_argument(
+    "--all-decks",
+    help="Fetch the sources of all Decks in the Deckfile",
+    action="store_true",
+    required=False,
+)
+fetch_parser.add_argument(
+    "Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default="."
+)
+
+# lock
+lock_parser = action.add_parser("lock")
+lock_parser.add_argument(
+    "Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default="."
+)
+
+# validate
+validate_parser = action.add_parser("validate")
+validate_parser.add_argument(
+    "--name", help="the Deck that you want to validate (default: all)", required=False
+)
+validate_parser.add_argument(
+    "Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default="."
+)
+validate_parser.add_argument(
+    "--offline", help=ARGUMENT_OFFLINE_HELP, action="store_true", required=False
+)
+validate_parser.add_argument(
+    "--all",
+    help="validate all Deckfiles in this folder and its subfolders, except for the ones in .gitignore",
+    action="store_true",
+    required=False,
+)
+validate_parser.add_argument(
+    "--workers",
+    help="--all: the number of Deckfiles which are validated in parallel (default: number of CPUs)",
+    type=int,
+    required=False,
+)
+validate_parser.add_argument(
+    "--report", help="write the results as JSON to this file", required=False
+)
+
+# cache
+cache_parser = action.add_parser("cache")
+cache_parser.add_argument("cache_action", help="ls/prune/stats")
+cache_parser.add_argument(
+    "--max-size",
+    help="prune: evict least recently used entries down to this size, e.g. 500M (default: DECK_CACHE_MAX_SIZE or 10G)",
+    required=False,
+)
+cache_parser.add_argument(
+    "--all",
+    help="prune: evict all entries which are not in use",
+    action="store_true",
+    required=False,
+)
 
 # version
 version_parser = action.add_parser("version")
@@ -115,6 +198,9 @@ hosts_parser.add_argument("host_action", help="list/write/remove")
 hosts_parser.add_argument(
     "Deckfile", help=ARGUMENT_DECKFILE_HELP, nargs="?", default="."
 )
+hosts_parser.add_argument(
+    "--offline", help=ARGUMENT_OFFLINE_HELP, action="store_true", required=False
+)
 hosts_parser.add_argument(
     "--name", help="The Deck whose hosts will be considered", required=False
 )
@@ -126,13 +212,17 @@ telemetry_parser.add_argument("--on", help="Turn on telemetry", action="store_tr
 
 
 def main():
+    from getdeck.cli.cache import cache_command
     from getdeck.cli.console import console_setup
+    from getdeck.cli.fetch import fetch_command
     from getdeck.cli.get import get_command
     from getdeck.cli.hosts import hosts_command
     from getdeck.cli.list import list_command
+    from getdeck.cli.lock import lock_command
     from getdeck.cli.remove import remove_command
     from getdeck.cli.stop import stop_command
     from getdeck.cli.telemetry import telemetry_command
+    from getdeck.cli.validate import validate_command
     from getdeck.cli.version import version_command
 
     args = parser.parse_args()
@@ -146,6 +236,10 @@ def main():
             "get": get_command,
             "remove": remove_command,
             "stop": stop_command,
+            "fetch": fetch_command,
+            "lock": lock_command,
+            "validate": validate_command,
+            "cache": cache_command,
             "version": version_command,
             "hosts": hosts_command,
             "telemetry": telemetry_command,
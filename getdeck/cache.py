@@ -0,0 +1,377 @@
+import atexit
+import contextlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, IO, Iterator, List, NamedTuple, Optional
+
+from getdeck import configuration
+
+logger = logging.getLogger("deck")
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(size: str) -> int:
+    """
+    :return: the number of bytes of a size like 500M or 10G
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMGT]?)i?B?\s*", str(size), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size {size}")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+
+
+def format_size(size: int) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def _lock_file(file: IO, blocking: bool) -> bool:
+    try:
+        if sys.platform == "win32":
+            file.seek(0)
+            msvcrt.locking(
+                file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1
+            )
+        else:
+            fcntl.flock(file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except OSError:
+        if blocking:
+            raise
+        return False
+    return True
+
+
+def _unlock_file(file: IO) -> None:
+    if sys.platform == "win32":
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """
+    A lock shared by the threads of this process and by other processes, re-entrant within a thread
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._lock.acquire(blocking=blocking):
+            return False
+        if self._depth == 0:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            lock_file = open(self.path, "a+b")
+            if not _lock_file(lock_file, blocking):
+                lock_file.close()
+                self._lock.release()
+                return False
+            self._file = lock_file
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            _unlock_file(self._file)
+            self._file.close()
+            self._file = None
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+_locks: Dict[str, FileLock] = {}
+_locks_lock = threading.Lock()
+
+
+def get_lock(name: str) -> FileLock:
+    """
+    :return: the lock called name of the cache directory
+    """
+    path = os.path.join(configuration.CACHE_DIRECTORY, ".locks", f"{name}.lock")
+    with _locks_lock:
+        return _locks.setdefault(path, FileLock(path))
+
+
+@contextlib.contextmanager
+def atomic_write(path: str, mode: str = "wb", **kwargs) -> Iterator[IO]:
+    """
+    write to a temporary file next to path, which replaces path once it is written completely
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_file = tempfile.NamedTemporaryFile(
+        mode, dir=os.path.dirname(path), prefix=".tmp-", delete=False, **kwargs
+    )
+    try:
+        with temporary_file:
+            yield temporary_file
+        os.replace(temporary_file.name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_file.name)
+        raise
+
+
+class CacheEntry(NamedTuple):
+    cache: str
+    name: str
+    path: str
+    size: int
+    last_used: float
+
+
+def _get_size(path: str) -> int:
+    if not os.path.isdir(path) or os.path.islink(path):
+        return os.lstat(path).st_size
+    size = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            with contextlib.suppress(OSError):
+                size += os.lstat(os.path.join(root, file_name)).st_size
+    return size
+
+
+_statistics: Dict[str, Dict[str, int]] = {}
+_statistics_lock = threading.Lock()
+
+
+class Cache:
+    """
+    A part of the cache directory shared by all runs, its entries are the files or folders in
+    entries, which are evicted least recently used first
+    """
+
+    def __init__(self, name: str, entries: str = ""):
+        self.name = name
+        self.entries = entries
+
+    @property
+    def directory(self) -> str:
+        directory = os.path.join(configuration.CACHE_DIRECTORY, self.name)
+        os.makedirs(os.path.join(directory, self.entries), exist_ok=True)
+        return directory
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory, self.entries, name)
+
+    def lock(self, name: str) -> FileLock:
+        """
+        :return: the lock of the entry name, it is held while the entry is written or evicted
+        """
+        return get_lock(f"{self.name}-{name}")
+
+    def touch(self, path: str) -> None:
+        """
+        mark the entry at path as used
+        """
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+    def _count(self, key: str) -> None:
+        with _statistics_lock:
+            statistics = _statistics.setdefault(self.name, {"hits": 0, "misses": 0})
+            statistics[key] += 1
+
+    def hit(self, path: str = None) -> None:
+        self._count("hits")
+        if path:
+            self.touch(path)
+
+    def miss(self) -> None:
+        self._count("misses")
+
+    def get_entries(self) -> List[CacheEntry]:
+        entries = []
+        folder = os.path.join(self.directory, self.entries)
+        for entry in os.scandir(folder):
+            # temporary files and folders are not entries yet
+            if entry.name.startswith("."):
+                continue
+            try:
+                size = _get_size(entry.path)
+                last_used = entry.stat(follow_symlinks=False).st_mtime
+            except OSError:
+                continue
+            entries.append(
+                CacheEntry(self.name, entry.name, entry.path, size, last_used)
+            )
+        return entries
+
+    def evict(self, entry: CacheEntry) -> bool:
+        """
+        remove entry, unless it is locked by a run right now
+
+        :return: True if the entry has been removed
+        """
+        lock = self.lock(entry.name)
+        if not lock.acquire(blocking=False):
+            return False
+        try:
+            if os.path.isdir(entry.path) and not os.path.islink(entry.path):
+                shutil.rmtree(entry.path)
+            elif os.path.exists(entry.path):
+                os.remove(entry.path)
+        finally:
+            lock.release()
+        logger.debug(f"Evicted {entry.cache}/{entry.name} from the cache")
+        return True
+
+
+git = Cache("git")
+http = Cache("http", entries="blobs")
+oci = Cache("oci", entries="blobs")
+charts = Cache("charts")
+deckfiles = Cache("deckfiles")
+discovery = Cache("discovery")
+renders = Cache("renders")
+
+caches = [git, http, oci, charts, deckfiles, discovery, renders]
+
+
+def get_max_size() -> int:
+    return parse_size(configuration.CACHE_MAX_SIZE)
+
+
+def get_entries() -> List[CacheEntry]:
+    """
+    :return: the entries of all caches, least recently used first
+    """
+    entries = [entry for cache in caches for entry in cache.get_entries()]
+    return sorted(entries, key=lambda entry: entry.last_used)
+
+
+def prune(
+    max_size: Optional[int] = None,
+    grace_period: int = configuration.CACHE_GRACE_PERIOD,
+) -> List[CacheEntry]:
+    """
+    evict the least recently used entries until the cache is not larger than max_size, entries
+    used within grace_period seconds may be in use by a run and are kept
+
+    :return: the evicted entries
+    """
+    max_size = get_max_size() if max_size is None else max_size
+    entries = get_entries()
+    size = sum(entry.size for entry in entries)
+    by_name = {cache.name: cache for cache in caches}
+
+    evicted = []
+    now = time.time()
+    for entry in entries:
+        if size <= max_size:
+            break
+        if now - entry.last_used < grace_period:
+            continue
+        if by_name[entry.cache].evict(entry):
+            size -= entry.size
+            evicted.append(entry)
+    return evicted
+
+
+def _get_pruned_path() -> str:
+    return os.path.join(configuration.CACHE_DIRECTORY, ".pruned")
+
+
+def prune_periodically(
+    interval: int = configuration.CACHE_PRUNE_INTERVAL,
+) -> List[CacheEntry]:
+    """
+    prune the cache unless it has been pruned within interval seconds, pruning reads the size
+    of all entries
+
+    :return: the evicted entries
+    """
+    path = _get_pruned_path()
+    with contextlib.suppress(FileNotFoundError):
+        if time.time() - os.stat(path).st_mtime < interval:
+            return []
+
+    lock = get_lock("prune")
+    # another run is pruning the cache right now
+    if not lock.acquire(blocking=False):
+        return []
+    try:
+        evicted = prune()
+        with open(path, "a"):
+            pass
+        os.utime(path)
+    finally:
+        lock.release()
+    return evicted
+
+
+def _get_statistics_path() -> str:
+    return os.path.join(configuration.CACHE_DIRECTORY, "statistics.json")
+
+
+def read_statistics() -> Dict[str, Dict[str, int]]:
+    """
+    :return: the hits and misses of each cache of all runs
+    """
+    try:
+        with open(_get_statistics_path(), "r") as statistics_file:
+            return json.load(statistics_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_statistics() -> None:
+    """
+    add the hits and misses of this process to the statistics of all runs
+    """
+    with _statistics_lock:
+        counts = {name: dict(statistics) for name, statistics in _statistics.items()}
+        _statistics.clear()
+    if not counts:
+        return
+
+    with get_lock("statistics"):
+        statistics = read_statistics()
+        for name, count in counts.items():
+            totals = statistics.setdefault(name, {"hits": 0, "misses": 0})
+            for key, value in count.items():
+                totals[key] = totals.get(key, 0) + value
+        with atomic_write(_get_statistics_path(), "w") as statistics_file:
+            json.dump(statistics, statistics_file)
+
+
+def _save_statistics_at_exit() -> None:
+    try:
+        save_statistics()
+    except Exception as e:
+        logger.debug(f"Cannot save the cache statistics: {e}")
+
+
+def reset_statistics() -> None:
+    with get_lock("statistics"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(_get_statistics_path())
+
+
+atexit.register(_save_statistics_at_exit)
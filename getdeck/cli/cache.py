@@ -0,0 +1,57 @@
+import datetime
+import logging
+
+from getdeck import cache
+
+logger = logging.getLogger("deck")
+
+
+def list_entries():
+    entries = cache.get_entries()
+    for entry in entries:
+        last_used = datetime.datetime.fromtimestamp(entry.last_used)
+        logger.info(
+            f"{entry.cache:<8} {entry.name[:16]:<16} {cache.format_size(entry.size):>10} "
+            f"{last_used:%Y-%m-%d %H:%M}"
+        )
+    total = sum(entry.size for entry in entries)
+    logger.info(f"{len(entries)} entries, {cache.format_size(total)}")
+
+
+def prune_entries(max_size: str = None, all_entries: bool = False):
+    if all_entries:
+        evicted = cache.prune(max_size=0, grace_period=0)
+    else:
+        evicted = cache.prune(max_size=cache.parse_size(max_size) if max_size else None)
+    total = sum(entry.size for entry in evicted)
+    logger.info(f"Evicted {len(evicted)} entries, {cache.format_size(total)}")
+
+
+def show_statistics():
+    cache.save_statistics()
+    statistics = cache.read_statistics()
+    entries = cache.get_entries()
+    for name in [c.name for c in cache.caches]:
+        sizes = [entry.size for entry in entries if entry.cache == name]
+        hits = statistics.get(name, {}).get("hits", 0)
+        misses = statistics.get(name, {}).get("misses", 0)
+        ratio = f"{hits / (hits + misses):.0%}" if hits + misses else "-"
+        logger.info(
+            f"{name:<8} {len(sizes):>6} entries {cache.format_size(sum(sizes)):>10}  "
+            f"hits {hits:>6}  misses {misses:>6}  hit ratio {ratio:>4}"
+        )
+    total = sum(entry.size for entry in entries)
+    logger.info(
+        f"{cache.format_size(total)} of {cache.format_size(cache.get_max_size())} used"
+    )
+
+
+def cache_command(args):
+    if args.cache_action == "ls":
+        list_entries()
+    elif args.cache_action == "prune":
+        prune_entries(max_size=args.max_size, all_entries=args.all)
+    elif args.cache_action == "stats":
+        show_statistics()
+    else:
+        logger.error(f"Unknown cache action '{args.cache_action}'")
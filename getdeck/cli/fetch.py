@@ -0,0 +1,44 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from getdeck.cli.utils import stopwatch
+from getdeck.configuration import default_configuration
+from getdeck.fetch.fetch import fetch_data
+
+logger = logging.getLogger("deck")
+
+
+def _prepare_tooler(config) -> bool:
+    from getdeck.sources import tooler
+
+    try:
+        tooler.prepare_image(config)
+    except Exception as e:
+        # the sources are fetched anyway, e.g. while building images without docker
+        logger.warning(f"Cannot prepare the Tooler image: {e}")
+        return False
+    return True
+
+
+@stopwatch
+def run_fetch(
+    deckfile_location: str,
+    deck_name: str = None,
+    all_decks: bool = False,
+    config=default_configuration,
+) -> bool:
+    """
+    fetch the Deckfile and the sources of a deck, or of all decks, into the local caches and
+    prepare the Tooler image, without touching any cluster
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        tooler_prepared = executor.submit(_prepare_tooler, config)
+        with fetch_data(
+            deckfile_location, deck_name=deck_name, all_decks=all_decks
+        ) as data_aux:
+            logger.info(f"Fetched {len(data_aux.source_auxs)} source(s)")
+        return tooler_prepared.result()
+
+
+def fetch_command(args):
+    run_fetch(args.Deckfile, args.name, all_decks=args.all_decks)
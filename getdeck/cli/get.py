@@ -19,6 +19,7 @@ def run_deck(  # noqa: C901
     timeout: int = 120,
     no_input: bool = False,
     progress_callback: Callable = None,
+    offline: bool = False,
 ) -> bool:
     from getdeck.sources.utils import prepare_k8s_workload_for_deck
     from getdeck.k8s import k8s_create_or_patch, get_ingress_rules
@@ -27,115 +28,123 @@ def run_deck(  # noqa: C901
     if progress_callback:
         progress_callback(0)
 
-    data_aux = fetch_data(deckfile_location, deck_name=deck_name)
-    cluster_config = data_aux.deckfile.get_cluster()
+    with fetch_data(
+        deckfile_location, deck_name=deck_name, offline=offline
+    ) as data_aux:
+        cluster_config = data_aux.deckfile.get_cluster()
 
-    if progress_callback:
-        progress_callback(5)
-
-    # 1. set up a local K8s cluster
-    provider_type, name, native_config = get_cluster_initialize_arguments(
-        cluster_config=cluster_config, ignore_cluster=ignore_cluster, no_input=no_input
-    )
-
-    cluster = api.cluster.initialize(
-        provider_type=provider_type,
-        name=name,
-        native_config=native_config,
-        config=default_configuration,
-    )
+        if progress_callback:
+            progress_callback(5)
 
-    install_provider(cluster, cluster_config, do_install=True, no_input=no_input)
-
-    if progress_callback:
-        progress_callback(10)
-
-    #  1.b check or set up local cluster
-    cluster_created = cluster.start_or_create()
+        # 1. set up a local K8s cluster
+        provider_type, name, native_config = get_cluster_initialize_arguments(
+            cluster_config=cluster_config,
+            ignore_cluster=ignore_cluster,
+            no_input=no_input,
+        )
 
-    if progress_callback:
-        progress_callback(20)
-
-    # # change kubeconfig for beiboot
-    # if cluster.kubernetes_cluster_type == ProviderType.BEIBOOT:
-    #     _old_kubeconfig = config.kubeconfig
-    #     config.kubeconfig = cluster.get_kubeconfig()
-    #     config._init_kubeapi(context="default")
-
-    #
-    # 2. generate the Deck's workload
-    #
-    try:
-        generated_deck = prepare_k8s_workload_for_deck(
-            cluster.get_config(), data_aux, deck_name
+        cluster = api.cluster.initialize(
+            provider_type=provider_type,
+            name=name,
+            native_config=native_config,
+            config=default_configuration,
         )
-    except Exception as e:
-        if cluster_created:
-            # remove this just created cluster as it probably is in an inconsistent state from the beginning
-            # if cluster.kubernetes_cluster_type == ProviderType.BEIBOOT:
-            #     config.kubeconfig = _old_kubeconfig
-            #     config._init_kubeapi()
-            remove.remove_cluster(deckfile_location, cluster.get_config())
-        raise e
 
-    if progress_callback:
-        progress_callback(30)
+        install_provider(cluster, cluster_config, do_install=True, no_input=no_input)
 
-    # 3. send the manifests to this cluster
-    logger.info(f"Applying Deck {generated_deck.name}")
-    logger.info("Installing the workload to the cluster")
+        if progress_callback:
+            progress_callback(10)
 
-    if generated_deck.namespace != "default":
-        cluster.create_namespace(generated_deck.namespace)
+        #  1.b check or set up local cluster
+        cluster_created = cluster.start_or_create()
 
-    if progress_callback:
-        progress_callback(50)
+        if progress_callback:
+            progress_callback(20)
+
+        # # change kubeconfig for beiboot
+        # if cluster.kubernetes_cluster_type == ProviderType.BEIBOOT:
+        #     _old_kubeconfig = config.kubeconfig
+        #     config.kubeconfig = cluster.get_kubeconfig()
+        #     config._init_kubeapi(context="default")
 
-    total = len(generated_deck.files)
-    logger.info(f"Installing {total} files(s)")
-    _available_namespace = [generated_deck, "default"]
-    for i, file in enumerate(generated_deck.files):
+        #
+        # 2. generate the Deck's workload
+        #
         try:
-            logger.debug(file.name)
-            logger.debug(file.content)
-            logger.debug(file.namespace)
-            if file.namespace and file.namespace not in _available_namespace:
-                cluster.create_namespace(file.namespace)
-                _available_namespace.append(file.namespace)
-
-            k8s_create_or_patch(
-                cluster.get_config(),
-                file.content,
-                file.namespace or generated_deck.namespace,
+            generated_deck = prepare_k8s_workload_for_deck(
+                cluster.get_config(), data_aux, deck_name
             )
-            if progress_callback:
-                progress_callback(max(50, int(i / total * 50) - 1))
         except Exception as e:
-            logger.error(
-                "There was an error installing the workload. Now removing the cluster."
-            )
             if cluster_created:
+                # remove this just created cluster as it probably is in an inconsistent state from the beginning
                 # if cluster.kubernetes_cluster_type == ProviderType.BEIBOOT:
                 #     config.kubeconfig = _old_kubeconfig
                 #     config._init_kubeapi()
-                # remove this just created cluster as it probably is in an inconsistent state from the beginning
-                remove.remove_cluster(deckfile_location, cluster.get_config())
+                remove.remove_cluster(
+                    deckfile_location, cluster.get_config(), offline=offline
+                )
             raise e
 
-    if progress_callback:
-        progress_callback(100)
-    logger.info(f"All workloads from Deck {generated_deck.name} applied")
-
-    ingress_rules = get_ingress_rules(cluster.get_config(), generated_deck.namespace)
-    if ingress_rules:
-        for host, path in ingress_rules:
-            logger.info(f"Ingress: {host} -> {path}")
-        handle_hosts_resolution(deckfile_location, data_aux.deckfile, deck_name)
-    logger.info(f"Published ports are: {cluster.get_ports()}")
-    if notes := data_aux.deckfile.get_deck(deck_name).notes:
-        logger.info(notes)
-
-    del data_aux
+        if progress_callback:
+            progress_callback(30)
+
+        # 3. send the manifests to this cluster
+        logger.info(f"Applying Deck {generated_deck.name}")
+        logger.info("Installing the workload to the cluster")
+
+        if generated_deck.namespace != "default":
+            cluster.create_namespace(generated_deck.namespace)
+
+        if progress_callback:
+            progress_callback(50)
+
+        total = len(generated_deck.files)
+        logger.info(f"Installing {total} files(s)")
+        _available_namespace = [generated_deck, "default"]
+        for i, file in enumerate(generated_deck.files):
+            try:
+                logger.debug(file.name)
+                logger.debug(file.content)
+                logger.debug(file.namespace)
+                if file.namespace and file.namespace not in _available_namespace:
+                    cluster.create_namespace(file.namespace)
+                    _available_namespace.append(file.namespace)
+
+                k8s_create_or_patch(
+                    cluster.get_config(),
+                    file.content,
+                    file.namespace or generated_deck.namespace,
+                )
+                if progress_callback:
+                    progress_callback(max(50, int(i / total * 50) - 1))
+            except Exception as e:
+                logger.error(
+                    "There was an error installing the workload. Now removing the cluster."
+                )
+                if cluster_created:
+                    # if cluster.kubernetes_cluster_type == ProviderType.BEIBOOT:
+                    #     config.kubeconfig = _old_kubeconfig
+                    #     config._init_kubeapi()
+                    # remove this just created cluster as it probably is in an inconsistent state from the beginning
+                    remove.remove_cluster(
+                        deckfile_location, cluster.get_config(), offline=offline
+                    )
+                raise e
+
+        if progress_callback:
+            progress_callback(100)
+        logger.info(f"All workloads from Deck {generated_deck.name} applied")
+
+        ingress_rules = get_ingress_rules(
+            cluster.get_config(), generated_deck.namespace
+        )
+        if ingress_rules:
+            for host, path in ingress_rules:
+                logger.info(f"Ingress: {host} -> {path}")
+            handle_hosts_resolution(deckfile_location, data_aux.deckfile, deck_name)
+        logger.info(f"Published ports are: {cluster.get_ports()}")
+        if notes := data_aux.deckfile.get_deck(deck_name).notes:
+            logger.info(notes)
 
     if wait:
         _wait_ready(cluster.get_config(), generated_deck, timeout)
@@ -190,4 +199,5 @@ def get_command(args):
         wait=wait,
         timeout=timeout,
         no_input=args.no_input,
+        offline=args.offline,
     )
@@ -14,42 +14,47 @@ def run_hosts(
     deckfile_location: str,
     host_action: str,
     deck_name: str = None,
+    offline: bool = False,
 ) -> bool:
-    data_aux = fetch_data(deckfile_location, deck_name=deck_name)
-    deck = data_aux.deckfile.get_deck(deck_name)
-    deck_hosts = deck.hosts
-
-    hosts = Hosts()
-    if deck_hosts:
-        if host_action == "list":
-
-            logger.info("Ingress hosts:")
-            for host in deck_hosts:
-                logger.info(f"{host}")
-
-        elif host_action == "remove":
-            logger.debug("Removing hosts from hosts file...")
-            for host in deck_hosts:
-                hosts.remove_all_matching(name=host)
-            hosts.write()
-            logger.info("Hosts have been removed from hosts file...")
-
-        elif host_action == "write":
-
-            logger.info("Writing hosts to hosts file...")
-            new_entry = HostsEntry(
-                entry_type="ipv4", address="127.0.0.1", names=deck_hosts
-            )
-            hosts.add([new_entry])
-            hosts.write()
-            logger.info("Hosts should resolve to '127.0.0.1' now.")
-
+    with fetch_data(
+        deckfile_location,
+        deck_name=deck_name,
+        fetch_sources_flag=False,
+        offline=offline,
+    ) as data_aux:
+        deck = data_aux.deckfile.get_deck(deck_name)
+        deck_hosts = deck.hosts
+
+        hosts = Hosts()
+        if deck_hosts:
+            if host_action == "list":
+
+                logger.info("Ingress hosts:")
+                for host in deck_hosts:
+                    logger.info(f"{host}")
+
+            elif host_action == "remove":
+                logger.debug("Removing hosts from hosts file...")
+                for host in deck_hosts:
+                    hosts.remove_all_matching(name=host)
+                hosts.write()
+                logger.info("Hosts have been removed from hosts file...")
+
+            elif host_action == "write":
+
+                logger.info("Writing hosts to hosts file...")
+                new_entry = HostsEntry(
+                    entry_type="ipv4", address="127.0.0.1", names=deck_hosts
+                )
+                hosts.add([new_entry])
+                hosts.write()
+                logger.info("Hosts should resolve to '127.0.0.1' now.")
+
+            else:
+                logger.error(f"Unknown host action '{host_action}'")
         else:
-            logger.error(f"Unknown host action '{host_action}'")
-    else:
-        logger.info("No hosts specified in Deckfile")
+            logger.info("No hosts specified in Deckfile")
 
-    del data_aux
     return True
 
 
@@ -70,4 +75,5 @@ def hosts_command(args):
         args.Deckfile,
         args.host_action,
         deck_name=args.name,
+        offline=args.offline,
     )
@@ -1,23 +1,47 @@
 import logging
-from typing import List
+import os
+from typing import Dict, List
 
 from getdeck.cli.utils import stopwatch
+from getdeck.discovery import find_deckfiles
 from getdeck.fetch.fetch import fetch_data
 
 logger = logging.getLogger("deck")
 
 
 @stopwatch
-def get_available_decks(deckfile_location: str) -> List:
-    data_aux = fetch_data(deckfile_location, fetch_sources_flag=False)
-    available_decks = data_aux.deckfile.get_decks()
-    del data_aux
+def get_deck_names(deckfile_location: str, offline: bool = False) -> List[str]:
+    # decks in files of their own are not read, if the Deckfile names them
+    with fetch_data(
+        deckfile_location, fetch_sources_flag=False, offline=offline
+    ) as data_aux:
+        return data_aux.deckfile.get_deck_names()
 
-    logger.debug(available_decks)
-    return available_decks
+
+@stopwatch
+def get_all_deck_names(folder: str, offline: bool = False) -> Dict[str, List[str]]:
+    """
+    :return: the names of the decks of each Deckfile below folder by its relative path
+    """
+    deck_names = {}
+    for path in find_deckfiles(folder):
+        try:
+            deck_names[path] = get_deck_names(
+                os.path.join(folder, path), offline=offline
+            )
+        except Exception as e:
+            logger.error(f"Cannot list the decks of {path}: {e}")
+    return deck_names
 
 
 def list_command(args):
-    decks = get_available_decks(args.Deckfile)
-    names = [deck.name for deck in decks]
-    logger.info(names)
+    if args.recursive:
+        if not os.path.isdir(args.Deckfile):
+            raise RuntimeError(f"{args.Deckfile} is not a folder")
+        for path, names in get_all_deck_names(
+            args.Deckfile, offline=args.offline
+        ).items():
+            logger.info(f"{path}: {names}")
+    else:
+        names = get_deck_names(args.Deckfile, offline=args.offline)
+        logger.info(names)
@@ -0,0 +1,38 @@
+import logging
+
+from getdeck.cli.utils import stopwatch
+from getdeck.fetch import lock
+from getdeck.fetch.fetch import fetch_all_sources, fetch_data
+
+logger = logging.getLogger("deck")
+
+
+@stopwatch
+def run_lock(deckfile_location: str) -> str:
+    """
+    resolve the sources of all decks afresh and pin them in the deck.lock next to the Deckfile
+
+    :return: the path of the deck.lock
+    """
+    with fetch_data(deckfile_location, fetch_sources_flag=False) as data_aux:
+        if data_aux.deckfile_aux.temporary_data:
+            raise RuntimeError("Only a local Deckfile can be locked")
+
+        sources = {}
+        for deck in data_aux.deckfile.get_decks():
+            logger.info(f"Locking Deck {deck.name}")
+            source_auxs = fetch_all_sources(deck=deck)
+            for source_aux in source_auxs:
+                entry = source_aux.lock
+                if entry:
+                    ref = getattr(source_aux.source, "ref", None)
+                    key = lock.get_source_key(source_aux.source)
+                    sources[key] = {"ref": ref, **entry}
+                source_aux.cleanup()
+
+        return lock.write_lock(data_aux.deckfile_aux, sources)
+
+
+def lock_command(args):
+    lock_path = run_lock(args.Deckfile)
+    logger.info(f"Wrote {lock_path}")
@@ -15,9 +15,10 @@ def stop_command(args):
     ignore_cluster = args.no_cluster
     config = default_configuration
 
-    data_aux = fetch_data(location)
-    cluster_config = data_aux.deckfile.get_cluster()
-    del data_aux
+    with fetch_data(
+        location, fetch_sources_flag=False, offline=args.offline
+    ) as data_aux:
+        cluster_config = data_aux.deckfile.get_cluster()
 
     provider_type, name, native_config = get_cluster_initialize_arguments(
         cluster_config=cluster_config, ignore_cluster=ignore_cluster, no_input=False
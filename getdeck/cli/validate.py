@@ -0,0 +1,145 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from getdeck import cache, configuration, workspace
+from getdeck.cli.utils import stopwatch
+from getdeck.deckfile.errors import DeckfileError
+from getdeck.discovery import find_deckfiles
+from getdeck.fetch import lock
+from getdeck.fetch.fetch import fetch_data
+from getdeck.fetch.reachability import check_sources
+
+logger = logging.getLogger("deck")
+
+
+def validate_deckfile(
+    deckfile_location: str, deck_name: str = None, offline: bool = False
+) -> List[str]:
+    """
+    check the schema and the sources of all decks, or of deck_name, which are otherwise only
+    validated for the deck in use; the refs of the sources are checked once these are valid
+
+    :return: the errors found in the Deckfile
+    """
+    try:
+        with fetch_data(
+            deckfile_location, fetch_sources_flag=False, offline=offline
+        ) as data_aux:
+            deckfile = data_aux.deckfile
+            errors = deckfile.get_errors(deck_name)
+            if errors:
+                return errors
+
+            decks = (
+                [deckfile.get_deck(deck_name)] if deck_name else deckfile.get_decks()
+            )
+            sources = {}
+            for deck in decks:
+                for source in deck.sources:
+                    sources.setdefault(lock.get_source_key(source), source)
+            return check_sources(
+                list(sources.values()), data_aux.deckfile_aux.path, offline=offline
+            )
+    except Exception as e:
+        return [str(e)]
+
+
+@stopwatch
+def run_validate(
+    deckfile_location: str, deck_name: str = None, offline: bool = False
+) -> List[str]:
+    return validate_deckfile(deckfile_location, deck_name, offline=offline)
+
+
+def _init_worker(cache_directory: str, workdir: str) -> None:
+    # the processes of the pool are spawned, they do not share the state of this one
+    configuration.CACHE_DIRECTORY = cache_directory
+    configuration.WORKDIR = workdir
+
+
+def _validate_in_worker(folder: str, path: str, offline: bool) -> dict:
+    tic = time.perf_counter()
+    try:
+        errors = validate_deckfile(os.path.join(folder, path), offline=offline)
+    finally:
+        # the processes of the pool end without running the atexit handlers
+        workspace.close_workspace()
+        cache.save_statistics()
+    return {
+        "deckfile": path,
+        "valid": not errors,
+        "errors": errors,
+        "duration": round(time.perf_counter() - tic, 3),
+    }
+
+
+@stopwatch
+def run_validate_all(
+    folder: str, offline: bool = False, workers: int = None
+) -> List[dict]:
+    """
+    validate all Deckfiles in folder and its subfolders, each one in a process of its own
+
+    :return: the result of each Deckfile, with its path relative to folder
+    """
+    paths = find_deckfiles(folder)
+    if not paths:
+        return []
+    logger.info(f"Validating {len(paths)} Deckfile(s)")
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers or os.cpu_count() or 1, len(paths)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(configuration.CACHE_DIRECTORY, configuration.WORKDIR),
+    ) as executor:
+        futures = [
+            executor.submit(_validate_in_worker, folder, path, offline)
+            for path in paths
+        ]
+        return [future.result() for future in futures]
+
+
+def write_report(path: str, results: List[dict]) -> None:
+    report = {
+        "valid": all(result["valid"] for result in results),
+        "deckfiles": results,
+    }
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+def validate_command(args):
+    if args.all:
+        if not os.path.isdir(args.Deckfile):
+            raise RuntimeError(f"{args.Deckfile} is not a folder")
+        results = run_validate_all(
+            args.Deckfile, offline=args.offline, workers=args.workers
+        )
+    else:
+        errors = run_validate(args.Deckfile, args.name, offline=args.offline)
+        results = [{"deckfile": args.Deckfile, "valid": not errors, "errors": errors}]
+
+    if args.report:
+        write_report(args.report, results)
+
+    invalid = [result for result in results if not result["valid"]]
+    for result in invalid:
+        for error in result["errors"]:
+            logger.error(f"{result['deckfile']}: {error}" if args.all else error)
+    if invalid:
+        raise DeckfileError(
+            f"{len(invalid)} of {len(results)} Deckfile(s) are invalid"
+            if args.all
+            else f"The Deckfile has {len(invalid[0]['errors'])} error(s)"
+        )
+    logger.info(
+        f"All {len(results)} Deckfile(s) are valid"
+        if args.all
+        else "The Deckfile is valid"
+    )
@@ -1,6 +1,7 @@
 import os
 import sys
 import logging
+import tempfile
 
 
 logger = logging.getLogger("deck")
@@ -9,6 +10,23 @@ logger = logging.getLogger("deck")
 __VERSION__ = "0.11.1"
 
 DECKFILE_FILE = "deck.yaml"
+LOCK_FILE = "deck.lock"
+
+CACHE_DIRECTORY = os.path.expanduser("~/.deck/cache/")
+# least recently used entries are evicted once the cache is larger, e.g. 500M or 10G
+CACHE_MAX_SIZE = os.getenv("DECK_CACHE_MAX_SIZE", "10G")
+# entries used within this number of seconds may be in use and are never evicted
+CACHE_GRACE_PERIOD = int(os.getenv("DECK_CACHE_GRACE_PERIOD", 3600))
+# runs prune the cache at most once within this number of seconds, deck cache prune at any time
+CACHE_PRUNE_INTERVAL = int(os.getenv("DECK_CACHE_PRUNE_INTERVAL", 86400))
+
+# the temporary data of each run is kept below this folder, e.g. on a tmpfs
+WORKDIR = os.getenv("DECK_WORKDIR", os.path.join(tempfile.gettempdir(), "deck"))
+
+# number of sources which are fetched concurrently
+FETCH_WORKERS = int(os.getenv("DECK_FETCH_WORKERS", 4))
+# number of folders which are scanned concurrently by deck list --recursive
+DISCOVERY_WORKERS = int(os.getenv("DECK_DISCOVERY_WORKERS", 8))
 
 
 def fix_pywin32_in_frozen_build() -> None:
@@ -1,9 +1,16 @@
+import functools
 import logging
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
-from getdeck.deckfile.file import Deckfile, DeckfileCluster, DeckfileDeck
+from getdeck.deckfile.errors import DeckfileError
+from getdeck.deckfile.file import (
+    Deckfile,
+    DeckfileCluster,
+    DeckfileDeck,
+    DeckfileDeckRef,
+)
 
 logger = logging.getLogger("deck")
 
@@ -16,25 +23,90 @@ class Deckfile_1_0(Deckfile, BaseModel):
     # content
     version: Optional[str]
     cluster: DeckfileCluster = None
-    decks: List[DeckfileDeck]
+    decks: List[Union[DeckfileDeckRef, DeckfileDeck]]
+
+    _offline: bool = PrivateAttr(False)
+    _url: Optional[str] = PrivateAttr(None)
+
+    def set_offline(self, offline: bool) -> None:
+        """
+        offline: referenced deck files are only read from the local caches
+        """
+        self._offline = offline
+
+    def set_url(self, url: str) -> None:
+        """
+        url: the http(s) url the Deckfile has been downloaded from, relative deck files are
+        downloaded from next to it
+        """
+        self._url = url
+
+    def _load_deck(self, index: int) -> DeckfileDeck:
+        deck = self.decks[index]
+        if isinstance(deck, DeckfileDeckRef):
+            from getdeck.deckfile.selector import load_deck_file
+
+            loaded = load_deck_file(
+                deck, self.file_path, offline=self._offline, url=self._url
+            )
+            if deck.name and deck.name.lower() != loaded.name.lower():
+                raise DeckfileError(
+                    f"The deck file {deck.ref} contains Deck {loaded.name} instead of {deck.name}"
+                )
+            self.decks[index] = deck = loaded
+        return deck
+
+    def _find_deck(self, name: str) -> Optional[int]:
+        # deck files without a name in the Deckfile are only read if necessary
+        for index, deck in enumerate(self.decks):
+            if deck.name and deck.name.lower() == name.lower():
+                return index
+        for index, deck in enumerate(self.decks):
+            if not deck.name and self._load_deck(index).name.lower() == name.lower():
+                return index
+        return None
 
     def get_deck(self, name: str = None) -> DeckfileDeck:
         if name is None and len(self.decks) >= 1:
-            for deck in self.decks:
-                if deck.name.lower() == "default":
-                    return deck
-            return self.decks[0]
+            index = self._find_deck("default")
+            return self._load_deck(index or 0)
         else:
-            for deck in self.decks:
-                if deck.name.lower() == name.lower():
-                    return deck
-            else:
+            index = self._find_deck(name)
+            if index is None:
                 raise ValueError(
                     f"Name of Deck {name.lower()} is not part of this Deckfile or is missing"
                 )
+            return self._load_deck(index)
 
     def get_cluster(self):
         return self.cluster
 
     def get_decks(self):
-        return self.decks
+        return [self._load_deck(index) for index in range(len(self.decks))]
+
+    def get_deck_names(self) -> List[str]:
+        return [
+            deck.name or self._load_deck(index).name
+            for index, deck in enumerate(self.decks)
+        ]
+
+    def get_errors(self, name: str = None) -> List[str]:
+        """
+        :return: the errors of the deck files and sources of deck name or of all decks, which
+        are only found once a deck is used otherwise
+        """
+        if name:
+            loaders = [functools.partial(self.get_deck, name)]
+        else:
+            loaders = [
+                functools.partial(self._load_deck, index)
+                for index in range(len(self.decks))
+            ]
+
+        errors = []
+        for load in loaders:
+            try:
+                _ = load().sources
+            except Exception as e:
+                errors.append(str(e))
+        return errors
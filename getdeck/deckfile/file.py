@@ -1,8 +1,8 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Union
+from typing import Any, List, Dict, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError
 
 from getdeck.deckfile.errors import DeckfileError
 
@@ -26,6 +26,8 @@ class FileSource(BaseModel):
     ref: str = None
     targetRevision: Optional[str] = None
     path: str = ""
+    sparseCheckout: Optional[bool] = None  # git refs: only check out path (default)
+    submodules: bool = False  # git refs: check out submodules
 
 
 class HelmSource(BaseModel):
@@ -40,6 +42,8 @@ class HelmSource(BaseModel):
     valueFiles: List[str] = ["values.yaml"]
     helmArgs: List[str] = None
     helmPlugins: List[str] = None
+    sparseCheckout: Optional[bool] = None  # git refs: only check out path (opt-in)
+    submodules: bool = False  # git refs: check out submodules
 
 
 class KustomizeSource(BaseModel):
@@ -47,6 +51,8 @@ class KustomizeSource(BaseModel):
     ref: str
     targetRevision: Optional[str] = None
     path: str = ""
+    sparseCheckout: Optional[bool] = None  # git refs: only check out path (opt-in)
+    submodules: bool = False  # git refs: check out submodules
 
 
 class DirectorySource(BaseModel):
@@ -55,6 +61,74 @@ class DirectorySource(BaseModel):
     targetRevision: Optional[str] = None
     path: str
     recursive: bool
+    sparseCheckout: Optional[bool] = None  # git refs: only check out path (default)
+    submodules: bool = False  # git refs: check out submodules
+
+
+class ArchiveSource(BaseModel):
+    type: str = "archive"
+    ref: str  # http(s) url of a .tar(.gz|.bz2|.xz), .tgz or .zip archive
+    path: str = ""
+
+
+class BundleSource(BaseModel):
+    type: str = "bundle"
+    ref: Optional[str] = None  # http(s) url of an index listing manifest urls per line
+    include: str = "*"  # glob selecting urls of the index
+    refs: List[str] = []  # http(s) urls of manifests
+
+
+SOURCE_CLASSES = {
+    "inline": InlineSource,
+    "file": FileSource,
+    "directory": DirectorySource,
+    "kustomize": KustomizeSource,
+    "helm": HelmSource,
+    "archive": ArchiveSource,
+    "bundle": BundleSource,
+}
+
+
+def build_source(
+    source: Union[dict, BaseModel], deck_name: str = None
+) -> Union[
+    InlineSource,
+    FileSource,
+    DirectorySource,
+    HelmSource,
+    KustomizeSource,
+    ArchiveSource,
+    BundleSource,
+]:
+    if isinstance(source, BaseModel):
+        return source
+
+    try:
+        source_type = source["type"].lower()
+    except (KeyError, TypeError, AttributeError):
+        raise DeckfileError(
+            f"A source from Deck {deck_name} did not specify the 'type' argument."
+        )
+
+    # inline deprecated warning
+    if source_type == "file" and source.get("content", None):
+        logger.warning(
+            "'type: file' is deprecated for inline sources, "
+            "use 'type: inline' instead",
+        )
+        source_type = "inline"
+
+    source_class = SOURCE_CLASSES.get(source_type)
+    if not source_class:
+        raise DeckfileError(
+            f"A source from Deck {deck_name} has the unknown type '{source_type}'."
+        )
+    try:
+        return source_class(**source)
+    except ValidationError as e:
+        raise DeckfileError(
+            f"A {source_type} source from Deck {deck_name} is invalid: {e}"
+        )
 
 
 class DeckfileDeck(BaseModel):
@@ -62,44 +136,44 @@ class DeckfileDeck(BaseModel):
     namespace: str = "default"
     notes: str = ""
     hosts: List[str] = []
-    sources: List[
+    # the sources are only validated once they are used, see sources
+    raw_sources: List[Any] = Field(alias="sources")
+    _sources: Optional[list] = PrivateAttr(None)
+
+    class Config:
+        allow_population_by_field_name = True
+
+    @property
+    def sources(
+        self,
+    ) -> List[
         Union[
             InlineSource,
             FileSource,
             DirectorySource,
             HelmSource,
             KustomizeSource,
+            ArchiveSource,
+            BundleSource,
         ]
-    ]
-
-    def __init__(self, *args, **data):
-        super(DeckfileDeck, self).__init__(*args, **data)
-        tsources = data.get("sources")
-        self.sources = []
-        if tsources:
-            try:
-                for source in tsources:
-                    # inline deprecated warning
-                    source_type = source["type"].lower()
-                    if source_type == "file" and source.get("content", None):
-                        logger.warning(
-                            "'type: file' is deprecated for inline sources, "
-                            "use 'type: inline' instead",
-                        )
-                        source_type = "inline"
-
-                    source_class = {
-                        "inline": InlineSource,
-                        "file": FileSource,
-                        "directory": DirectorySource,
-                        "kustomize": KustomizeSource,
-                        "helm": HelmSource,
-                    }.get(source_type)
-                    self.sources.append(source_class(**source))
-            except KeyError:
-                raise DeckfileError(
-                    f"A source from Deck {data.get('name')} did not specify the 'type' argument."
-                )
+    ]:
+        if self._sources is None:
+            self._sources = [
+                build_source(source, deck_name=self.name) for source in self.raw_sources
+            ]
+        return self._sources
+
+
+class DeckfileDeckRef(BaseModel):
+    """
+    A deck in a file of its own, which is only read once the deck is used
+    """
+
+    ref: str = Field(alias="$ref")  # path relative to the Deckfile, git or http(s) url
+    path: Optional[
+        str
+    ] = None  # git refs: the file in the repository (default deck.yaml)
+    name: Optional[str] = None  # the deck can be selected without reading the file
 
 
 class Deckfile(ABC):
@@ -114,3 +188,7 @@ class Deckfile(ABC):
     @abstractmethod
     def get_deck(self, name: str = None) -> DeckfileDeck:
         raise NotImplementedError
+
+    @abstractmethod
+    def get_errors(self, name: str = None) -> List[str]:
+        raise NotImplementedError
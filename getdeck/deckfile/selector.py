@@ -1,20 +1,31 @@
+import functools
+import hashlib
+import json
 import logging
 import os
-from typing import Union
+from typing import Callable, Optional, TypeVar, Union
+from urllib.parse import urljoin
 
-import yaml
-from yaml import YAMLError
+import pydantic
 
-from getdeck import configuration
+from getdeck import cache, configuration, yaml_utils
 from getdeck.deckfile.errors import (
     DeckfileNotFoundError,
     DeckfileVersionError,
     DeckfileError,
 )
 from getdeck.deckfile.deckfile_1 import Deckfile_1_0
+from getdeck.deckfile.file import (
+    SOURCE_CLASSES,
+    DeckfileCluster,
+    DeckfileDeck,
+    DeckfileDeckRef,
+)
 
 logger = logging.getLogger("deck")
 
+Model = TypeVar("Model", bound=pydantic.BaseModel)
+
 
 class DeckfileSelector:
     def __init__(self, options: dict):
@@ -25,16 +36,34 @@ class DeckfileSelector:
         if not path_deckfile:
             path_deckfile = os.path.join(os.getcwd(), configuration.DECKFILE_FILE)
 
-        # load deck file + get version
+        file_path = os.path.dirname(path_deckfile)
+        file_name = os.path.basename(path_deckfile)
+
         try:
             logger.debug(f"Trying to open file at {path_deckfile}")
-            with open(path_deckfile) as deckfile:
-                data = yaml.load(deckfile, Loader=yaml.FullLoader)
+            with open(path_deckfile, "rb") as deckfile:
+                content = deckfile.read()
         except FileNotFoundError:
             raise DeckfileNotFoundError(
                 f"The Deckfile at the location {path_deckfile} does not exist."
             )
-        except YAMLError:
+
+        # a Deckfile which has been validated before is not parsed again
+        key = get_cache_key(content)
+        deckfile = read_cached_deckfile(
+            key,
+            lambda data: self.options[data["version"]].parse_obj(
+                {**data, "file_path": file_path, "file_name": file_name}
+            ),
+        )
+        if deckfile:
+            logger.debug(f"Using the cached Deckfile {key}")
+            return deckfile
+
+        # load deck file + get version
+        try:
+            data = yaml_utils.load(content)
+        except yaml_utils.YAMLError:
             raise DeckfileError("This Deckfile is no valid YAML.")
 
         # version
@@ -52,12 +81,165 @@ class DeckfileSelector:
                 raise DeckfileVersionError("Version in Deckfile is missing")
         logger.debug("The raw Deckfile data: " + str(data))
 
-        file_path = os.path.dirname(path_deckfile)
-        file_name = os.path.basename(path_deckfile)
         deckfile = deckfile_class(file_path=file_path, file_name=file_name, **data)
+        write_cached_deckfile(key, deckfile)
         return deckfile
 
 
+@functools.lru_cache()
+def get_models_fingerprint() -> str:
+    """
+    :return: a summary of the fields of all Deckfile models, cached Deckfiles of other models
+    cannot be used
+    """
+    models = [
+        Deckfile_1_0,
+        DeckfileCluster,
+        DeckfileDeck,
+        DeckfileDeckRef,
+        *SOURCE_CLASSES.values(),
+    ]
+    return ";".join(
+        f"{model.__name__}({','.join(model.__fields__)}|{','.join(model.__private_attributes__)})"
+        for model in models
+    )
+
+
+def get_cache_key(content: bytes) -> str:
+    """
+    :return: the key of a Deckfile in the cache, it changes with the models of each release
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{configuration.__VERSION__}:{pydantic.VERSION}:".encode("utf-8"))
+    digest.update(get_models_fingerprint().encode("utf-8"))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def read_cached_deckfile(key: str, parse: Callable[[dict], Model]) -> Optional[Model]:
+    """
+    :param parse: validates the cached data with the model of the Deckfile or deck
+    :return: the model or None if it is not cached or the cached data is invalid
+    """
+    path = cache.deckfiles.get_path(f"{key}.json")
+    try:
+        with open(path, encoding="utf-8") as cached_file:
+            model = parse(json.load(cached_file))
+    except FileNotFoundError:
+        cache.deckfiles.miss()
+        return None
+    except Exception as e:
+        logger.debug(f"Cannot read the cached Deckfile {key}: {e}")
+        cache.deckfiles.miss()
+        return None
+    cache.deckfiles.hit(path)
+    return model
+
+
+def write_cached_deckfile(key: str, model: pydantic.BaseModel) -> None:
+    path = cache.deckfiles.get_path(f"{key}.json")
+    try:
+        data = model.dict(by_alias=True, exclude={"file_path", "file_name"})
+        definition = json.dumps(data)
+        if json.loads(definition) != data:
+            # e.g. YAML mappings with other keys than strings
+            logger.debug(f"The Deckfile {key} cannot be stored as JSON")
+            return
+        with cache.atomic_write(path, "w", encoding="utf-8") as cached_file:
+            cached_file.write(definition)
+    except Exception as e:
+        logger.debug(f"Cannot cache the Deckfile {key}: {e}")
+
+
+def _read_deck_file(
+    deck_ref: DeckfileDeckRef, file_path: str, offline: bool, url: Optional[str]
+) -> bytes:
+    from getdeck.fetch import git_cache
+    from getdeck.fetch.deck_fetcher import DeckFetcher, select_deck_fetch_behavior
+    from getdeck.fetch.types import DeckfileAux
+
+    ref = deck_ref.ref
+    fetch_behavior = select_deck_fetch_behavior(location=ref)
+    if not fetch_behavior and url:
+        # the deck files of a downloaded Deckfile are downloaded from next to it
+        if ref.startswith("~"):
+            raise DeckfileError(
+                f"The deck file {ref} of the Deckfile at {url} is not relative to it."
+            )
+        ref = urljoin(url, ref)
+        fetch_behavior = select_deck_fetch_behavior(location=ref)
+    if not fetch_behavior:
+        path = os.path.normpath(
+            os.path.join(file_path, os.path.expanduser(deck_ref.ref))
+        )
+        checkout_folder = git_cache.checkout_registry.get_checkout_folder(file_path)
+        if checkout_folder:
+            relative_path = os.path.relpath(path, checkout_folder)
+            if relative_path.split(os.sep)[0] == os.pardir:
+                raise DeckfileError(
+                    f"The deck file {deck_ref.ref} is not part of the repository of the "
+                    "Deckfile."
+                )
+            if not os.path.isfile(path):
+                # a sparse checkout of a Deckfile does not contain its deck files yet
+                git_cache.checkout_registry.widen(
+                    checkout_folder, [relative_path], offline=offline
+                )
+        try:
+            with open(path, "rb") as deck_file:
+                return deck_file.read()
+        except FileNotFoundError:
+            raise DeckfileNotFoundError(f"The deck file {path} does not exist.")
+
+    deckfile_aux = DeckfileAux(
+        location=ref, name=deck_ref.path or configuration.DECKFILE_FILE
+    )
+    try:
+        deckfile_aux = DeckFetcher(fetch_behavior=fetch_behavior).fetch(
+            data=deckfile_aux, deckfile_only=True, offline=offline
+        )
+        with open(
+            os.path.join(deckfile_aux.path, deckfile_aux.name), "rb"
+        ) as deck_file:
+            return deck_file.read()
+    except FileNotFoundError:
+        raise DeckfileNotFoundError(f"The deck file {ref} does not exist.")
+    finally:
+        deckfile_aux.cleanup()
+
+
+def load_deck_file(
+    deck_ref: DeckfileDeckRef,
+    file_path: str,
+    offline: bool = False,
+    url: Optional[str] = None,
+) -> DeckfileDeck:
+    """
+    :param url: the http(s) url of the Deckfile if it has been downloaded
+    :return: the deck in the file referenced by a Deckfile at file_path
+    """
+    content = _read_deck_file(deck_ref, file_path, offline=offline, url=url)
+    key = get_cache_key(b"deck:" + content)
+    deck = read_cached_deckfile(key, DeckfileDeck.parse_obj)
+    if deck:
+        logger.debug(f"Using the cached deck file {deck_ref.ref}")
+        return deck
+
+    try:
+        data = yaml_utils.load(content)
+    except yaml_utils.YAMLError:
+        raise DeckfileError(f"The deck file {deck_ref.ref} is no valid YAML.")
+    if not isinstance(data, dict):
+        raise DeckfileError(f"The deck file {deck_ref.ref} does not contain a Deck.")
+    try:
+        deck = DeckfileDeck(**data)
+    except pydantic.ValidationError as e:
+        raise DeckfileError(f"The deck file {deck_ref.ref} is invalid: {e}")
+
+    write_cached_deckfile(key, deck)
+    return deck
+
+
 deckfile_selector = DeckfileSelector(
     options={
         "latest": Deckfile_1_0,
@@ -0,0 +1,296 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+from getdeck import cache, configuration
+
+logger = logging.getLogger("deck")
+
+INDEX_VERSION = 1
+# folders modified this number of seconds before a scan may still change within the resolution
+# of their mtime, they are scanned again the next time
+RACY_PERIOD = 2
+
+
+class IgnoreRule(NamedTuple):
+    regex: Pattern
+    negate: bool
+    directory_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """
+    :return: the regular expression of a gitignore glob pattern
+    """
+    result = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            result += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            result += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            result += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            result += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and pattern.find("]", i + 2) != -1:
+            start, end = i + 1, pattern.find("]", i + 2)
+            characters = pattern[start:end].replace("\\", "\\\\")
+            if characters.startswith("!"):
+                characters = "^" + characters[1:]
+            result += f"[{characters}]"
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            result += re.escape(pattern[i + 1])
+            i += 2
+        else:
+            result += re.escape(pattern[i])
+            i += 1
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def parse_gitignore(lines: Tuple[str, ...]) -> List[IgnoreRule]:
+    """
+    :return: the rules of the lines of a .gitignore file
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # patterns with a slash are relative to the .gitignore file, others match at any depth
+        if "/" in line:
+            expression = _translate(line.lstrip("/"))
+        else:
+            expression = "(?:.*/)?" + _translate(line)
+        rules.append(IgnoreRule(re.compile(f"^{expression}$"), negate, directory_only))
+    return rules
+
+
+class GitIgnore(NamedTuple):
+    # the folder of the .gitignore file relative to the root of the scan
+    base: str
+    rules: List[IgnoreRule]
+    # the root of the scan relative to the .gitignore file, if it is above the root
+    root: str = ""
+
+
+def is_ignored(gitignores: List[GitIgnore], path: str, is_dir: bool) -> bool:
+    """
+    :param path: the path relative to the root of the scan, separated by slashes
+    :return: True if the last rule matching path excludes it
+    """
+    ignored = False
+    for gitignore in gitignores:
+        prefix = f"{gitignore.base}/" if gitignore.base else ""
+        if not path.startswith(prefix):
+            continue
+        relative_path = path.replace(prefix, "", 1)
+        if gitignore.root:
+            relative_path = f"{gitignore.root}/{relative_path}"
+        for rule in gitignore.rules:
+            if rule.directory_only and not is_dir:
+                continue
+            if rule.regex.match(relative_path):
+                ignored = not rule.negate
+    return ignored
+
+
+def _get_deckfile_names() -> List[str]:
+    # in the order of precedence of detect_deckfile
+    stem = os.path.splitext(configuration.DECKFILE_FILE)[0]
+    return [stem + extension for extension in [".yaml", ".yml"]]
+
+
+def _get_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_gitignore(path: str) -> List[str]:
+    with open(os.path.join(path, ".gitignore"), encoding="utf-8") as gitignore_file:
+        return gitignore_file.readlines()
+
+
+def _is_unchanged(path: str, entry: dict) -> bool:
+    # the mtime of a folder changes with its entries, but not with the content of its files
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+    gitignore_mtime = _get_mtime(os.path.join(path, ".gitignore"))
+    return entry["mtime"] == mtime and entry["gitignore_mtime"] == gitignore_mtime
+
+
+def _scan_directory(path: str) -> dict:
+    """
+    :return: the entry of the folder at path in the index with its Deckfiles, subfolders and
+    .gitignore rules
+    """
+    mtime = os.stat(path).st_mtime_ns
+    gitignore_mtime = _get_mtime(os.path.join(path, ".gitignore"))
+    deckfile_names = _get_deckfile_names()
+    deckfiles, directories = [], []
+    with os.scandir(path) as entries:
+        for dir_entry in entries:
+            if dir_entry.is_dir(follow_symlinks=False):
+                if dir_entry.name != ".git":
+                    directories.append(dir_entry.name)
+            elif dir_entry.name in deckfile_names and dir_entry.is_file():
+                deckfiles.append(dir_entry.name)
+    gitignore = _read_gitignore(path) if gitignore_mtime is not None else []
+
+    return {
+        "mtime": mtime,
+        "gitignore_mtime": gitignore_mtime,
+        "deckfiles": sorted(deckfiles, key=deckfile_names.index),
+        "directories": sorted(directories),
+        "gitignore": gitignore,
+    }
+
+
+def get_parent_gitignores(root: str) -> List[GitIgnore]:
+    """
+    :return: the .gitignore files above root up to the root of its git repository
+    """
+    parents = []
+    path = root
+    while not os.path.exists(os.path.join(path, ".git")):
+        parent = os.path.dirname(path)
+        if parent == path:
+            # root is not part of a git repository
+            return []
+        path = parent
+        parents.append(path)
+
+    gitignores = []
+    for parent in reversed(parents):
+        if os.path.isfile(os.path.join(parent, ".gitignore")):
+            rules = parse_gitignore(tuple(_read_gitignore(parent)))
+            relative_root = os.path.relpath(root, parent).replace(os.sep, "/")
+            gitignores.append(GitIgnore("", rules, relative_root))
+    return gitignores
+
+
+def _get_index_path(root: str) -> str:
+    name = hashlib.sha256(root.encode("utf-8")).hexdigest()[:32]
+    return cache.discovery.get_path(f"{name}.json")
+
+
+def read_index(root: str) -> Dict[str, dict]:
+    """
+    :return: the folders below root found by the previous scan, by their path relative to root
+    """
+    path = _get_index_path(root)
+    try:
+        with open(path, encoding="utf-8") as index_file:
+            index = json.load(index_file)
+    except FileNotFoundError:
+        cache.discovery.miss()
+        return {}
+    except Exception as e:
+        logger.debug(f"Cannot read the Deckfile index of {root}: {e}")
+        cache.discovery.miss()
+        return {}
+    if index.get("version") != INDEX_VERSION or index.get("root") != root:
+        cache.discovery.miss()
+        return {}
+    cache.discovery.hit(path)
+    return index["directories"]
+
+
+def write_index(root: str, directories: Dict[str, dict]) -> None:
+    path = _get_index_path(root)
+    index = {"version": INDEX_VERSION, "root": root, "directories": directories}
+    try:
+        with cache.atomic_write(path, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+    except Exception as e:
+        logger.debug(f"Cannot write the Deckfile index of {root}: {e}")
+
+
+def find_deckfiles(root: str, workers: int = None) -> List[str]:
+    """
+    find the Deckfiles in the folder root and its subfolders, except for the ones ignored by
+    .gitignore files; only folders which have changed since the previous scan are listed again
+
+    :return: the paths of the Deckfiles relative to root
+    """
+    root = os.path.abspath(root)
+    racy_since = time.time_ns() - RACY_PERIOD * 10**9
+    index = read_index(root)
+    directories = {}
+    deckfiles = []
+    queue = [("", get_parent_gitignores(root))]
+    pending = {}
+    scanned = 0
+
+    def visit(relative_path: str, gitignores: List[GitIgnore], entry: dict):
+        if max(entry["mtime"], entry["gitignore_mtime"] or 0) < racy_since:
+            directories[relative_path] = entry
+        if entry["gitignore"]:
+            rules = parse_gitignore(tuple(entry["gitignore"]))
+            gitignores = gitignores + [GitIgnore(relative_path, rules)]
+        prefix = f"{relative_path}/" if relative_path else ""
+        # deck.yaml takes precedence over deck.yml
+        for name in entry["deckfiles"]:
+            if not is_ignored(gitignores, prefix + name, is_dir=False):
+                deckfiles.append(prefix + name)
+                break
+        for name in entry["directories"]:
+            if not is_ignored(gitignores, prefix + name, is_dir=True):
+                queue.append((prefix + name, gitignores))
+
+    with ThreadPoolExecutor(
+        max_workers=workers or configuration.DISCOVERY_WORKERS
+    ) as executor:
+        while queue or pending:
+            # unchanged folders are taken from the index right away, the others are scanned
+            while queue:
+                relative_path, gitignores = queue.pop()
+                path = os.path.join(root, *relative_path.split("/"))
+                entry = index.get(relative_path)
+                if entry is not None and _is_unchanged(path, entry):
+                    visit(relative_path, gitignores, entry)
+                else:
+                    future = executor.submit(_scan_directory, path)
+                    pending[future] = (relative_path, gitignores)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                relative_path, gitignores = pending.pop(future)
+                try:
+                    entry = future.result()
+                except OSError as e:
+                    logger.debug(f"Cannot scan {relative_path or root}: {e}")
+                    continue
+                scanned += 1
+                visit(relative_path, gitignores, entry)
+
+    logger.debug(f"Scanned {scanned} changed folders below {root} for Deckfiles")
+    if scanned or directories.keys() != index.keys():
+        write_index(root, directories)
+    return sorted(deckfiles)
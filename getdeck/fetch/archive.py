@@ -0,0 +1,150 @@
+import logging
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from typing import BinaryIO, Optional
+
+from getdeck.fetch import http_cache, transport
+from getdeck.fetch.errors import OfflineError
+
+logger = logging.getLogger("deck")
+
+# zip archives are read from their end, smaller ones are kept in memory
+ZIP_SPOOL_SIZE = 64 * 1024 * 1024
+
+
+class _TeeReader:
+    """
+    writes everything read from stream to target
+    """
+
+    def __init__(self, stream: BinaryIO, target: BinaryIO):
+        self.stream = stream
+        self.target = target
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.target.write(data)
+        return data
+
+    def drain(self) -> None:
+        # also write what the extraction did not read, e.g. the padding of a tar archive
+        for _ in iter(lambda: self.read(transport.CHUNK_SIZE), b""):
+            pass
+
+
+def get_archive_format(ref: str) -> Optional[str]:
+    ref_lo = ref.lower().split("?")[0]
+    if ref_lo.endswith(".zip"):
+        return "zip"
+    if ref_lo.endswith((".tgz", ".tar")) or ".tar." in ref_lo:
+        return "tar"
+    return None
+
+
+def _get_member_path(name: str, path: str) -> Optional[str]:
+    """
+    :return: the normalized name of an archive member below path or None if it is not selected
+    """
+    name = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if name == ".." or name.startswith("../"):
+        logger.warning(f"Skipping archive member outside of the archive: {name}")
+        return None
+    if path and name != path and not name.startswith(f"{path}/"):
+        return None
+    return name
+
+
+def _write_member(fileobj: BinaryIO, target: str, name: str) -> None:
+    destination = os.path.join(target, *name.split("/"))
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    with open(destination, "wb") as destination_file:
+        shutil.copyfileobj(fileobj, destination_file, transport.BUFFER_SIZE)
+
+
+def extract_tar(stream: BinaryIO, target: str, path: str = "") -> None:
+    # "r|*" reads the (compressed) stream front to back without seeking
+    with tarfile.open(fileobj=stream, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            name = _get_member_path(member.name, path)
+            if name:
+                _write_member(archive.extractfile(member), target, name)
+
+
+def _extract_zip(stream: BinaryIO, target: str, path: str) -> None:
+    with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_SIZE) as spool:
+        shutil.copyfileobj(stream, spool, transport.BUFFER_SIZE)
+        spool.seek(0)
+        with zipfile.ZipFile(spool) as archive:
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                name = _get_member_path(member.filename, path)
+                if name:
+                    with archive.open(member) as member_file:
+                        _write_member(member_file, target, name)
+
+
+def _extract(stream: BinaryIO, archive_format: str, target: str, path: str) -> None:
+    if archive_format == "tar":
+        extract_tar(stream, target, path)
+    else:
+        _extract_zip(stream, target, path)
+
+
+def extract(
+    ref: str,
+    target: str,
+    path: str = "",
+    digest: Optional[str] = None,
+    offline: bool = False,
+) -> str:
+    """
+    stream the archive at the http(s) url ref and extract the files below path into target, the
+    archive is added to the http cache on the way; an archive with the expected sha256 digest is
+    extracted from the cache
+
+    :param offline: only extract from the cache
+    :return: the sha256 digest of the archive, which must match digest if given
+    """
+    archive_format = get_archive_format(ref)
+    if not archive_format:
+        raise ValueError(f"Unsupported archive format of {ref}")
+
+    path = posixpath.normpath(path.replace("\\", "/")).strip("/") if path else ""
+    if path == ".":
+        path = ""
+
+    cached_digest = http_cache.get_cached_digest(ref, digest)
+    if cached_digest and (digest or offline):
+        logger.debug(f"Extracting {ref} from cache")
+        with open(http_cache.get_blob_path(cached_digest), "rb") as blob:
+            _extract(blob, archive_format, target, path)
+        return cached_digest
+    if offline:
+        raise OfflineError(f"{ref} is not cached")
+
+    with transport.get(ref) as res:
+        res.raise_for_status()
+        res.raw.decode_content = True
+        with http_cache.get_temporary_blob() as blob:
+            stream = _TeeReader(res.raw, blob)
+            try:
+                _extract(stream, archive_format, target, path)
+                stream.drain()
+            except Exception as e:
+                blob.close()
+                os.remove(blob.name)
+                raise e
+        archive_digest = http_cache.add_blob(ref, blob.name, res.headers)
+
+    if digest and archive_digest != digest:
+        raise ValueError(
+            f"Content of {ref} has changed, expected sha256 {digest} but got {archive_digest}"
+        )
+    return archive_digest
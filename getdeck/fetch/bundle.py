@@ -0,0 +1,84 @@
+import fnmatch
+import io
+import logging
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from urllib.parse import urljoin, urlparse
+
+from getdeck import configuration
+from getdeck.fetch import http_cache
+
+logger = logging.getLogger("deck")
+
+
+def get_index_urls(index: str, include: str = "*", offline: bool = False) -> List[str]:
+    """
+    :return: the urls listed in the index at the http(s) url index which match the glob include,
+    one url per line, relative urls are resolved against index and lines starting with # are ignored
+    """
+    content = io.BytesIO()
+    http_cache.download(index, content, offline=offline)
+
+    urls = []
+    for line in content.getvalue().decode("utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        url = urljoin(index, line)
+        if fnmatch.fnmatchcase(url, include) or fnmatch.fnmatchcase(line, include):
+            urls.append(url)
+    return urls
+
+
+def get_file_name(number: int, url: str, width: int) -> str:
+    # the number keeps the order of the urls when the files are rendered, it is padded to width
+    # digits, so the names sort like the numbers
+    name = posixpath.basename(urlparse(url).path) or "manifest"
+    if not name.endswith((".yaml", ".yml")):
+        name = f"{name}.yaml"
+    return f"{number:0{width}d}-{name}"
+
+
+def _download(
+    url: str, target: str, digest: Optional[str] = None, offline: bool = False
+) -> str:
+    with open(target, "wb") as target_file:
+        return http_cache.download(url, target_file, digest=digest, offline=offline)
+
+
+def download(
+    urls: List[str],
+    target: str,
+    workers: Optional[int] = None,
+    digests: List[Optional[str]] = None,
+    offline: bool = False,
+) -> List[str]:
+    """
+    download all urls concurrently into the folder target, digests are the expected sha256
+    digests of the contents
+
+    :return: the sha256 digests of the downloaded files in the order of urls
+    """
+    width = len(str(len(urls)))
+    paths = [
+        os.path.join(target, get_file_name(number, url, width))
+        for number, url in enumerate(urls)
+    ]
+    digests = digests or [None] * len(urls)
+    workers = workers or configuration.FETCH_WORKERS
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(_download, url, path, digest, offline)
+            for url, path, digest in zip(urls, paths, digests)
+        ]
+        results = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise RuntimeError(f"Cannot download {url}: {e}")
+    return results
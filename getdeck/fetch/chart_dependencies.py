@@ -0,0 +1,67 @@
+import logging
+from typing import Dict, Optional
+
+from semantic_version import Version
+
+from getdeck.fetch import charts, helm_repository, oci
+from getdeck.fetch.charts import Chart
+
+logger = logging.getLogger("deck")
+
+
+def get_dependency_name(dependency: dict) -> str:
+    return dependency.get("alias") or dependency["name"]
+
+
+def _is_exact_version(version: Optional[str]) -> bool:
+    try:
+        Version(str(version).removeprefix("v"))
+    except ValueError:
+        return False
+    return True
+
+
+def pull_dependencies(
+    chart_path: str,
+    locked: Optional[Dict[str, dict]] = None,
+    offline: bool = False,
+) -> Optional[Dict[str, Chart]]:
+    """
+    pull the dependencies of the chart at chart_path from their repositories into the chart cache,
+    locked pins the version and digest of dependencies by their name
+
+    :param offline: only use what is in the cache
+    :return: the pulled dependencies by name, None if helm has to resolve any of them itself
+    """
+    locked = locked or {}
+    pulled = {}
+    for dependency in charts.get_dependencies(chart_path):
+        name = get_dependency_name(dependency)
+        repository = dependency.get("repository") or ""
+        pin = locked.get(name) or {}
+        version = pin.get("version") or dependency.get("version")
+
+        if repository.startswith(("http://", "https://")):
+            chart = helm_repository.pull_chart(
+                repository,
+                dependency["name"],
+                version=version,
+                digest=pin.get("digest"),
+                offline=offline,
+            )
+        elif repository.startswith("oci://") and (
+            not version or _is_exact_version(version)
+        ):
+            chart = oci.pull_chart(
+                repository,
+                chart=dependency["name"],
+                version=version,
+                digest=pin.get("digest"),
+                offline=offline,
+            )
+        else:
+            # local charts, repositories added by name and version ranges of oci charts
+            logger.debug(f"Dependency {name} of {chart_path} is resolved by helm")
+            return None
+        pulled[name] = chart
+    return pulled
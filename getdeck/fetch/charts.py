@@ -0,0 +1,97 @@
+import logging
+import os
+import shutil
+import tempfile
+from typing import List, NamedTuple, Optional, Tuple
+
+from getdeck import cache, yaml_utils
+from getdeck.fetch import archive
+
+logger = logging.getLogger("deck")
+
+
+class Chart(NamedTuple):
+    path: str
+    version: Optional[str]  # the version of the chart, if known
+    digest: str  # the digest which pins the chart
+
+
+def get_version_args(helm_args: Optional[List[str]]) -> Tuple[Optional[str], bool]:
+    """
+    :return: the version given by --version and whether --devel is given in the helmArgs of a
+    source, which select the chart to pull like helm does
+    """
+    version, devel = None, False
+    helm_args = helm_args or []
+    for i, arg in enumerate(helm_args):
+        if arg == "--version" and i + 1 < len(helm_args):
+            version = helm_args[i + 1]
+        elif arg.startswith("--version="):
+            version = arg.split("=", 1)[1]
+        elif arg in ["--devel", "--devel=true"]:
+            devel = True
+        elif arg == "--devel=false":
+            devel = False
+    return version, devel
+
+
+def get_cache_directory() -> str:
+    return cache.charts.directory
+
+
+def _get_chart_folder(folder: str) -> str:
+    # a chart archive contains exactly one folder named after the chart
+    entries = [entry for entry in os.scandir(folder) if entry.is_dir()]
+    if len(entries) != 1:
+        raise RuntimeError(f"Invalid chart archive in {folder}")
+    return entries[0].path
+
+
+def get_chart(digest: str) -> Optional[str]:
+    """
+    :return: the folder of the extracted chart archive with the sha256 digest or None
+    """
+    chart_folder = os.path.join(get_cache_directory(), digest.removeprefix("sha256:"))
+    if not os.path.isdir(chart_folder):
+        return None
+    logger.debug(f"Using cached chart {digest}")
+    cache.charts.hit(chart_folder)
+    return _get_chart_folder(chart_folder)
+
+
+def extract_chart(blob_path: str, digest: str) -> str:
+    """
+    extract the chart archive at blob_path with the sha256 digest once
+
+    :return: the folder of the chart, it must not be modified
+    """
+    chart_folder = os.path.join(get_cache_directory(), digest.removeprefix("sha256:"))
+    cache.charts.miss()
+    temporary_folder = tempfile.mkdtemp(dir=get_cache_directory(), prefix=".tmp-")
+    try:
+        with open(blob_path, "rb") as blob:
+            archive.extract_tar(blob, temporary_folder)
+        os.rename(temporary_folder, chart_folder)
+    except OSError:
+        # the chart has been extracted concurrently
+        if not os.path.isdir(chart_folder):
+            raise
+    finally:
+        shutil.rmtree(temporary_folder, ignore_errors=True)
+    return _get_chart_folder(chart_folder)
+
+
+def get_dependencies(chart_path: str) -> List[dict]:
+    """
+    :return: the dependencies of the chart at chart_path from its Chart.yaml, or requirements.yaml
+    for charts of apiVersion v1
+    """
+    dependencies = []
+    for file_name in ["Chart.yaml", "requirements.yaml"]:
+        try:
+            with open(os.path.join(chart_path, file_name), "r") as chart_file:
+                content = yaml_utils.load(chart_file) or {}
+        except FileNotFoundError:
+            continue
+        dependencies.extend(content.get("dependencies") or [])
+    return dependencies
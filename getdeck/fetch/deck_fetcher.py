@@ -3,10 +3,11 @@ import os
 from typing import Optional
 
 import logging
-import tempfile
-import requests
 
+from getdeck.fetch import git_cache, http_cache
+from getdeck.fetch.errors import OfflineError
 from getdeck.fetch.types import DeckfileAux, TemporaryData
+from getdeck.workspace import get_workspace
 
 logger = logging.getLogger("deck")
 
@@ -17,14 +18,18 @@ class FetchError(Exception):
 
 class DeckFetchBehavior(ABC):
     @abstractmethod
-    def fetch(self, data: DeckfileAux) -> DeckfileAux:
+    def fetch(
+        self, data: DeckfileAux, deckfile_only: bool = False, offline: bool = False
+    ) -> DeckfileAux:
         pass
 
 
 class Git(DeckFetchBehavior):
-    def fetch(self, data: DeckfileAux) -> DeckfileAux:
+    def fetch(
+        self, data: DeckfileAux, deckfile_only: bool = False, offline: bool = False
+    ) -> DeckfileAux:
         try:
-            from git import Repo, GitError
+            from git import GitError
         except Exception as e:
             logger.debug(e)
             raise FetchError("Git import error.")
@@ -37,44 +42,38 @@ class Git(DeckFetchBehavior):
             ref = location
             rev = "HEAD"
 
-        temporary_folder = tempfile.mkdtemp()
-        data.path = temporary_folder
-        data.temporary_data = TemporaryData(data=temporary_folder, is_folder=True)
+        # a sparse checkout of the Deckfile only fetches a single blob
+        paths = [data.name] if deckfile_only else None
 
         try:
-            repo = Repo.clone_from(ref, temporary_folder)
-            repo.git.checkout(rev)
-        except GitError as e:
-            del data
+            checkout_folder = git_cache.checkout_registry.acquire(
+                url=ref, rev=rev, paths=paths, offline=offline
+            )
+        except (GitError, OfflineError) as e:
             raise FetchError(f"Cannot checkout {rev} from {ref}: {e}")
-        except Exception as e:
-            del data  # noqa: F821
-            raise e
 
-        return data  # noqa: F821
+        data.path = checkout_folder
+        data.temporary_data = TemporaryData(data=checkout_folder, is_checkout=True)
+        return data
 
 
 class Http(DeckFetchBehavior):
-    def fetch(self, data: DeckfileAux) -> DeckfileAux:
+    def fetch(
+        self, data: DeckfileAux, deckfile_only: bool = False, offline: bool = False
+    ) -> DeckfileAux:
         location = data.location
 
-        temporary_file = tempfile.NamedTemporaryFile(delete=False)
+        temporary_file = get_workspace().named_temporary_file()
         data.path = os.path.dirname(temporary_file.name)
         data.name = os.path.basename(temporary_file.name)
         data.temporary_data = TemporaryData(data=temporary_file.name, is_file=True)
 
         try:
-            logger.debug(f"Requesting {location}")
-            with requests.get(location, stream=True, timeout=10.0) as res:
-                res.raise_for_status()
-                for chunk in res.iter_content(chunk_size=4096):
-                    if chunk:
-                        temporary_file.write(chunk)
-                temporary_file.flush()
+            http_cache.download(location, temporary_file, offline=offline)
             temporary_file.close()
         except Exception as e:
             temporary_file.close()
-            del data
+            data.cleanup()
             raise FetchError(
                 f"Cannot download Deckfile from http(s) location {location}: {e}"
             )
@@ -94,8 +93,12 @@ class DeckFetcher:
     def fetch_behavior(self, fetch_behavior: DeckFetchBehavior) -> None:
         self._fetch_behavior = fetch_behavior
 
-    def fetch(self, data: DeckfileAux) -> DeckfileAux:
-        data = self._fetch_behavior.fetch(data=data)
+    def fetch(
+        self, data: DeckfileAux, deckfile_only: bool = False, offline: bool = False
+    ) -> DeckfileAux:
+        data = self._fetch_behavior.fetch(
+            data=data, deckfile_only=deckfile_only, offline=offline
+        )
         return data
 
 
@@ -105,7 +108,11 @@ def select_deck_fetch_behavior(location: str) -> Optional[DeckFetchBehavior]:
 
     location_lo = location.lower()
 
-    if location_lo.startswith("git") or location_lo.endswith(".git"):
+    if (
+        location_lo.startswith("git")
+        or location_lo.endswith(".git")
+        or location_lo.startswith("file://")
+    ):
         return Git()
 
     if location_lo.startswith("https") or location_lo.startswith("http"):
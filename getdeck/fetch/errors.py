@@ -0,0 +1,6 @@
+class OfflineError(Exception):
+    """
+    something is not in the local caches, but fetching it is not allowed
+    """
+
+    pass
@@ -1,16 +1,22 @@
 import logging
 import os
-from typing import List, Union
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import List, Optional, Union
 
 
+from getdeck import cache, configuration
+from getdeck.fetch import chart_dependencies, lock
 from getdeck.fetch.deck_fetcher import (
     DeckFetcher,
     DeckfileAux,
+    Http as HttpDeckFetchBehavior,
     select_deck_fetch_behavior,
 )
 from getdeck.fetch.types import DataAux
 from getdeck.fetch.utils import detect_deckfile, get_path_and_name
 from getdeck.deckfile.file import (
+    ArchiveSource,
+    BundleSource,
     DeckfileDeck,
     DirectorySource,
     FileSource,
@@ -21,6 +27,7 @@ from getdeck.deckfile.file import (
 
 from getdeck.deckfile.selector import deckfile_selector
 from getdeck.fetch.source_fetcher import (
+    Git,
     SourceAux,
     SourceFetcher,
     select_source_fetch_behavior,
@@ -34,12 +41,23 @@ class FetchError(Exception):
     pass
 
 
-def fetch_deck(data_aux: DataAux, location: str) -> DataAux:
+def fetch_deck(
+    data_aux: DataAux,
+    location: str,
+    deckfile_only: bool = False,
+    offline: bool = False,
+) -> DataAux:
+    """
+    deckfile_only: only the Deckfile itself is required, not the files next to it
+    offline: only use the local caches
+    """
     deckfile_aux = DeckfileAux(location=location)
     fetch_behavior = select_deck_fetch_behavior(location=location)
     if fetch_behavior:
         deck_fetcher = DeckFetcher(fetch_behavior=fetch_behavior)
-        deckfile_aux = deck_fetcher.fetch(data=deckfile_aux)
+        deckfile_aux = deck_fetcher.fetch(
+            data=deckfile_aux, deckfile_only=deckfile_only, offline=offline
+        )
     else:
         # local path and name
         path, name = get_path_and_name(location=location)
@@ -57,12 +75,22 @@ def fetch_source(
         DirectorySource,
         HelmSource,
         KustomizeSource,
+        ArchiveSource,
+        BundleSource,
     ],
     source_fetcher: SourceFetcher = None,
+    lock: Optional[dict] = None,
+    offline: bool = False,
 ) -> SourceAux:
+    """
+    lock: the entry of the source in deck.lock, it pins the revision to fetch
+    offline: only use the local caches
+    """
     ref = getattr(source, "ref", None)
     source_aux = SourceAux(location=ref)
     source_aux.source = source  # does not work during SourceAux initialization
+    source_aux.lock = lock
+    source_aux.offline = offline
 
     fetch_behavior = select_source_fetch_behavior(source=source)
     if not fetch_behavior:
@@ -75,33 +103,130 @@ def fetch_source(
 
     try:
         source_dict = source.dict()
-        source_aux = source_fetcher.fetch(data=source_aux, **source_dict)
+        source_aux = source_fetcher.fetch(
+            data=source_aux, lock=lock, offline=offline, **source_dict
+        )
+        if isinstance(source, HelmSource) and isinstance(fetch_behavior, Git):
+            source_aux = fetch_chart_dependencies(
+                source_aux, lock=lock, offline=offline
+            )
     except Exception as e:
         logger.debug(str(e))
-        del source_aux
+        source_aux.cleanup()
         raise FetchError(f"Source fetching error: {str(e)}")
 
-    return source_aux  # noqa: F821
+    return source_aux
+
+
+def fetch_chart_dependencies(
+    source_aux: SourceAux, lock: Optional[dict] = None, offline: bool = False
+) -> SourceAux:
+    """
+    pull the dependencies of a helm chart from git into the cache, so helm does not need to
+    update them when rendering
+    """
+    chart_path = os.path.join(source_aux.path, source_aux.name or "")
+    dependencies = chart_dependencies.pull_dependencies(
+        chart_path, locked=(lock or {}).get("dependencies"), offline=offline
+    )
+    if dependencies is None:
+        return source_aux
+
+    source_aux.chart_dependencies = [chart.path for chart in dependencies.values()]
+    if dependencies:
+        source_aux.lock["dependencies"] = {
+            name: {"version": chart.version, "digest": chart.digest}
+            for name, chart in dependencies.items()
+        }
+    return source_aux
 
 
-def fetch_all_sources(deck: DeckfileDeck) -> List[SourceAux]:
-    source_fetcher = SourceFetcher(fetch_behavior=None)
+def fetch_all_sources(
+    deck: DeckfileDeck,
+    workers: int = configuration.FETCH_WORKERS,
+    deck_lock: Optional[dict] = None,
+    offline: bool = False,
+) -> List[SourceAux]:
+    return fetch_sources(
+        deck.sources, workers=workers, deck_lock=deck_lock, offline=offline
+    )
 
-    source_auxs = []
-    for source in deck.sources:
+
+def fetch_sources(
+    sources: List[
+        Union[
+            InlineSource,
+            FileSource,
+            DirectorySource,
+            HelmSource,
+            KustomizeSource,
+            ArchiveSource,
+            BundleSource,
+        ]
+    ],
+    workers: int = configuration.FETCH_WORKERS,
+    deck_lock: Optional[dict] = None,
+    offline: bool = False,
+) -> List[SourceAux]:
+    def _fetch_source(source) -> SourceAux:
         ref = getattr(source, "ref", None)
         logger.info(f"Fetching {source.__class__.__name__}: {ref or 'no ref'}")
-        source_aux = fetch_source(source=source, source_fetcher=source_fetcher)
-        source_auxs.append(source_aux)
+        # every fetch uses its own SourceFetcher, as its behavior differs per source
+        return fetch_source(
+            source=source,
+            lock=lock.get_source_lock(deck_lock, source),
+            offline=offline,
+        )
+
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = [executor.submit(_fetch_source, source) for source in sources]
 
-    return source_auxs
+    if offline:
+        # report everything which is missing in the local caches at once
+        wait(futures)
+        executor.shutdown()
+        errors = [str(future.exception()) for future in futures if future.exception()]
+        if errors:
+            _cleanup_fetched(futures)
+            missing = "\n".join(f" - {error}" for error in errors)
+            raise FetchError(f"Missing in the local caches:\n{missing}")
+        return [future.result() for future in futures]
+
+    wait(futures, return_when=FIRST_EXCEPTION)
+
+    for future in futures:
+        if future.done() and future.exception():
+            # do not start any of the remaining fetches
+            executor.shutdown(wait=False, cancel_futures=True)
+            _cleanup_fetched(futures)
+            raise future.exception()
+
+    executor.shutdown()
+    return [future.result() for future in futures]
+
+
+def _cleanup_fetched(futures) -> None:
+    # fetches which are still running are cleaned up as soon as they are done
+    def _cleanup(future):
+        if not future.cancelled() and not future.exception():
+            future.result().cleanup()
+
+    for future in futures:
+        future.add_done_callback(_cleanup)
 
 
 def fetch_data(
-    location: str, deck_name: str = None, fetch_sources_flag: bool = True
+    location: str,
+    deck_name: str = None,
+    fetch_sources_flag: bool = True,
+    workers: int = configuration.FETCH_WORKERS,
+    offline: bool = False,
+    all_decks: bool = False,
 ) -> DataAux:
     """
-    delete returned DataAux to clean up temporary resources
+    use the returned DataAux as a context manager to clean up its temporary data
+    offline: only use the local caches, fail if anything is missing in them
+    all_decks: fetch the sources of all decks instead of deck_name, each source only once
     """
 
     # info
@@ -111,28 +236,82 @@ def fetch_data(
 
     logger.info(f"Reading Deckfile: {display_location or '.'}")
 
-    # fetch deck
     data_aux = DataAux()
-    data_aux = fetch_deck(data_aux=data_aux, location=location)
+    try:
+        return _fetch_data(
+            data_aux,
+            location,
+            display_location=display_location,
+            deck_name=deck_name,
+            fetch_sources_flag=fetch_sources_flag,
+            workers=workers,
+            offline=offline,
+            all_decks=all_decks,
+        )
+    except BaseException:
+        data_aux.cleanup()
+        raise
+
+
+def _fetch_data(
+    data_aux: DataAux,
+    location: str,
+    display_location: Optional[str],
+    deck_name: Optional[str],
+    fetch_sources_flag: bool,
+    workers: int,
+    offline: bool,
+    all_decks: bool,
+) -> DataAux:
+    # fetch deck
+    data_aux = fetch_deck(
+        data_aux=data_aux,
+        location=location,
+        deckfile_only=not fetch_sources_flag,
+        offline=offline,
+    )
 
     # validate
     file_detected = os.path.join(data_aux.deckfile_aux.path, data_aux.deckfile_aux.name)
     if not os.path.isfile(file_detected):
         logger.debug(f"Absolute file location: {file_detected}")
-        del data_aux
         raise RuntimeError(
             f"Cannot identify Deckfile at location: {display_location or '.'}"
         )
 
     deckfile = deckfile_selector.get(file_detected)
+    deckfile.set_offline(offline)
+    if isinstance(select_deck_fetch_behavior(location=location), HttpDeckFetchBehavior):
+        deckfile.set_url(location)
     data_aux.deckfile = deckfile
 
     # fetch sources
     if not fetch_sources_flag:
         return data_aux
 
-    deck = deckfile.get_deck(deck_name)
-    source_auxs = fetch_all_sources(deck=deck)
+    if all_decks:
+        sources = {}
+        for deck in deckfile.get_decks():
+            for source in deck.sources:
+                sources.setdefault(lock.get_source_key(source), source)
+        sources = list(sources.values())
+    else:
+        sources = deckfile.get_deck(deck_name).sources
+
+    deck_lock = lock.read_lock(data_aux.deckfile_aux)
+    if deck_lock:
+        logger.info(f"Using {configuration.LOCK_FILE}")
+    source_auxs = fetch_sources(
+        sources, workers=workers, deck_lock=deck_lock, offline=offline
+    )
     data_aux.source_auxs = source_auxs
 
+    # keep the shared cache within its size, what has just been fetched is not evicted
+    try:
+        evicted = cache.prune_periodically()
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} entries from the cache")
+    except Exception as e:
+        logger.debug(f"Cannot prune the cache: {e}")
+
     return data_aux
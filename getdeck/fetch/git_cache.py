@@ -0,0 +1,519 @@
+import hashlib
+import logging
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from getdeck import cache, configuration
+from getdeck.fetch.errors import OfflineError
+from getdeck.workspace import get_workspace
+
+logger = logging.getLogger("deck")
+
+
+def get_cache_directory() -> str:
+    return cache.git.directory
+
+
+def normalize_url(url: str) -> str:
+    url = url.strip().rstrip("/")
+    if url.lower().endswith(".git") and not os.path.exists(url):
+        url = url[:-4]
+    return url
+
+
+def get_mirror_path(url: str) -> str:
+    key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_directory(), key)
+
+
+def get_local_path(url: str) -> Optional[str]:
+    """
+    :return: the path of a repository on this machine or None for remote urls
+    """
+    if url.lower().startswith("file://"):
+        path = url.split("://", 1)[1]
+    else:
+        path = os.path.expanduser(url)
+
+    if os.path.isdir(path):
+        return os.path.abspath(path)
+    return None
+
+
+def get_mirror_lock(url: str) -> cache.FileLock:
+    # serializes fetches and checkouts of the same mirror, also across processes
+    return cache.git.lock(os.path.basename(get_mirror_path(url)))
+
+
+def get_sparse_pattern(path: Optional[str]) -> Optional[str]:
+    """
+    :return: the sparse-checkout pattern for path or None if path covers the whole repository
+    """
+    if not path:
+        return None
+    path = posixpath.normpath(path.replace("\\", "/")).strip("/")
+    if path in [".", ""] or path.startswith(".."):
+        return None
+    return f"/{path}"
+
+
+def _clone_mirror(url: str, path: str) -> None:
+    from git import GitCommandError, Repo
+
+    try:
+        # blobless: file contents are only fetched when a checkout needs them
+        Repo.clone_from(url, path, mirror=True, filter="blob:none")
+    except GitCommandError as e:
+        logger.debug(
+            f"Blobless clone of {url} failed, falling back to a full clone: {e}"
+        )
+        shutil.rmtree(path, ignore_errors=True)
+        Repo.clone_from(url, path, mirror=True)
+
+
+def update_mirror(url: str):
+    """
+    clone a bare mirror of url into the cache or fetch the latest objects into an existing one
+    """
+    with get_mirror_lock(url):
+        return _update_mirror(url)
+
+
+def _update_mirror(url: str):
+    from git import Repo
+
+    mirror_path = get_mirror_path(url)
+    if os.path.isdir(mirror_path):
+        logger.debug(f"Updating git mirror {mirror_path} of {url}")
+        cache.git.hit(mirror_path)
+        repo = Repo(mirror_path)
+        repo.git.fetch("--prune", "origin")
+        # remove worktrees of earlier runs which are gone already
+        repo.git.worktree("prune")
+        return repo
+
+    logger.debug(f"Creating git mirror {mirror_path} of {url}")
+    cache.git.miss()
+    temporary_folder = tempfile.mkdtemp(dir=get_cache_directory(), prefix=".tmp-")
+    try:
+        _clone_mirror(url, temporary_folder)
+    except Exception as e:
+        shutil.rmtree(temporary_folder, ignore_errors=True)
+        raise e
+
+    try:
+        os.replace(temporary_folder, mirror_path)
+    except OSError:
+        # another process published this mirror in the meantime
+        shutil.rmtree(temporary_folder, ignore_errors=True)
+
+    return Repo(mirror_path)
+
+
+def _get_environment(offline: bool) -> Optional[Dict[str, str]]:
+    # missing blobs of a blobless mirror are not fetched lazily (git 2.44+)
+    return {"GIT_NO_LAZY_FETCH": "1"} if offline else None
+
+
+def _write_sparse_patterns(
+    worktree, patterns: List[str], offline: bool = False
+) -> None:
+    # the sparse-checkout file is private to this worktree; core.sparseCheckout is only
+    # passed to the command in order to leave the mirror's configuration untouched
+    git_dir = worktree.git.rev_parse("--absolute-git-dir")
+    os.makedirs(os.path.join(git_dir, "info"), exist_ok=True)
+    with open(os.path.join(git_dir, "info", "sparse-checkout"), "w") as sparse_file:
+        sparse_file.write("\n".join(patterns) + "\n")
+    worktree.git(c="core.sparseCheckout=true").read_tree(
+        "-mu", "HEAD", env=_get_environment(offline)
+    )
+
+
+def _add_worktree(
+    repo, rev: str, target: str, patterns: List[str] = None, offline: bool = False
+) -> None:
+    from git import Repo
+
+    if not patterns:
+        repo.git.worktree("add", "--detach", target, rev, env=_get_environment(offline))
+        return
+
+    repo.git.worktree("add", "--no-checkout", "--detach", target, rev)
+    _write_sparse_patterns(Repo(target), patterns, offline=offline)
+
+
+def _add_shared_clone(repo, rev: str, target: str, patterns: List[str] = None):
+    # objects are borrowed from the local repository (alternates) rather than copied, and the
+    # local repository is not modified, as opposed to adding a worktree to it
+    clone = repo.clone(target, shared=True, no_checkout=True)
+    clone.git.update_ref("--no-deref", "HEAD", rev)
+    if patterns:
+        _write_sparse_patterns(clone, patterns)
+    else:
+        clone.git.read_tree("-mu", "HEAD")
+
+
+def _add_checkout(
+    repo,
+    rev: str,
+    target: str,
+    patterns: List[str] = None,
+    local: bool = False,
+    offline: bool = False,
+) -> None:
+    if local:
+        _add_shared_clone(repo, rev, target, patterns)
+    else:
+        _add_worktree(repo, rev, target, patterns, offline=offline)
+
+
+def _get_sparse_patterns(paths: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    :return: the sparse-checkout patterns for paths or None if a full checkout is required
+    """
+    patterns = [get_sparse_pattern(path) for path in paths or []]
+    if patterns and all(patterns):
+        return patterns
+    return None
+
+
+def get_repository(url: str):
+    """
+    :return: the repository on this machine for local urls, the updated mirror otherwise
+    """
+    from git import Repo
+
+    local_path = get_local_path(url)
+    if local_path:
+        return Repo(local_path)
+    return update_mirror(url)
+
+
+def get_cached_repository(url: str):
+    """
+    :return: the mirror of url in the cache as it is or None if there is none
+    """
+    from git import Repo
+
+    mirror_path = get_mirror_path(url)
+    if not os.path.isdir(mirror_path):
+        return None
+    cache.git.hit(mirror_path)
+    return Repo(mirror_path)
+
+
+def is_commit_sha(rev: Optional[str]) -> bool:
+    return bool(rev) and re.fullmatch(r"[0-9a-f]{40}", rev) is not None
+
+
+def is_abbreviated_sha(rev: Optional[str]) -> bool:
+    # git accepts commits by the first 7 characters of their sha or more
+    return bool(rev) and re.fullmatch(r"[0-9a-f]{7,40}", rev) is not None
+
+
+def has_commit(repo, rev: str) -> bool:
+    from git import GitCommandError
+
+    try:
+        repo.git.cat_file("-e", f"{rev}^{{commit}}")
+    except GitCommandError:
+        return False
+    return True
+
+
+def get_revision(folder: str) -> str:
+    """
+    :return: the sha of the commit checked out in folder
+    """
+    from git import Repo
+
+    return Repo(folder).head.commit.hexsha
+
+
+def resolve_submodule_url(url: str, submodule_url: str) -> str:
+    """
+    :return: the submodule url, relative ones (./, ../) are resolved against the url of its
+    superproject like git does
+    """
+    if not submodule_url.startswith(("./", "../")):
+        return submodule_url
+
+    base = url.rstrip("/")
+    for part in submodule_url.split("/"):
+        if part == "..":
+            separator = "/" if "/" in base.split(":", 1)[-1] else ":"
+            base = base.rsplit(separator, 1)[0]
+        elif part and part != ".":
+            base = f"{base}/{part}"
+    return base
+
+
+def get_submodules(repo) -> List[Tuple[str, str, str]]:
+    """
+    :return: (name, path, url) of each submodule declared in the checked out revision
+    """
+    from git import GitCommandError
+
+    try:
+        # read from the revision, the file itself may not be part of a sparse checkout
+        output = repo.git.config(
+            "--blob", "HEAD:.gitmodules", "--get-regexp", r"^submodule\..*\.(path|url)$"
+        )
+    except GitCommandError:
+        return []
+
+    submodules: Dict[str, Dict[str, str]] = {}
+    for line in output.splitlines():
+        key, value = line.split(" ", 1)
+        name, attribute = key.split(".", 1)[1].rsplit(".", 1)
+        submodules.setdefault(name, {})[attribute] = value
+    return [
+        (name, submodule["path"], submodule["url"])
+        for name, submodule in submodules.items()
+        if "path" in submodule and "url" in submodule
+    ]
+
+
+class _Checkout:
+    def __init__(self, folder: str, patterns: Optional[List[str]]):
+        self.folder = folder
+        self.patterns = patterns
+        self.references = 0
+
+
+class CheckoutRegistry:
+    """
+    Shares one checkout per (normalized url, resolved revision) among all fetches of a run,
+    the checkout is removed once the last reference is released
+    """
+
+    def __init__(self):
+        self._checkouts: Dict[Tuple[str, str], _Checkout] = {}
+        self._updated: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _get_repository(
+        self, url: str, rev: Optional[str] = None, offline: bool = False
+    ):
+        from git import Repo
+
+        if offline:
+            local_path = get_local_path(url)
+            repo = Repo(local_path) if local_path else get_cached_repository(url)
+            if repo is None:
+                raise OfflineError(f"Git repository {url} is not cached")
+            return repo
+
+        mirror_path = get_mirror_path(url)
+        with self._lock:
+            updated = mirror_path in self._updated
+        if updated:
+            return Repo(mirror_path)
+
+        # a commit pinned by its sha (e.g. in deck.lock) does not require to fetch the mirror
+        if is_commit_sha(rev) and not get_local_path(url):
+            repo = get_cached_repository(url)
+            if repo is not None and has_commit(repo, rev):
+                logger.debug(f"Using cached commit {rev} of {url}")
+                return repo
+
+        repo = get_repository(url)
+        if not get_local_path(url):
+            with self._lock:
+                self._updated.add(mirror_path)
+        return repo
+
+    def _add_submodules(self, folder: str, url: str, offline: bool = False) -> None:
+        """
+        check out the submodules of the checkout in folder from their own (cached) mirrors,
+        in parallel and recursively
+        """
+        from git import Repo
+
+        def _add_submodule(submodule_url: str, revision: str, target: str):
+            submodule_url = resolve_submodule_url(url, submodule_url)
+            logger.debug(f"Checking out submodule {submodule_url}@{revision}")
+            with get_mirror_lock(submodule_url):
+                repo = self._get_repository(submodule_url, revision, offline=offline)
+                _add_checkout(
+                    repo,
+                    revision,
+                    target,
+                    local=bool(get_local_path(submodule_url)),
+                    offline=offline,
+                )
+            self._add_submodules(target, submodule_url, offline=offline)
+
+        repo = Repo(folder)
+        submodules = []
+        for _, path, submodule_url in get_submodules(repo):
+            target = os.path.join(folder, *path.split("/"))
+            # submodules outside of a sparse checkout or checked out already are skipped
+            if not os.path.isdir(target) or os.listdir(target):
+                continue
+            # the commit the superproject refers to
+            entry = repo.git.ls_tree("HEAD", "--", path).split()
+            if len(entry) < 3 or entry[1] != "commit":
+                continue
+            submodules.append((submodule_url, entry[2], target))
+
+        if not submodules:
+            return
+        with ThreadPoolExecutor(max_workers=configuration.FETCH_WORKERS) as executor:
+            futures = [
+                executor.submit(_add_submodule, *submodule) for submodule in submodules
+            ]
+            for future in futures:
+                future.result()
+
+    def acquire(
+        self,
+        url: str,
+        rev: Optional[str],
+        paths: List[str] = None,
+        submodules: bool = False,
+        offline: bool = False,
+    ) -> str:
+        """
+        :return: the folder of a checkout of rev of url which contains at least paths
+        (including the submodules below them, if requested)
+        :param offline: only check out what is in the cache
+        """
+        from git import GitCommandError
+
+        patterns = _get_sparse_patterns(paths)
+        with get_mirror_lock(url):
+            repo = self._get_repository(url, rev, offline=offline)
+            try:
+                revision = repo.git.rev_parse(f"{rev or 'HEAD'}^{{commit}}")
+            except GitCommandError as e:
+                if offline:
+                    raise OfflineError(
+                        f"Revision {rev or 'HEAD'} of {url} is not cached"
+                    )
+                raise e
+            key = (normalize_url(url), revision)
+
+            with self._lock:
+                checkout = self._checkouts.get(key)
+
+            if checkout is None:
+                folder = get_workspace().mkdtemp(prefix="checkout-")
+                try:
+                    _add_checkout(
+                        repo,
+                        revision,
+                        folder,
+                        patterns,
+                        local=bool(get_local_path(url)),
+                        offline=offline,
+                    )
+                except Exception as e:
+                    shutil.rmtree(folder, ignore_errors=True)
+                    if offline:
+                        raise OfflineError(
+                            f"Files of {url}@{revision} are not cached: {e}"
+                        )
+                    raise e
+                checkout = _Checkout(folder=folder, patterns=patterns)
+                with self._lock:
+                    self._checkouts[key] = checkout
+            else:
+                self._widen(checkout, patterns, offline=offline)
+
+            with self._lock:
+                checkout.references += 1
+
+        # submodules lock their own mirrors, which may be this one or one of an ancestor
+        if submodules:
+            try:
+                self._add_submodules(checkout.folder, url, offline=offline)
+            except Exception as e:
+                self.release(checkout.folder)
+                raise e
+        logger.debug(f"Using checkout {checkout.folder} of {url}@{revision}")
+        return checkout.folder
+
+    @staticmethod
+    def _widen(
+        checkout: _Checkout, patterns: Optional[List[str]], offline: bool = False
+    ) -> None:
+        from git import Repo
+
+        if checkout.patterns is None:
+            return
+        # widen the existing sparse checkout
+        if patterns is None:
+            checkout.patterns = None
+            _write_sparse_patterns(Repo(checkout.folder), ["/*"], offline=offline)
+        elif not set(patterns).issubset(checkout.patterns):
+            checkout.patterns = sorted(set(checkout.patterns + patterns))
+            _write_sparse_patterns(
+                Repo(checkout.folder), checkout.patterns, offline=offline
+            )
+
+    def get_checkout_folder(self, path: str) -> Optional[str]:
+        """
+        :return: the folder of the checkout of this run which contains path, None if there is none
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            for checkout in self._checkouts.values():
+                folder = os.path.abspath(checkout.folder)
+                if path == folder or path.startswith(folder + os.sep):
+                    return checkout.folder
+        return None
+
+    def widen(self, folder: str, paths: List[str], offline: bool = False) -> bool:
+        """
+        add paths to the checkout at folder, e.g. files referenced by a sparsely checked out
+        Deckfile, paths outside of the checkout are ignored
+
+        :return: False if folder is no checkout of this run
+        """
+        with self._lock:
+            for (url, _), checkout in self._checkouts.items():
+                if checkout.folder == folder:
+                    break
+            else:
+                return False
+
+        # a path outside of the checkout must not widen it to the whole repository
+        paths = [
+            path
+            for path in paths
+            if posixpath.normpath(path.replace("\\", "/")).split("/")[0] != ".."
+        ]
+        if not paths:
+            return True
+        with get_mirror_lock(url):
+            self._widen(checkout, _get_sparse_patterns(paths), offline=offline)
+        return True
+
+    def release(self, folder: str) -> None:
+        with self._lock:
+            for key, checkout in self._checkouts.items():
+                if checkout.folder == folder:
+                    break
+            else:
+                return
+
+            checkout.references -= 1
+            if checkout.references > 0:
+                return
+            del self._checkouts[key]
+
+            # the run is over, mirrors are fetched again with the next one
+            if not self._checkouts:
+                self._updated.clear()
+
+        get_workspace().remove(folder)
+
+
+checkout_registry = CheckoutRegistry()
@@ -0,0 +1,100 @@
+import io
+import logging
+from typing import Optional
+from urllib.parse import urljoin
+
+from semantic_version import NpmSpec, Version
+
+from getdeck import yaml_utils
+from getdeck.fetch import charts, http_cache
+from getdeck.fetch.charts import Chart
+
+logger = logging.getLogger("deck")
+
+
+def get_index_url(ref: str) -> str:
+    return f"{ref.rstrip('/')}/index.yaml"
+
+
+def get_version_spec(version: str) -> Optional[NpmSpec]:
+    """
+    :return: the spec of a version constraint as used in Chart.yaml, e.g. ~1.2.0 or >=1.0, <2.0
+    """
+    try:
+        return NpmSpec(" ".join(version.replace(",", " ").split()))
+    except ValueError:
+        return None
+
+
+def resolve_chart(
+    ref: str,
+    chart: str,
+    version: Optional[str] = None,
+    devel: bool = False,
+    offline: bool = False,
+) -> dict:
+    """
+    :param devel: consider prereleases if no version is given, like helm's --devel
+    :return: the entry of chart in the index of the helm repository ref, the latest stable version
+    unless version is given, which may also be a version constraint
+    """
+    content = io.BytesIO()
+    http_cache.download(get_index_url(ref), content, offline=offline)
+    index = yaml_utils.load(content.getvalue()) or {}
+
+    entries = (index.get("entries") or {}).get(chart) or []
+    spec = get_version_spec(version) if version else None
+    candidates = []
+    for entry in entries:
+        try:
+            entry_version = Version(str(entry.get("version", "")).removeprefix("v"))
+        except ValueError:
+            continue
+        if version and entry.get("version") == version:
+            candidates = [(entry_version, entry)]
+            break
+        if spec is not None and entry_version in spec:
+            candidates.append((entry_version, entry))
+        elif not version and (devel or not entry_version.prerelease):
+            candidates.append((entry_version, entry))
+
+    if not candidates:
+        raise RuntimeError(f"Cannot find chart {chart} {version or ''} in {ref}")
+    _, entry = max(candidates, key=lambda candidate: candidate[0])
+    if not entry.get("urls"):
+        raise RuntimeError(f"Chart {chart} {entry['version']} of {ref} has no urls")
+    return entry
+
+
+def pull_chart(
+    ref: str,
+    chart: str,
+    version: Optional[str] = None,
+    digest: Optional[str] = None,
+    devel: bool = False,
+    offline: bool = False,
+) -> Chart:
+    """
+    pull chart from the helm repository ref into the cache, a chart pinned by version and
+    digest is used from the cache without any request
+
+    :param devel: consider prereleases if no version is given
+    :param offline: only use what is in the cache
+    :return: the chart, its folder must not be modified
+    """
+    if version and digest:
+        chart_path = charts.get_chart(digest)
+        if chart_path:
+            return Chart(path=chart_path, version=version, digest=digest)
+
+    entry = resolve_chart(ref, chart, version=version, devel=devel, offline=offline)
+    url = urljoin(f"{ref.rstrip('/')}/", entry["urls"][0])
+    digest = http_cache.fetch(
+        url, digest=digest or entry.get("digest"), offline=offline
+    )
+    logger.debug(f"Resolved chart {chart} {entry['version']} of {ref} to {url}")
+
+    chart_path = charts.get_chart(digest) or charts.extract_chart(
+        http_cache.get_blob_path(digest), digest
+    )
+    return Chart(path=chart_path, version=entry["version"], digest=digest)
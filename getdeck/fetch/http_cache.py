@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import BinaryIO, Optional
+
+import requests
+
+from getdeck import cache
+from getdeck.fetch import transport
+from getdeck.fetch.errors import OfflineError
+
+logger = logging.getLogger("deck")
+
+
+def get_cache_directory() -> str:
+    cache_directory = cache.http.directory
+    os.makedirs(os.path.join(cache_directory, "meta"), exist_ok=True)
+    return cache_directory
+
+
+def _get_meta_path(url: str) -> str:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_directory(), "meta", f"{key}.json")
+
+
+def get_blob_path(digest: str) -> str:
+    return os.path.join(get_cache_directory(), "blobs", digest)
+
+
+def _read_meta(url: str) -> Optional[dict]:
+    try:
+        with open(_get_meta_path(url), "r") as meta_file:
+            meta = json.load(meta_file)
+    except (OSError, ValueError):
+        return None
+
+    if not os.path.isfile(get_blob_path(meta.get("digest", ""))):
+        return None
+    return meta
+
+
+def _write_meta(url: str, meta: dict) -> None:
+    with cache.atomic_write(_get_meta_path(url), "w") as meta_file:
+        json.dump(meta, meta_file)
+
+
+def _conditional_headers(meta: Optional[dict]) -> dict:
+    headers = {}
+    if not meta:
+        return headers
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def get_cached_digest(url: str, digest: Optional[str] = None) -> Optional[str]:
+    """
+    :return: the digest of the cached content with digest or, without digest, of the content of
+    url which has been downloaded last, None if it is not cached
+    """
+    if digest:
+        if not re.fullmatch(r"[0-9a-f]{64}", digest):
+            raise ValueError(f"Invalid sha256 digest {digest}")
+        return digest if os.path.isfile(get_blob_path(digest)) else None
+    meta = _read_meta(url)
+    return meta["digest"] if meta else None
+
+
+def fetch(url: str, digest: Optional[str] = None, offline: bool = False) -> str:
+    """
+    make sure the content of url is in the cache, an unchanged response (304) is served from the
+    cache, as is the content with the expected sha256 digest without any request
+
+    :param offline: only serve from the cache
+    :return: the sha256 digest of the content
+    """
+    cached_digest = get_cached_digest(url, digest)
+    if cached_digest and (digest or offline):
+        logger.debug(f"Serving {url} from cache")
+        cache.http.hit(get_blob_path(cached_digest))
+        return cached_digest
+    if offline:
+        raise OfflineError(f"{url} is not cached")
+
+    expected_digest = digest
+    meta = _read_meta(url)
+
+    with transport.get(url, headers=_conditional_headers(meta)) as res:
+        if res.status_code == 304 and meta:
+            logger.debug(f"Not modified, serving {url} from cache")
+            digest = meta["digest"]
+            cache.http.hit(get_blob_path(digest))
+        else:
+            res.raise_for_status()
+            digest = _store(url, res)
+            cache.http.miss()
+
+    if expected_digest and digest != expected_digest:
+        raise ValueError(
+            f"Content of {url} has changed, expected sha256 {expected_digest} but got {digest}"
+        )
+    return digest
+
+
+def download(
+    url: str, target: BinaryIO, digest: Optional[str] = None, offline: bool = False
+) -> str:
+    """
+    write the content of url to target, see fetch
+
+    :return: the sha256 digest of the content
+    """
+    digest = fetch(url, digest=digest, offline=offline)
+    _copy_blob(digest, target)
+    return digest
+
+
+def get_temporary_blob() -> BinaryIO:
+    """
+    :return: a new file in the cache to be added with add_blob
+    """
+    blobs = os.path.join(get_cache_directory(), "blobs")
+    return tempfile.NamedTemporaryFile(
+        dir=blobs, prefix=".tmp-", delete=False, buffering=transport.BUFFER_SIZE
+    )
+
+
+def add_blob(url: str, path: str, headers: dict = None) -> str:
+    """
+    move the file at path into the cache as the content of url
+
+    :return: the sha256 digest of the content
+    """
+    # the blob is stored content-addressed, so the metadata is updated atomically
+    digest = _get_digest(path)
+    os.replace(path, get_blob_path(digest))
+
+    headers = headers or {}
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    _write_meta(url, {"digest": digest, "etag": etag, "last_modified": last_modified})
+    return digest
+
+
+def _store(url: str, res: requests.Response) -> str:
+    with get_temporary_blob() as blob:
+        try:
+            transport.write_response(url, res, blob)
+        except Exception as e:
+            blob.close()
+            os.remove(blob.name)
+            raise e
+    return add_blob(url, blob.name, res.headers)
+
+
+def _get_digest(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as blob:
+        for chunk in iter(lambda: blob.read(transport.CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _copy_blob(digest: str, target: BinaryIO) -> None:
+    with open(get_blob_path(digest), "rb") as blob:
+        shutil.copyfileobj(blob, target, transport.BUFFER_SIZE)
+    target.flush()
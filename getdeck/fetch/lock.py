@@ -0,0 +1,60 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from getdeck import configuration, yaml_utils
+from getdeck.cache import atomic_write
+from getdeck.fetch.types import DeckfileAux
+
+logger = logging.getLogger("deck")
+
+LOCK_VERSION = "1"
+LOCK_HEADER = "# generated by 'deck lock', do not edit\n"
+
+
+def get_source_key(source) -> str:
+    """
+    :return: the key of source in deck.lock, it changes with the definition of the source
+    """
+    definition = json.dumps(source.dict(), sort_keys=True)
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()[:16]
+
+
+def get_lock_path(deckfile_aux: DeckfileAux) -> str:
+    return os.path.join(deckfile_aux.path, configuration.LOCK_FILE)
+
+
+def read_lock(deckfile_aux: DeckfileAux) -> Optional[dict]:
+    """
+    :return: the deck.lock next to the Deckfile or None if there is none
+    """
+    lock_path = get_lock_path(deckfile_aux)
+    if not os.path.isfile(lock_path):
+        return None
+
+    with open(lock_path, "r") as lock_file:
+        deck_lock = yaml_utils.load(lock_file)
+    if not isinstance(deck_lock, dict) or str(deck_lock.get("version")) != LOCK_VERSION:
+        logger.warning(f"Ignoring {lock_path}, its format is not supported")
+        return None
+    return deck_lock
+
+
+def write_lock(deckfile_aux: DeckfileAux, sources: Dict[str, dict]) -> str:
+    lock_path = get_lock_path(deckfile_aux)
+    deck_lock = {"version": LOCK_VERSION, "sources": sources}
+    with atomic_write(lock_path, "w") as lock_file:
+        lock_file.write(LOCK_HEADER)
+        yaml_utils.dump(deck_lock, lock_file, sort_keys=True)
+    return lock_path
+
+
+def get_source_lock(deck_lock: Optional[dict], source) -> Optional[dict]:
+    """
+    :return: the entry of source in deck_lock, None if it is not locked
+    """
+    if not deck_lock:
+        return None
+    return (deck_lock.get("sources") or {}).get(get_source_key(source))
@@ -0,0 +1,353 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+from semantic_version import Version
+
+from getdeck import cache
+from getdeck.fetch import charts, transport
+from getdeck.fetch.charts import Chart
+from getdeck.fetch.errors import OfflineError
+
+logger = logging.getLogger("deck")
+
+MANIFEST_MEDIA_TYPES = [
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+]
+CHART_LAYER_MEDIA_TYPE = "application/vnd.cncf.helm.chart.content.v1.tar+gzip"
+
+_tokens: Dict[tuple, str] = {}
+_tokens_lock = threading.Lock()
+
+
+class OciError(Exception):
+    pass
+
+
+class Reference(NamedTuple):
+    registry: str
+    repository: str
+    tag: Optional[str] = None
+    digest: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        # registries on the local machine are usually served without tls (as with docker)
+        host = self.registry.split(":")[0]
+        scheme = "http" if host in ["localhost", "127.0.0.1"] else "https"
+        return f"{scheme}://{self.registry}/v2/{self.repository}"
+
+
+def parse_reference(
+    ref: str, chart: str = None, version: str = None
+) -> Optional[Reference]:
+    """
+    :param ref: oci://<registry>/<repository>[:<tag>|@<digest>], chart is appended to the repository
+    :return: the reference or None if ref is not an oci reference
+    """
+    if not ref.lower().startswith("oci://"):
+        return None
+
+    name = ref.split("://", 1)[1].strip("/")
+    digest = None
+    if "@" in name:
+        name, digest = name.split("@", 1)
+
+    tag = None
+    registry, _, repository = name.partition("/")
+    if ":" in repository:
+        repository, tag = repository.rsplit(":", 1)
+    if chart:
+        repository = f"{repository}/{chart}" if repository else chart
+    if not registry or not repository:
+        raise OciError(f"Invalid oci reference {ref}")
+
+    # oci tags must not contain '+', helm replaces it with '_'
+    tag = version or tag
+    if tag:
+        tag = tag.replace("+", "_")
+    return Reference(registry=registry, repository=repository, tag=tag, digest=digest)
+
+
+def get_cache_directory() -> str:
+    cache_directory = cache.oci.directory
+    os.makedirs(os.path.join(cache_directory, "refs"), exist_ok=True)
+    return cache_directory
+
+
+def get_blob_path(digest: str) -> str:
+    algorithm, _, value = digest.partition(":")
+    if algorithm != "sha256" or not re.fullmatch(r"[0-9a-f]{64}", value):
+        raise OciError(f"Unsupported digest {digest}")
+    return os.path.join(get_cache_directory(), "blobs", value)
+
+
+def _get_credentials(registry: str) -> Optional[str]:
+    """
+    :return: the base64 encoded basic credentials of 'helm registry login' for registry
+    """
+    config_path = os.getenv(
+        "HELM_REGISTRY_CONFIG",
+        os.path.expanduser("~/.config/helm/registry/config.json"),
+    )
+    try:
+        with open(config_path, "r") as config_file:
+            auths = json.load(config_file).get("auths", {})
+    except (OSError, ValueError):
+        return None
+    for key in [registry, f"https://{registry}", f"http://{registry}"]:
+        if auths.get(key, {}).get("auth"):
+            return auths[key]["auth"]
+    return None
+
+
+def _authenticate(reference: Reference, challenge: str) -> Optional[str]:
+    """
+    :return: the Authorization header value answering the WWW-Authenticate challenge
+    """
+    credentials = _get_credentials(reference.registry)
+    scheme, _, params = challenge.partition(" ")
+    if scheme.lower() == "basic":
+        return f"Basic {credentials}" if credentials else None
+    if scheme.lower() != "bearer":
+        return None
+
+    params = dict(re.findall(r'(\w+)="([^"]*)"', params))
+    query = {k: v for k, v in params.items() if k in ["service", "scope"]}
+    headers = {"Authorization": f"Basic {credentials}"} if credentials else {}
+    res = transport.get_session().get(
+        params.get("realm", ""),
+        params=query,
+        headers=headers,
+        timeout=transport.TIMEOUT,
+    )
+    res.raise_for_status()
+    body = res.json()
+    token = body.get("token") or body.get("access_token")
+    with _tokens_lock:
+        _tokens[(reference.registry, reference.repository)] = token
+    return f"Bearer {token}"
+
+
+def _get(reference: Reference, path: str, headers: dict = None):
+    url = f"{reference.url}/{path}"
+    headers = dict(headers or {})
+    # tokens are reused for all requests to a repository during this run
+    with _tokens_lock:
+        token = _tokens.get((reference.registry, reference.repository))
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    res = transport.get(url, headers=headers)
+    if res.status_code == 401 and "WWW-Authenticate" in res.headers:
+        authorization = _authenticate(reference, res.headers["WWW-Authenticate"])
+        if authorization:
+            res.close()
+            headers["Authorization"] = authorization
+            res = transport.get(url, headers=headers)
+    if res.status_code >= 400:
+        res.close()
+        raise OciError(f"Request to {url} failed with status {res.status_code}")
+    return res
+
+
+def _get_resolved_path(reference: Reference, tag: str) -> str:
+    key = f"{reference.registry}/{reference.repository}:{tag}"
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_directory(), "refs", f"{name}.json")
+
+
+def _read_resolved(reference: Reference, tag: str) -> Optional[dict]:
+    try:
+        with open(_get_resolved_path(reference, tag), "r") as resolved_file:
+            return json.load(resolved_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_resolved(reference: Reference, tag: str, resolved: dict) -> None:
+    # remembers what a tag (or no tag, i.e. the latest version) resolved to for offline runs
+    with cache.atomic_write(_get_resolved_path(reference, tag), "w") as resolved_file:
+        json.dump(resolved, resolved_file)
+
+
+def _get_tags(reference: Reference) -> List[str]:
+    """
+    :return: all tags of the repository, registries with many tags return them in pages
+    """
+    tags = []
+    paths = ["tags/list"]
+    while True:
+        with _get(reference, paths[-1]) as res:
+            tags.extend(res.json().get("tags") or [])
+            next_url = res.links.get("next", {}).get("url")
+        if not next_url:
+            return tags
+        # the link of the next page is relative to the registry
+        next_url = urljoin(f"{reference.url}/tags/list", next_url)
+        path = next_url.removeprefix(f"{reference.url}/")
+        if path == next_url or path in paths:
+            raise OciError(f"Invalid link to the next tags of {reference.repository}")
+        paths.append(path)
+
+
+def resolve_tag(
+    reference: Reference, devel: bool = False, offline: bool = False
+) -> str:
+    """
+    :param devel: include prereleases, like helm's --devel
+    :return: the highest semantic version tag of the repository, as helm does without a version
+    """
+    # remembered apart from the tags, which cannot contain a '+'
+    key = "+devel" if devel else ""
+    if offline:
+        resolved = _read_resolved(reference, key)
+        if not resolved:
+            raise OfflineError(
+                f"The latest version of {reference.registry}/{reference.repository} is not cached"
+            )
+        return resolved["tag"]
+
+    versions = []
+    for tag in _get_tags(reference):
+        try:
+            version = Version(tag.replace("_", "+"))
+        except ValueError:
+            continue
+        if devel or not version.prerelease:
+            versions.append((version, tag))
+    if not versions:
+        raise OciError(f"No versions of {reference.repository} found")
+    tag = max(versions)[1]
+    _write_resolved(reference, key, {"tag": tag})
+    return tag
+
+
+def _write_blob(content: bytes) -> str:
+    digest = f"sha256:{hashlib.sha256(content).hexdigest()}"
+    blob_path = get_blob_path(digest)
+    if not os.path.isfile(blob_path):
+        with cache.atomic_write(blob_path) as blob:
+            blob.write(content)
+    return digest
+
+
+def get_manifest(reference: Reference, offline: bool = False) -> Tuple[str, dict]:
+    """
+    :return: the digest and the manifest of reference, manifests referenced by digest are served
+    from the cache
+    """
+    digest = reference.digest
+    if not digest and offline:
+        digest = (_read_resolved(reference, reference.tag) or {}).get("digest")
+    if digest and os.path.isfile(get_blob_path(digest)):
+        cache.oci.hit(get_blob_path(digest))
+        with open(get_blob_path(digest), "rb") as blob:
+            return digest, json.load(blob)
+    if offline:
+        raise OfflineError(
+            f"{reference.registry}/{reference.repository}:{reference.tag or reference.digest} "
+            "is not cached"
+        )
+
+    tag = reference.digest or reference.tag or resolve_tag(reference)
+    headers = {"Accept": ", ".join(MANIFEST_MEDIA_TYPES)}
+    with _get(reference, f"manifests/{tag}", headers=headers) as res:
+        content = res.content
+
+    digest = _write_blob(content)
+    if reference.digest and digest != reference.digest:
+        raise OciError(f"Digest mismatch of {reference.repository}@{reference.digest}")
+    if not reference.digest:
+        _write_resolved(reference, tag, {"tag": tag, "digest": digest})
+    logger.debug(f"Resolved {reference.repository}:{tag} to {digest}")
+    return digest, json.loads(content)
+
+
+def pull_blob(reference: Reference, digest: str, offline: bool = False) -> str:
+    """
+    :return: the path of the blob in the cache, it is only downloaded if missing
+    """
+    blob_path = get_blob_path(digest)
+    if os.path.isfile(blob_path):
+        logger.debug(f"Using cached blob {digest}")
+        cache.oci.hit(blob_path)
+        return blob_path
+    if offline:
+        raise OfflineError(f"Blob {digest} of {reference.repository} is not cached")
+
+    cache.oci.miss()
+    with _get(reference, f"blobs/{digest}") as res:
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(blob_path),
+            prefix=".tmp-",
+            delete=False,
+            buffering=transport.BUFFER_SIZE,
+        ) as blob:
+            try:
+                transport.write_response(res.url, res, blob)
+            except Exception as e:
+                blob.close()
+                os.remove(blob.name)
+                raise e
+
+    sha256 = hashlib.sha256()
+    with open(blob.name, "rb") as blob_file:
+        for chunk in iter(lambda: blob_file.read(transport.CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    if f"sha256:{sha256.hexdigest()}" != digest:
+        os.remove(blob.name)
+        raise OciError(f"Digest mismatch of blob {digest}")
+
+    os.replace(blob.name, blob_path)
+    return blob_path
+
+
+def pull_chart(
+    ref: str,
+    chart: str = None,
+    version: str = None,
+    digest: str = None,
+    devel: bool = False,
+    offline: bool = False,
+) -> Chart:
+    """
+    pull a helm chart from an oci registry into the cache, chart layers are stored and extracted
+    once per digest; a chart pinned by the digest of its manifest is pulled only once
+
+    :param devel: consider prereleases if no version is given
+    :param offline: only use what is in the cache
+    :return: the chart, its folder must not be modified
+    """
+    reference = parse_reference(ref, chart=chart, version=version)
+    if not reference:
+        raise OciError(f"Not an oci reference: {ref}")
+    if digest:
+        reference = reference._replace(digest=digest)
+    if not reference.digest and not reference.tag:
+        reference = reference._replace(
+            tag=resolve_tag(reference, devel=devel, offline=offline)
+        )
+
+    manifest_digest, manifest = get_manifest(reference, offline=offline)
+    layers = [
+        layer
+        for layer in manifest.get("layers", [])
+        if layer.get("mediaType") == CHART_LAYER_MEDIA_TYPE
+    ]
+    if not layers:
+        raise OciError(f"{ref} is not a Helm chart")
+    layer_digest = layers[0]["digest"]
+
+    chart_path = charts.get_chart(layer_digest)
+    if not chart_path:
+        blob_path = pull_blob(reference, layer_digest, offline=offline)
+        chart_path = charts.extract_chart(blob_path, layer_digest)
+    return Chart(path=chart_path, version=reference.tag, digest=manifest_digest)
@@ -0,0 +1,159 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from getdeck import configuration
+from getdeck.fetch import (
+    charts,
+    git_cache,
+    helm_repository,
+    http_cache,
+    oci,
+    transport,
+)
+from getdeck.fetch.errors import OfflineError
+from getdeck.fetch.source_fetcher import (
+    Archive,
+    Bundle,
+    Git,
+    HelmRepository,
+    Http,
+    Local,
+    Oci,
+    select_source_fetch_behavior,
+)
+
+logger = logging.getLogger("deck")
+
+
+class ReachabilityError(Exception):
+    pass
+
+
+def _check_local(source, deckfile_path: str, offline: bool) -> None:
+    if source.ref.startswith("~"):
+        path = os.path.expanduser(source.ref)
+    else:
+        path = os.path.join(deckfile_path, source.ref.removeprefix("./"))
+    if not os.path.exists(path):
+        # a sparse checkout of a Deckfile does not contain the files next to it yet
+        git_cache.checkout_registry.widen(
+            deckfile_path, [os.path.relpath(path, deckfile_path)], offline=offline
+        )
+    if not os.path.exists(path):
+        raise ReachabilityError(f"{path} does not exist")
+
+
+def _check_git(source, deckfile_path: str, offline: bool) -> None:
+    from git import Git as GitCommand
+
+    url, _, rev = source.ref.partition("#")
+    rev = getattr(source, "targetRevision", None) or rev
+    if offline:
+        cached = git_cache.get_local_path(url) or git_cache.get_cached_repository(url)
+        if not cached:
+            raise OfflineError(f"{url} is not in the local cache")
+        return
+
+    # commits cannot be looked up without fetching, only branches and tags
+    patterns = [rev] if rev and not git_cache.is_commit_sha(rev) else []
+    refs = GitCommand().ls_remote(url, *patterns, env={"GIT_TERMINAL_PROMPT": "0"})
+    # a rev matching no ref may still be a commit of the repository, e.g. an abbreviated sha
+    if patterns and not refs and not git_cache.is_abbreviated_sha(rev):
+        raise ReachabilityError(f"{url} has no branch or tag {rev}")
+
+
+def _check_url(url: str, offline: bool) -> None:
+    if offline:
+        if http_cache.get_cached_digest(url) is None:
+            raise OfflineError(f"{url} is not in the local cache")
+        return
+
+    response = transport.get_session().head(
+        url, allow_redirects=True, timeout=transport.TIMEOUT
+    )
+    if response.status_code in [405, 501]:
+        # servers which do not answer HEAD requests
+        with transport.get(url) as response:
+            response.raise_for_status()
+        return
+    response.raise_for_status()
+
+
+def _check_http(source, deckfile_path: str, offline: bool) -> None:
+    _check_url(source.ref, offline)
+
+
+def _check_bundle(source, deckfile_path: str, offline: bool) -> None:
+    for url in ([source.ref] if source.ref else []) + list(source.refs):
+        _check_url(url, offline)
+
+
+def _check_helm_repository(source, deckfile_path: str, offline: bool) -> None:
+    # this also finds charts and versions missing in the index, which is kept in the cache
+    version, devel = charts.get_version_args(source.helmArgs)
+    helm_repository.resolve_chart(
+        source.ref,
+        source.chart,
+        version=source.targetRevision or version,
+        devel=devel,
+        offline=offline,
+    )
+
+
+def _check_oci(source, deckfile_path: str, offline: bool) -> None:
+    version, devel = charts.get_version_args(source.helmArgs)
+    reference = oci.parse_reference(
+        source.ref, chart=source.chart, version=source.targetRevision or version
+    )
+    if reference.tag or reference.digest:
+        oci.get_manifest(reference, offline=offline)
+    else:
+        oci.resolve_tag(reference, devel=devel, offline=offline)
+
+
+CHECKS = {
+    Local: _check_local,
+    Git: _check_git,
+    Http: _check_http,
+    Archive: _check_http,
+    Bundle: _check_bundle,
+    HelmRepository: _check_helm_repository,
+    Oci: _check_oci,
+}
+
+
+def check_source(source, deckfile_path: str, offline: bool = False) -> Optional[str]:
+    """
+    check that the ref of source can be reached without fetching it, which is only looked up in
+    the local caches if offline
+
+    :return: the error or None if the source is reachable
+    """
+    check = CHECKS.get(type(select_source_fetch_behavior(source)))
+    if not check:
+        return None
+    try:
+        check(source, deckfile_path, offline)
+    except Exception as e:
+        logger.debug(f"Cannot reach {source.type} source {source.ref}: {e}")
+        return f"Cannot reach {source.type} source {source.ref or ''}: {e}"
+    return None
+
+
+def check_sources(
+    sources: list,
+    deckfile_path: str,
+    workers: int = configuration.FETCH_WORKERS,
+    offline: bool = False,
+) -> List[str]:
+    """
+    :return: the errors of all sources which cannot be reached
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        errors = executor.map(
+            lambda source: check_source(source, deckfile_path, offline=offline),
+            sources,
+        )
+    return [error for error in errors if error]
@@ -3,10 +3,19 @@ import os
 from typing import Optional
 
 import logging
-import tempfile
 
-import requests
+from getdeck.fetch import (
+    archive,
+    bundle,
+    charts,
+    git_cache,
+    helm_repository,
+    http_cache,
+    oci,
+)
+from getdeck.fetch.errors import OfflineError
 from getdeck.fetch.types import SourceAux, TemporaryData
+from getdeck.workspace import get_workspace
 
 
 logger = logging.getLogger("deck")
@@ -25,7 +34,7 @@ class SourceFetchBehavior(ABC):
 class Git(SourceFetchBehavior):
     def fetch(self, data: SourceAux, *args, **kwargs) -> SourceAux:
         try:
-            from git import Repo, GitError
+            from git import GitError
         except Exception as e:
             logger.debug(e)
             raise FetchError("Git import error.")
@@ -39,21 +48,30 @@ class Git(SourceFetchBehavior):
             rev = None
 
         rev = kwargs.get("targetRevision", rev)
-        path = kwargs.get("path", "")
+        path = kwargs.get("path") or ""
+        lock = kwargs.get("lock") or {}
 
-        temporary_folder = tempfile.mkdtemp()
-        data.temporary_data = TemporaryData(data=temporary_folder, is_folder=True)
+        # only check out path, unless the source may reference files outside of it
+        sparse_checkout = kwargs.get("sparseCheckout")
+        if sparse_checkout is None:
+            sparse_checkout = kwargs.get("type") in ["file", "directory"]
+        paths = [path] if sparse_checkout else None
 
         try:
-            repo = Repo.clone_from(ref, temporary_folder)
-            if rev:
-                repo.git.checkout(rev)
-        except GitError as e:
+            checkout_folder = git_cache.checkout_registry.acquire(
+                url=ref,
+                rev=lock.get("revision") or rev,
+                paths=paths,
+                submodules=kwargs.get("submodules", False),
+                offline=kwargs.get("offline", False),
+            )
+        except (GitError, OfflineError) as e:
             raise FetchError(f"Cannot checkout {rev} from {ref}: {e}")
-        except Exception as e:
-            raise e
 
-        temporary_path = os.path.join(temporary_folder, path)
+        data.temporary_data = TemporaryData(data=checkout_folder, is_checkout=True)
+        data.lock = {"revision": git_cache.get_revision(checkout_folder)}
+
+        temporary_path = os.path.join(checkout_folder, path)
         if os.path.isdir(temporary_path):
             data.path = temporary_path
             data.name = None
@@ -66,19 +84,19 @@ class Git(SourceFetchBehavior):
 
 class Http(SourceFetchBehavior):
     def fetch(self, data: SourceAux, *args, **kwargs) -> SourceAux:
-        temporary_file = tempfile.NamedTemporaryFile(delete=False)
+        temporary_file = get_workspace().named_temporary_file()
         data.path = os.path.dirname(temporary_file.name)
         data.name = os.path.basename(temporary_file.name)
         data.temporary_data = TemporaryData(data=temporary_file.name, is_file=True)
 
+        lock = kwargs.get("lock") or {}
         try:
-            logger.debug(f"Requesting {data.location}")
-            with requests.get(data.location, stream=True, timeout=10.0) as res:
-                res.raise_for_status()
-                for chunk in res.iter_content(chunk_size=4096):
-                    if chunk:
-                        temporary_file.write(chunk)
-                temporary_file.flush()
+            digest = http_cache.download(
+                data.location,
+                temporary_file,
+                digest=lock.get("sha256"),
+                offline=kwargs.get("offline", False),
+            )
             temporary_file.close()
         except Exception as e:
             temporary_file.close()
@@ -86,6 +104,136 @@ class Http(SourceFetchBehavior):
                 f"Cannot download Source from http(s) location {data.location}: {e}"
             )
 
+        data.lock = {"sha256": digest}
+        return data
+
+
+class Archive(SourceFetchBehavior):
+    def fetch(self, data: SourceAux, *args, **kwargs) -> SourceAux:
+        path = kwargs.get("path") or ""
+        lock = kwargs.get("lock") or {}
+
+        temporary_folder = get_workspace().mkdtemp()
+        data.temporary_data = TemporaryData(data=temporary_folder, is_folder=True)
+
+        try:
+            digest = archive.extract(
+                data.location,
+                temporary_folder,
+                path=path,
+                digest=lock.get("sha256"),
+                offline=kwargs.get("offline", False),
+            )
+        except Exception as e:
+            raise FetchError(f"Cannot extract archive from {data.location}: {e}")
+        data.lock = {"sha256": digest}
+
+        temporary_path = os.path.join(temporary_folder, path)
+        if os.path.isdir(temporary_path):
+            data.path = temporary_path
+            data.name = None
+        elif os.path.isfile(temporary_path):
+            data.name = os.path.basename(temporary_path)
+            data.path = os.path.dirname(temporary_path)
+        else:
+            raise FetchError(f"Archive {data.location} does not contain {path}")
+
+        return data
+
+
+class Bundle(SourceFetchBehavior):
+    def fetch(self, data: SourceAux, *args, **kwargs) -> SourceAux:
+        temporary_folder = get_workspace().mkdtemp()
+        data.temporary_data = TemporaryData(data=temporary_folder, is_folder=True)
+        data.path = temporary_folder
+        data.name = None
+
+        # locked bundles do not read the index again
+        manifests = (kwargs.get("lock") or {}).get("manifests")
+        if manifests:
+            urls = [manifest["url"] for manifest in manifests]
+            digests = [manifest.get("sha256") for manifest in manifests]
+        else:
+            urls = list(kwargs.get("refs") or [])
+            digests = None
+            if data.location:
+                try:
+                    urls += bundle.get_index_urls(
+                        data.location,
+                        include=kwargs.get("include") or "*",
+                        offline=kwargs.get("offline", False),
+                    )
+                except Exception as e:
+                    raise FetchError(f"Cannot read bundle index {data.location}: {e}")
+
+        if not urls:
+            raise FetchError("Bundle does not contain any manifest")
+
+        logger.debug(f"Downloading {len(urls)} manifest(s) of bundle")
+        try:
+            digests = bundle.download(
+                urls,
+                temporary_folder,
+                digests=digests,
+                offline=kwargs.get("offline", False),
+            )
+        except Exception as e:
+            raise FetchError(f"Cannot download bundle: {e}")
+
+        data.lock = {
+            "manifests": [
+                {"url": url, "sha256": digest} for url, digest in zip(urls, digests)
+            ]
+        }
+        return data
+
+
+class Oci(SourceFetchBehavior):
+    def fetch(self, data: SourceAux, *args, **kwargs) -> SourceAux:
+        lock = kwargs.get("lock") or {}
+        version, devel = charts.get_version_args(kwargs.get("helmArgs"))
+        try:
+            chart = oci.pull_chart(
+                data.location,
+                chart=kwargs.get("chart"),
+                version=lock.get("version") or kwargs.get("targetRevision") or version,
+                digest=lock.get("digest"),
+                devel=devel,
+                offline=kwargs.get("offline", False),
+            )
+        except Exception as e:
+            raise FetchError(f"Cannot pull Helm chart from {data.location}: {e}")
+
+        # the chart is used from the cache, it is not temporary
+        data.path = chart.path
+        data.name = None
+        data.lock = {"version": chart.version, "digest": chart.digest}
+        return data
+
+
+class HelmRepository(SourceFetchBehavior):
+    def fetch(self, data: SourceAux, *args, **kwargs) -> SourceAux:
+        lock = kwargs.get("lock") or {}
+        # helm ignores --version and --devel for the pulled chart, they select the chart to pull
+        version, devel = charts.get_version_args(kwargs.get("helmArgs"))
+        try:
+            chart = helm_repository.pull_chart(
+                data.location,
+                kwargs.get("chart"),
+                version=lock.get("version") or kwargs.get("targetRevision") or version,
+                digest=lock.get("digest"),
+                devel=devel,
+                offline=kwargs.get("offline", False),
+            )
+        except Exception as e:
+            raise FetchError(
+                f"Cannot pull Helm chart {kwargs.get('chart')} from {data.location}: {e}"
+            )
+
+        # the chart is used from the cache, it is not temporary
+        data.path = chart.path
+        data.name = None
+        data.lock = {"version": chart.version, "digest": chart.digest}
         return data
 
 
@@ -114,6 +262,9 @@ class SourceFetcher:
 
 
 def select_source_fetch_behavior(source) -> Optional[SourceFetchBehavior]:
+    if getattr(source, "type", None) == "bundle":
+        return Bundle()
+
     ref = getattr(source, "ref", None)
     if not ref:
         return None
@@ -123,12 +274,22 @@ def select_source_fetch_behavior(source) -> Optional[SourceFetchBehavior]:
 
     ref_lo = ref.lower()
 
-    if ref_lo.startswith("git") or ref_lo.endswith(".git"):
-        return Git()
+    if getattr(source, "type", None) == "archive":
+        return Archive()
+
+    if ref_lo.startswith("oci://") and source.type == "helm":
+        return Oci()
 
     if (
-        ref_lo.startswith("https") or ref_lo.startswith("http")
-    ) and source.type != "helm":
+        ref_lo.startswith("git")
+        or ref_lo.endswith(".git")
+        or ref_lo.startswith("file://")
+    ):
+        return Git()
+
+    if ref_lo.startswith("https") or ref_lo.startswith("http"):
+        if source.type == "helm":
+            return HelmRepository()
         return Http()
 
     if ref_lo[0] in "./~":
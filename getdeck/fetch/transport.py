@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from typing import BinaryIO, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from getdeck import configuration
+
+logger = logging.getLogger("deck")
+
+TIMEOUT = 10.0  # in s
+RETRIES = 3
+BACKOFF_FACTOR = 0.3  # in s, doubled with every retry
+CHUNK_SIZE = 64 * 1024
+BUFFER_SIZE = 1024 * 1024  # write buffer for downloaded files
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    :return: the session shared by all fetch behaviors, it keeps connections alive per host and
+    retries failed requests with an exponential backoff
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET", "HEAD"],
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=10,
+                pool_maxsize=max(10, configuration.FETCH_WORKERS),
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def get(url: str, headers: dict = None) -> requests.Response:
+    logger.debug(f"Requesting {url}")
+    return get_session().get(url, stream=True, timeout=TIMEOUT, headers=headers)
+
+
+def _is_resumable(response: requests.Response) -> bool:
+    # ranges refer to the encoded content, which is not what has been written
+    return (
+        response.headers.get("Accept-Ranges") == "bytes"
+        and response.headers.get("Content-Encoding", "identity") == "identity"
+    )
+
+
+def write_response(url: str, response: requests.Response, target: BinaryIO) -> None:
+    """
+    write the body of response to the seekable target, an interrupted download of url is
+    resumed with a range request if the server supports it or restarted otherwise
+    """
+    validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    resumable = _is_resumable(response)
+
+    current = response
+    attempt = 0
+    try:
+        while True:
+            try:
+                for chunk in current.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        target.write(chunk)
+                target.flush()
+                return
+            except (
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ConnectionError,
+            ) as e:
+                attempt += 1
+                if attempt > RETRIES:
+                    raise e
+                time.sleep(BACKOFF_FACTOR * 2 ** (attempt - 1))
+
+                offset = target.tell() if resumable else 0
+                logger.debug(f"Download of {url} interrupted at {offset} bytes: {e}")
+                headers = {}
+                if offset:
+                    headers["Range"] = f"bytes={offset}-"
+                    if validator:
+                        headers["If-Range"] = validator
+
+                if current is not response:
+                    current.close()
+                current = get(url, headers=headers)
+                if current.status_code != 206:
+                    # the server sends the complete content again
+                    current.raise_for_status()
+                    target.seek(0)
+                    target.truncate()
+    finally:
+        if current is not response:
+            current.close()
@@ -3,11 +3,13 @@ from typing import Any, List, Optional, Union
 from pydantic import BaseModel
 import os
 
-import shutil
-
 
 from getdeck import configuration
+from getdeck.workspace import get_workspace
+from getdeck.fetch.git_cache import checkout_registry
 from getdeck.deckfile.file import (
+    ArchiveSource,
+    BundleSource,
     DirectorySource,
     FileSource,
     HelmSource,
@@ -20,6 +22,15 @@ class TemporaryData(BaseModel):
     data: str
     is_file: bool = False
     is_folder: bool = False
+    is_checkout: bool = False  # shared with other fetches of this run
+
+    def cleanup(self):
+        if self.is_file or self.is_folder:
+            get_workspace().remove(self.data)
+            return
+
+        if self.is_checkout:
+            checkout_registry.release(self.data)
 
 
 class SourceAux(BaseModel):
@@ -27,6 +38,11 @@ class SourceAux(BaseModel):
     path: Optional[str] = None
     name: Optional[str] = None
     temporary_data: Optional[TemporaryData] = None
+    lock: Optional[dict] = None  # the resolved revision of the source for deck.lock
+    offline: bool = False  # the source must be rendered without network access
+    chart_dependencies: Optional[
+        List[str]
+    ] = None  # cached dependencies of a helm chart
 
     source: Optional[
         Union[
@@ -35,19 +51,17 @@ class SourceAux(BaseModel):
             DirectorySource,
             HelmSource,
             KustomizeSource,
+            ArchiveSource,
+            BundleSource,
         ]
     ] = None
 
-    def __del__(self):
+    def cleanup(self):
         if not self.temporary_data:
             return
 
-        if self.temporary_data.is_file:
-            os.remove(self.temporary_data.data)
-            return
-
-        if self.temporary_data.is_folder:
-            shutil.rmtree(self.temporary_data.data)
+        self.temporary_data.cleanup()
+        self.temporary_data = None
 
 
 class DeckfileAux(BaseModel):
@@ -57,26 +71,32 @@ class DeckfileAux(BaseModel):
     name: str = configuration.DECKFILE_FILE
     temporary_data: Optional[TemporaryData] = None
 
-    def __del__(self):
+    def cleanup(self):
         if not self.temporary_data:
             return
 
-        if self.temporary_data.is_file:
-            os.remove(self.temporary_data.data)
-            return
-
-        if self.temporary_data.is_folder:
-            shutil.rmtree(self.temporary_data.data)
+        self.temporary_data.cleanup()
+        self.temporary_data = None
 
 
 class DataAux(BaseModel):
+    """
+    Use it as a context manager, its temporary data is cleaned up when leaving the context
+    """
+
     deckfile: Any = None
     deckfile_aux: Optional[DeckfileAux] = None
     source_auxs: List[SourceAux] = None
 
-    def __del__(self):
+    def cleanup(self):
         if self.deckfile_aux:
-            del self.deckfile_aux
+            self.deckfile_aux.cleanup()
+
+        for source_aux in self.source_auxs or []:
+            source_aux.cleanup()
+
+    def __enter__(self):
+        return self
 
-        if self.source_auxs:
-            del self.source_auxs[:]
+    def __exit__(self, *args):
+        self.cleanup()
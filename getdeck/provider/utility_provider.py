@@ -79,7 +79,7 @@ class UtilityProvider(AbstractProvider, CMDWrapper):
         return False
 
     def _create(self, arguments):
-        import yaml
+        from getdeck import yaml_utils
 
         logger.info(
             f"Creating a {self.provider_type} cluster with name {self.cluster_name}"
@@ -93,7 +93,7 @@ class UtilityProvider(AbstractProvider, CMDWrapper):
                 logger.debug(
                     f"{self.provider_type.capitalize()} config to: {temp.name}"
                 )
-                content = yaml.dump(self.native_config, default_flow_style=False)
+                content = yaml_utils.dump(self.native_config, default_flow_style=False)
                 temp.write(content.encode("utf-8"))
                 temp.flush()
                 temp.close()
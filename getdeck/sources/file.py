@@ -2,7 +2,7 @@ import logging
 import os
 from typing import List
 
-import yaml
+from getdeck import yaml_utils
 from getdeck.fetch.types import DeckfileAux, SourceAux
 
 from getdeck.sources.generator import RenderBehavior, RenderError
@@ -16,7 +16,7 @@ class File(RenderBehavior):
         self, ref: str, namespace: str = None
     ) -> List[K8sSourceFile]:
         with open(ref, "r") as input_file:
-            docs = yaml.load_all(input_file.read(), Loader=yaml.FullLoader)
+            docs = yaml_utils.load_all(input_file.read())
 
         k8s_workload_files = []
         for doc in docs:
@@ -35,7 +35,7 @@ class File(RenderBehavior):
             raise RenderError(f"The provided path does not point to a directory: {ref}")
 
         extensions = (".yaml", ".yml")
-        for file in os.listdir(ref):
+        for file in sorted(os.listdir(ref)):
             if file.endswith(extensions):
                 refs.append(os.path.join(ref, file))
 
@@ -1,11 +1,15 @@
+import glob
 import json
 import logging
 import os
+import shutil
 from functools import cached_property
-from typing import List
-
-import yaml
+from typing import List, Optional
 
+from getdeck import yaml_utils
+from getdeck.configuration import ClientConfiguration
+from getdeck.fetch import charts
+from getdeck.fetch.types import DeckfileAux, SourceAux
 from getdeck.sources.tooler import Tooler
 from getdeck.sources.types import K8sSourceFile
 
@@ -13,6 +17,17 @@ logger = logging.getLogger("deck")
 
 
 class Helm(Tooler):
+    def __init__(self, config: ClientConfiguration):
+        super().__init__(config)
+        self.chart_dependencies = None
+
+    def render(
+        self, deckfile_aux: DeckfileAux, source_aux: SourceAux, namespace: str = None
+    ):
+        # the dependencies of charts from git have been pulled to the cache by the fetcher
+        self.chart_dependencies = source_aux.chart_dependencies
+        return super().render(deckfile_aux, source_aux, namespace=namespace)
+
     @property
     def type(self) -> str:
         from getdeck.sources.utils import sniff_protocol
@@ -24,7 +39,8 @@ class Helm(Tooler):
 
     def build_command(self) -> List[str]:
         helm_cmd = self._helm_prep()
-        helm_cmd.append("&&")
+        if helm_cmd:
+            helm_cmd.append("&&")
         helm_cmd.extend(self._helm_with_plugins())
         helm_cmd.extend(self._helm_template())
         helm_cmd.extend(self._helm_source_params())
@@ -41,7 +57,7 @@ class Helm(Tooler):
                 if _file.endswith(".yaml"):
                     with open(os.path.join(root, _file)) as manifest:
                         # load even multiple documents per file
-                        docs = yaml.load_all(manifest, Loader=yaml.FullLoader)
+                        docs = yaml_utils.load_all(manifest)
                         for doc in docs:
                             if doc:
                                 k8s_workload_files.append(
@@ -66,14 +82,57 @@ class Helm(Tooler):
         logger.debug("Kube API version: " + str(data))
         return f"{re.sub(r'[^0-9]+', '', data['major'])}.{re.sub(r'[^0-9]+', '', data['minor'])}"
 
+    def get_render_parameters(self) -> Optional[dict]:
+        return {"k8s_api_version": self.k8s_api_version}
+
+    def get_render_key(
+        self, source_aux: SourceAux, source_path: Optional[str]
+    ) -> Optional[str]:
+        if self._helm_prep():
+            # helm resolves the dependencies within the tooler, the chart it renders is only known
+            # beforehand if there are none
+            if self.type == "git" and source_path:
+                source_path = os.path.join(source_path, self.source.path or "")
+            if not source_path or charts.get_dependencies(source_path):
+                return None
+        return super().get_render_key(source_aux, source_path)
+
+    def get_cache_path(self, source_aux: SourceAux) -> Optional[str]:
+        # charts from oci registries and helm repositories are pulled to the cache by the fetcher
+        if self.type in ["oci", "http", "https"]:
+            return source_aux.path
+        return None
+
+    def prepare_sources(self):
+        if not self.chart_dependencies:
+            return
+        charts_folder = os.path.join(
+            self.tmp_source.name, self.source.path or "", "charts"
+        )
+        os.makedirs(charts_folder, exist_ok=True)
+        for dependency_path in self.chart_dependencies:
+            name = os.path.basename(dependency_path)
+            # replace the dependency if it is vendored already
+            for vendored in glob.glob(
+                os.path.join(charts_folder, f"{name}-[0-9]*.tgz")
+            ):
+                os.remove(vendored)
+            shutil.rmtree(os.path.join(charts_folder, name), ignore_errors=True)
+            # the digest tells apart aliased dependencies on different versions of a chart
+            digest = os.path.basename(os.path.dirname(dependency_path))
+            shutil.copytree(
+                dependency_path, os.path.join(charts_folder, f"{name}-{digest[:12]}")
+            )
+
     def _helm_prep(self) -> List[str]:
-        if self.type in ["git", "local"]:
+        if (
+            self.type in ["git", "local"]
+            and not self.offline
+            and self.chart_dependencies is None
+        ):
             return self._helm_dep_up()
-        else:  # http(s)
-            return self._helm_repo_add()
-
-    def _helm_repo_add(self) -> List[str]:
-        return ["helm", "repo", "add", "this", self.source.ref]
+        # packaged charts contain their dependencies, otherwise the vendored charts/ are used
+        return []
 
     def _helm_dep_up(self) -> List[str]:
         if self.type == "local":
@@ -122,11 +181,11 @@ class Helm(Tooler):
                         ]
                     )
             return temp
-        else:  # http(s)
+        else:  # oci, http(s)
             return [
                 "template",
                 f"{self.source.releaseName}",
-                f"this/{self.source.chart}",
+                f"{self.CACHE}/",
                 "--include-crds",
                 "--namespace",
                 self.namespace,
@@ -1,13 +1,53 @@
 import logging
 import os
+from typing import Optional
 
-import yaml
-
+from getdeck import yaml_utils
+from getdeck.fetch.types import SourceAux
+from getdeck.sources.generator import RenderError
 from getdeck.sources.tooler import Tooler
 from getdeck.sources.types import K8sSourceFile
 
 logger = logging.getLogger("deck")
 
+KUSTOMIZATION_FILES = ["kustomization.yaml", "kustomization.yml", "Kustomization"]
+
+
+def has_remote_resources(path: str, root: str) -> bool:
+    """
+    :return: True if the kustomization in the folder path, or one it includes, lists resources
+    which kustomize fetches itself (e.g. remote bases), or which are not within root
+    """
+    folders, visited = [os.path.abspath(path)], set()
+    root = os.path.abspath(root)
+    while folders:
+        folder = folders.pop()
+        if folder in visited:
+            continue
+        visited.add(folder)
+        for file_name in KUSTOMIZATION_FILES:
+            if os.path.isfile(os.path.join(folder, file_name)):
+                with open(os.path.join(folder, file_name)) as kustomization_file:
+                    kustomization = yaml_utils.load(kustomization_file) or {}
+                break
+        else:
+            continue
+
+        # the helm chart inflation generator pulls the charts itself
+        if kustomization.get("helmCharts"):
+            return True
+        for key in ["resources", "bases", "components"]:
+            for entry in kustomization.get(key) or []:
+                entry_path = os.path.abspath(os.path.join(folder, str(entry)))
+                # urls and paths which are not part of the source, e.g. github.com/org/repo?ref=v1
+                if "://" in str(entry) or not os.path.exists(entry_path):
+                    return True
+                if entry_path != root and not entry_path.startswith(root + os.sep):
+                    return True
+                if os.path.isdir(entry_path):
+                    folders.append(entry_path)
+    return False
+
 
 class Kustomize(Tooler):
     FILENAME = "manifest.yaml"
@@ -33,7 +73,7 @@ class Kustomize(Tooler):
     def collect_workload_files(self):
         k8s_workload_files = []
         with open(os.path.join(self.tmp_output.name, self.FILENAME)) as manifest:
-            docs = yaml.load_all(manifest, Loader=yaml.FullLoader)
+            docs = yaml_utils.load_all(manifest)
             for doc in docs:
                 if doc:
                     doc_name = f"{doc['kind']}_{doc['metadata']['name']}.yaml"
@@ -41,8 +81,31 @@ class Kustomize(Tooler):
                     k8s_workload_files.append(K8sSourceFile(name=doc_name, content=doc))
         return k8s_workload_files
 
+    def get_render_parameters(self) -> Optional[dict]:
+        # kustomize fetches remote targets itself, they may change at any time
+        return {} if self.type in ["git", "local"] else None
+
+    def get_render_key(
+        self, source_aux: SourceAux, source_path: Optional[str]
+    ) -> Optional[str]:
+        if self.type not in ["git", "local"] or not source_path:
+            return None
+        # remote resources of the kustomization may change at any time, too
+        target = source_path
+        if self.type == "git":
+            target = os.path.join(source_path, self.source.path or "")
+        if has_remote_resources(target, source_path):
+            return None
+        return super().get_render_key(source_aux, source_path)
+
     def _target(self):
         if self.type == "git":
             return self.source.path
         else:  # http(s)
+            if self.offline:
+                # kustomize resolves remote targets itself, they are not cached
+                raise RenderError(
+                    f"Cannot render Kustomize source {self.source.ref} offline, "
+                    "remote targets are not cached"
+                )
             return self.source.ref
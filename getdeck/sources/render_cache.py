@@ -0,0 +1,67 @@
+import hashlib
+import json
+import logging
+import os
+from typing import List, Optional
+
+from getdeck import cache, configuration
+from getdeck.sources.types import K8sSourceFile
+
+logger = logging.getLogger("deck")
+
+
+def get_tree_digest(path: str) -> str:
+    """
+    :return: the digest of the names and contents of the file or of the files in the folder at
+    path
+    """
+    digest = hashlib.sha256()
+    if os.path.isfile(path):
+        files = [path]
+    else:
+        files = []
+        for root, dirs, file_names in os.walk(path):
+            dirs.sort()
+            files.extend(os.path.join(root, name) for name in sorted(file_names))
+
+    for file_path in files:
+        digest.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+        with open(file_path, "rb") as input_file:
+            for chunk in iter(lambda: input_file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_render_key(inputs: dict) -> str:
+    """
+    :return: the key of the workload files rendered from inputs, it changes with each release
+    """
+    data = {"version": configuration.__VERSION__, **inputs}
+    definition = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()
+
+
+def read_cached_render(key: str) -> Optional[List[K8sSourceFile]]:
+    path = cache.renders.get_path(f"{key}.json")
+    try:
+        with open(path, encoding="utf-8") as cached_file:
+            source_files = [K8sSourceFile(**data) for data in json.load(cached_file)]
+    except FileNotFoundError:
+        cache.renders.miss()
+        return None
+    except Exception as e:
+        logger.debug(f"Cannot read the cached render {key}: {e}")
+        cache.renders.miss()
+        return None
+    cache.renders.hit(path)
+    return source_files
+
+
+def write_cached_render(key: str, source_files: List[K8sSourceFile]) -> None:
+    path = cache.renders.get_path(f"{key}.json")
+    try:
+        with cache.atomic_write(path, "w", encoding="utf-8") as cached_file:
+            json.dump([source_file.dict() for source_file in source_files], cached_file)
+    except Exception as e:
+        logger.debug(f"Cannot cache the render {key}: {e}")
@@ -1,5 +1,7 @@
 from typing import Union, Optional
 from getdeck.deckfile.file import (
+    ArchiveSource,
+    BundleSource,
     DirectorySource,
     FileSource,
     HelmSource,
@@ -20,6 +22,8 @@ def select_render_behavior(
         DirectorySource,
         HelmSource,
         KustomizeSource,
+        ArchiveSource,
+        BundleSource,
     ],
 ) -> Optional[RenderBehavior]:
     render_behavior = {
@@ -28,5 +32,7 @@ def select_render_behavior(
         DirectorySource: File,
         HelmSource: Helm,
         KustomizeSource: Kustomize,
+        ArchiveSource: File,
+        BundleSource: File,
     }.get(type(source), None)
     return render_behavior
@@ -5,22 +5,23 @@ import os
 import shutil
 import subprocess
 import sys
-import tempfile
 from functools import cached_property
-from typing import List, Union
+from typing import List, Optional, Union
 
 from getdeck.configuration import ClientConfiguration
 from getdeck.fetch.types import DeckfileAux, SourceAux
-from getdeck.sources import tooler
+from getdeck.sources import render_cache, tooler
 from getdeck.sources.generator import RenderBehavior
 from getdeck.sources.types import K8sSourceFile
+from getdeck.workspace import get_workspace
 
 logger = logging.getLogger("deck")
 
 
-def run(
-    config: ClientConfiguration, cmd: Union[str, List], volume_mounts: List[str] = None
-) -> str:
+def prepare_image(config: ClientConfiguration):
+    """
+    build the tooler image of this user, unless it is present already
+    """
     import docker
 
     # check if this image is already present on this machine
@@ -28,6 +29,15 @@ def run(
         config.DOCKER.images.get(config.TOOLER_USER_IMAGE)
     except docker.errors.ImageNotFound:
         build_user_container(config)
+
+
+def run(
+    config: ClientConfiguration,
+    cmd: Union[str, List],
+    volume_mounts: List[str] = None,
+    network: bool = True,
+) -> str:
+    prepare_image(config)
     if type(cmd) == list:
         cmd = " ".join(cmd)
 
@@ -48,6 +58,7 @@ def run(
         volumes=volume_mounts,
         remove=True,
         oom_kill_disable=True,
+        network_disabled=not network,
     )
     return content
 
@@ -120,30 +131,42 @@ def build_user_container(config: ClientConfiguration):
 class Tooler(RenderBehavior):
     SOURCES = "/sources"
     OUTPUT = "/output"
+    CACHE = "/cache"
 
     def __init__(self, config: ClientConfiguration):
         super().__init__(config)
         self.source = None
+        self.offline = False
+        self.cache_path = None
 
     def render(
         self, deckfile_aux: DeckfileAux, source_aux: SourceAux, namespace: str = None
     ):
         self.source = source_aux.source
+        self.offline = source_aux.offline
         self.namespace = namespace
+        self.cache_path = self.get_cache_path(source_aux)
+
+        if source_aux.temporary_data:
+            source_path = source_aux.temporary_data.data
+        else:
+            source_path = source_aux.path
+        if source_path and not os.path.isabs(source_path):
+            source_path = os.path.join(
+                deckfile_aux.path, source_path.removeprefix("./")
+            )
+
+        render_key = self.get_render_key(source_aux, source_path)
+        if render_key:
+            source_files = render_cache.read_cached_render(render_key)
+            if source_files is not None:
+                logger.debug(f"Using the cached render of {source_aux.location}")
+                return source_files
 
         cmd = self.build_command()
         try:
-            if source_aux.temporary_data:
-                source_path = source_aux.temporary_data.data
-            else:
-                source_path = source_aux.path
-
-            if source_path:
-                if not os.path.isabs(source_path):
-                    source_path = os.path.join(
-                        deckfile_aux.path, source_path.removeprefix("./")
-                    )
-
+            # sources from the cache are mounted read-only instead
+            if source_path and not self.cache_path:
                 # copy data
                 if os.path.isdir(source_path):
                     shutil.copytree(
@@ -151,21 +174,24 @@ class Tooler(RenderBehavior):
                     )
                 else:
                     shutil.copy(source_path, self.tmp_source.name)
+                self.prepare_sources()
 
             logger.debug(f"Render: {source_aux.location}")
             self.run_tooler(cmd)
             source_files = self.collect_workload_files()
+            if render_key:
+                render_cache.write_cached_render(render_key, source_files)
             return source_files
         finally:
             self.cleanup()
 
     @cached_property
     def tmp_output(self):
-        return tempfile.TemporaryDirectory()
+        return get_workspace().temporary_directory(prefix="output-")
 
     @cached_property
     def tmp_source(self):
-        return tempfile.TemporaryDirectory()
+        return get_workspace().temporary_directory(prefix="source-")
 
     def cleanup(self):
         self.tmp_output.cleanup()
@@ -175,14 +201,61 @@ class Tooler(RenderBehavior):
     def build_command(self) -> List[str]:
         raise NotImplementedError
 
+    def prepare_sources(self):
+        """
+        add to the sources copied to tmp_source before running the tooler
+        """
+        pass
+
+    def get_cache_path(self, source_aux: SourceAux) -> Optional[str]:
+        """
+        :return: a folder of the local cache to mount read-only at CACHE, if the source is used from there
+        """
+        return None
+
+    def get_render_parameters(self) -> Optional[dict]:
+        """
+        :return: what the output depends on besides the source and its files, None if the output
+        cannot be cached
+        """
+        return {}
+
+    def get_render_key(
+        self, source_aux: SourceAux, source_path: Optional[str]
+    ) -> Optional[str]:
+        """
+        :return: the key of the rendered workload files in the cache or None if they are not cached
+        """
+        parameters = self.get_render_parameters()
+        if parameters is None:
+            return None
+        if source_aux.lock:
+            # fetched sources are identified by their revision or digest
+            files = source_aux.lock
+        elif source_path and os.path.exists(source_path):
+            files = render_cache.get_tree_digest(source_path)
+        else:
+            return None
+        return render_cache.get_render_key(
+            {
+                "behavior": type(self).__name__,
+                "source": self.source.dict(),
+                "namespace": self.namespace,
+                "files": files,
+                **parameters,
+            }
+        )
+
     def run_tooler(self, cmd):
+        volume_mounts = [
+            f"{self.tmp_source.name}:{self.SOURCES}",
+            f"{self.tmp_output.name}:{self.OUTPUT}",
+        ]
+        if self.cache_path:
+            volume_mounts.append(f"{self.cache_path}:{self.CACHE}:ro")
+        # offline renders must not reach out to the network from within the tooler
         tooler.run(
-            self.config,
-            cmd,
-            volume_mounts=[
-                f"{self.tmp_source.name}:{self.SOURCES}",
-                f"{self.tmp_output.name}:{self.OUTPUT}",
-            ],
+            self.config, cmd, volume_mounts=volume_mounts, network=not self.offline
         )
 
     @abstractmethod
@@ -14,8 +14,14 @@ def sniff_protocol(ref: str):
     if "#" in ref:
         ref, rev = ref.split("#")
     ref_lo = ref.lower()
-    if ref_lo.startswith("git") or ref_lo.endswith(".git"):
+    if (
+        ref_lo.startswith("git")
+        or ref_lo.endswith(".git")
+        or ref_lo.startswith("file://")
+    ):
         return "git"
+    if ref_lo.startswith("oci://"):
+        return "oci"
     if ref_lo.startswith("https"):
         return "https"
     if ref_lo.startswith("http"):
@@ -0,0 +1,158 @@
+import atexit
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from getdeck import configuration
+from getdeck.cache import FileLock, _lock_file, _unlock_file
+
+logger = logging.getLogger("deck")
+
+WORKSPACE_PREFIX = "run-"
+# workspaces are only reclaimed once they are older, as a new run creates its folder first
+STALE_AGE = 60
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+class Workspace:
+    """
+    The folder of the temporary data of a run, below DECK_WORKDIR. It is locked for as long as
+    the run is alive, so the workspaces of crashed runs can be told apart and reclaimed.
+    """
+
+    def __init__(self, root: str):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.path = tempfile.mkdtemp(dir=root, prefix=WORKSPACE_PREFIX)
+        # the lock is held by the process rather than a thread, the workspace may be created by
+        # any thread and is closed by the main thread when the run is over
+        self._lock = open(f"{self.path}.lock", "a+b")
+        _lock_file(self._lock, blocking=True)
+        # heavy deletions do not block the main thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="deck-cleanup"
+        )
+        self._closed = False
+        logger.debug(f"Using workspace {self.path}")
+
+    def mkdtemp(self, prefix: str = "") -> str:
+        return tempfile.mkdtemp(dir=self.path, prefix=prefix)
+
+    def named_temporary_file(self, prefix: str = "", **kwargs):
+        return tempfile.NamedTemporaryFile(
+            dir=self.path, prefix=prefix, delete=False, **kwargs
+        )
+
+    def temporary_directory(self, prefix: str = "") -> tempfile.TemporaryDirectory:
+        return tempfile.TemporaryDirectory(dir=self.path, prefix=prefix)
+
+    def _submit(self, function, *args) -> None:
+        try:
+            self._executor.submit(function, *args)
+        except RuntimeError:
+            # the workspace is closed already
+            function(*args)
+
+    def remove(self, path: str) -> None:
+        """
+        remove the file or folder at path in the background
+        """
+        self._submit(_remove, path)
+
+    def reclaim(self) -> None:
+        """
+        remove the workspaces of runs which are gone without cleaning up in the background
+        """
+        self._submit(reclaim_stale_workspaces, self.root)
+
+    def close(self) -> None:
+        """
+        wait for the pending deletions and remove the workspace
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self.path, ignore_errors=True)
+        with contextlib.suppress(OSError):
+            os.remove(self._lock.name)
+        _unlock_file(self._lock)
+        self._lock.close()
+
+
+def reclaim_stale_workspaces(root: str) -> List[str]:
+    """
+    :return: the workspaces below root which have been removed
+    """
+    reclaimed = []
+    now = time.time()
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return reclaimed
+
+    for entry in entries:
+        if not entry.name.startswith(WORKSPACE_PREFIX):
+            continue
+        if entry.name.endswith(".lock"):
+            # the lock file of a workspace which is gone already
+            if os.path.exists(entry.path.removesuffix(".lock")):
+                continue
+        try:
+            if now - entry.stat(follow_symlinks=False).st_mtime < STALE_AGE:
+                continue
+        except OSError:
+            continue
+
+        path = entry.path.removesuffix(".lock")
+        lock = FileLock(f"{path}.lock")
+        if not lock.acquire(blocking=False):
+            # the run is still alive
+            continue
+        try:
+            _remove(path)
+            with contextlib.suppress(OSError):
+                os.remove(lock.path)
+        finally:
+            lock.release()
+        logger.debug(f"Reclaimed stale workspace {path}")
+        reclaimed.append(path)
+    return reclaimed
+
+
+_workspace: Optional[Workspace] = None
+_workspace_lock = threading.Lock()
+
+
+def get_workspace() -> Workspace:
+    """
+    :return: the workspace of this run, it is created with the first use
+    """
+    global _workspace
+    with _workspace_lock:
+        if _workspace is None or _workspace._closed:
+            _workspace = Workspace(configuration.WORKDIR)
+            _workspace.reclaim()
+        return _workspace
+
+
+def close_workspace() -> None:
+    with _workspace_lock:
+        if _workspace is not None:
+            _workspace.close()
+
+
+atexit.register(close_workspace)
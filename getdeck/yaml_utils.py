@@ -0,0 +1,35 @@
+from typing import IO, Any, Iterator, Union
+
+import yaml
+from yaml import YAMLError  # noqa: F401
+
+# the libyaml bindings parse several times faster than the pure Python implementation
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+
+    LIBYAML = True
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper, SafeLoader  # type: ignore
+
+    LIBYAML = False
+
+
+def load(stream: Union[str, bytes, IO]) -> Any:
+    """
+    :return: the first document of stream
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load_all(stream: Union[str, bytes, IO]) -> Iterator[Any]:
+    """
+    :return: the documents of stream, one at a time
+    """
+    return yaml.load_all(stream, Loader=SafeLoader)
+
+
+def dump(data: Any, stream: IO = None, **kwargs) -> Any:
+    """
+    :return: data as a string, unless it is written to stream
+    """
+    return yaml.dump(data, stream, Dumper=SafeDumper, **kwargs)
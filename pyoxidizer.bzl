@@ -39,7 +39,9 @@ def make_exe():
     # linux, mac
     exe.add_python_resources(exe.read_package_root(CWD, ["getdeck"]))
     exe.add_python_resources(exe.pip_install(["--no-deps", "docker==6.0.0"]))
-    exe.add_python_resources(exe.pip_install(["--no-binary", "pydantic", "certifi==2022.06.15", "PyYAML", "pydantic", "kubernetes", "beiboot"]))
+    exe.add_python_resources(exe.pip_install(["--no-binary", "pydantic", "certifi==2022.06.15", "pydantic", "kubernetes", "beiboot"]))
+    # the PyYAML wheels ship the libyaml bindings
+    exe.add_python_resources(exe.pip_install(["--only-binary", "PyYAML", "PyYAML"]))
     exe.add_python_resources(exe.pip_install(["semantic-version==2.9.0", "GitPython==3.1.27", "python-hosts==1.0.3"]))
     exe.add_python_resources(exe.pip_install(["cli-tracker"]))
     return exe
@@ -74,7 +76,9 @@ def make_win_exe():
     # windows
     exe.add_python_resources(exe.read_package_root(CWD, ["getdeck"]))
     exe.add_python_resources(exe.pip_install(["--no-deps", "docker==6.0.0"]))
-    exe.add_python_resources(exe.pip_install(["--no-binary", "pydantic", "certifi==2022.06.15", "PyYAML", "pydantic", "kubernetes", "beiboot"]))
+    exe.add_python_resources(exe.pip_install(["--no-binary", "pydantic", "certifi==2022.06.15", "pydantic", "kubernetes", "beiboot"]))
+    # the PyYAML wheels ship the libyaml bindings
+    exe.add_python_resources(exe.pip_install(["--only-binary", "PyYAML", "PyYAML"]))
     exe.add_python_resources(exe.pip_install(["semantic-version==2.9.0", "GitPython==3.1.27", "python-hosts==1.0.3"]))
     exe.add_python_resources(exe.pip_install(["pywin32"]))
     exe.add_python_resources(exe.pip_install(["cli-tracker"]))
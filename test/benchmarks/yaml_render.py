@@ -0,0 +1,86 @@
+"""
+Time the parsing of a rendered Helm chart with 5,000 documents, with the libyaml bindings and
+with the pure Python loader which has been used before
+
+    PYTHONPATH=. python test/benchmarks/yaml_render.py
+"""
+import os
+import time
+from unittest.mock import patch
+
+import yaml
+
+from getdeck import yaml_utils
+from getdeck.sources.helm import Helm
+
+DOCUMENTS = 5000
+TEMPLATES = 50
+
+MANIFEST = """---
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: hello-{index}
+  labels:
+    app.kubernetes.io/name: hello
+    app.kubernetes.io/instance: hello-{index}
+    helm.sh/chart: hello-1.0.0
+spec:
+  replicas: 1
+  selector:
+    matchLabels:
+      app.kubernetes.io/instance: hello-{index}
+  template:
+    metadata:
+      labels:
+        app.kubernetes.io/instance: hello-{index}
+    spec:
+      containers:
+        - name: hello
+          image: "nginx:1.23"
+          ports:
+            - name: http
+              containerPort: 80
+              protocol: TCP
+          env:
+            - name: GREETING
+              value: "hello {index}"
+          resources:
+            limits:
+              cpu: 100m
+              memory: 128Mi
+"""
+
+
+def write_chart_output(folder: str) -> None:
+    per_template = DOCUMENTS // TEMPLATES
+    for template in range(TEMPLATES):
+        documents = range(template * per_template, (template + 1) * per_template)
+        with open(os.path.join(folder, f"template-{template}.yaml"), "w") as output:
+            output.write("".join(MANIFEST.format(index=index) for index in documents))
+
+
+def collect(loader) -> float:
+    helm = Helm(config=None)
+    helm.namespace = "default"
+    write_chart_output(helm.tmp_output.name)
+    with patch.object(yaml_utils, "SafeLoader", loader):
+        start = time.perf_counter()
+        files = helm.collect_workload_files()
+        duration = time.perf_counter() - start
+    assert len(files) == DOCUMENTS
+    return duration
+
+
+def main():
+    print(f"libyaml available: {yaml_utils.LIBYAML}")
+    before = collect(yaml.FullLoader)
+    print(f"yaml.FullLoader:   {before:.2f}s")
+    after = collect(yaml_utils.SafeLoader)
+    print(
+        f"{yaml_utils.SafeLoader.__name__ + ':':<18} {after:.2f}s ({before / after:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+import pytest
+
+from getdeck import configuration, workspace
+
+
+@pytest.fixture(autouse=True)
+def deck_directories(tmp_path, monkeypatch):
+    """
+    keep the cache and the workspace of each test in a temporary folder of its own
+    """
+    monkeypatch.setattr(configuration, "CACHE_DIRECTORY", str(tmp_path / "cache"))
+    monkeypatch.setattr(configuration, "WORKDIR", str(tmp_path / "work"))
+    monkeypatch.setattr(workspace, "_workspace", None)
+    yield
+    workspace.close_workspace()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServer(ThreadingHTTPServer):
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+def serve(test_case: TestCase, handler) -> LocalServer:
+    """
+    answer the requests of test_case with handler on a free local port, the server is shut
+    down once the test is over (or earlier by the test)
+    """
+    server = LocalServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    test_case.addCleanup(server.server_close)
+    test_case.addCleanup(server.shutdown)
+    return server
+
+
+def serve_directory(
+    test_case: TestCase, path: str, handler=QuietHandler
+) -> LocalServer:
+    """
+    serve the files of the folder path to test_case
+    """
+    return serve(test_case, functools.partial(handler, directory=path))
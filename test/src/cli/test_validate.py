@@ -0,0 +1,72 @@
+import json
+import os
+import shutil
+import tempfile
+from argparse import Namespace
+from unittest import TestCase
+
+from getdeck import cache, yaml_utils
+from getdeck.cli.validate import run_validate, validate_command
+from getdeck.deckfile.errors import DeckfileError
+
+
+def create_deckfile(sources: list) -> dict:
+    return {"version": "1", "decks": [{"name": "default", "sources": sources}]}
+
+
+class ValidateTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        self.root = os.path.join(self.folder, "repo")
+        inline = {"type": "inline", "content": {"kind": "ConfigMap"}}
+        self._write("a/deck.yaml", create_deckfile([inline]))
+        self._write("a/manifest.yaml", {"kind": "ConfigMap"})
+        self._write("b/deck.yaml", create_deckfile([{"type": "file", "ref": "./x"}]))
+        self._write("c/deck.yaml", create_deckfile([{"type": "jsonnet"}]))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _write(self, path: str, data: dict):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as output:
+            yaml_utils.dump(data, output)
+
+    def test_validate(self):
+        self.assertEqual(run_validate(os.path.join(self.root, "a", "deck.yaml")), [])
+        errors = run_validate(os.path.join(self.root, "b", "deck.yaml"))
+        self.assertEqual(len(errors), 1)
+        self.assertIn("does not exist", errors[0])
+
+    def test_validate_all(self):
+        report = os.path.join(self.folder, "report.json")
+        args = Namespace(
+            Deckfile=self.root,
+            name=None,
+            offline=False,
+            all=True,
+            workers=2,
+            report=report,
+        )
+        with self.assertRaises(DeckfileError):
+            validate_command(args)
+
+        with open(report) as report_file:
+            results = json.load(report_file)
+        self.assertFalse(results["valid"])
+        self.assertEqual(
+            [
+                (result["deckfile"], result["valid"], len(result["errors"]))
+                for result in results["deckfiles"]
+            ],
+            [
+                ("a/deck.yaml", True, 0),
+                ("b/deck.yaml", False, 1),
+                ("c/deck.yaml", False, 1),
+            ],
+        )
+        self.assertIn("unknown type 'jsonnet'", results["deckfiles"][2]["errors"][0])
+        # the workers use the configuration of this process
+        self.assertEqual(len(cache.deckfiles.get_entries()), 3)
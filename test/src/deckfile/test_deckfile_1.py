@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from git import Actor, Repo
+
+from conftest import serve_directory
+from getdeck import yaml_utils
+from getdeck.deckfile import selector
+from getdeck.deckfile.errors import DeckfileError, DeckfileNotFoundError
+from getdeck.deckfile.selector import deckfile_selector
+from getdeck.fetch.fetch import fetch_data
+
+ACTOR = Actor("deck", "deck@getdeck.dev")
+
+
+def create_deck(name: str) -> dict:
+    return {
+        "name": name,
+        "sources": [{"type": "inline", "content": {"kind": "ConfigMap"}}],
+    }
+
+
+class DeckFileTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        self.deck = os.path.join(self.folder, "deck")
+        self._write("deck.yaml", self._get_deckfile())
+        self._write("decks/a.yaml", create_deck("a"))
+        self._write("decks/b.yaml", create_deck("b"))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _get_deckfile(self, decks: list = None) -> dict:
+        return {
+            "version": "1",
+            "cluster": {"provider": "k3d", "name": "fragments"},
+            "decks": decks
+            or [
+                create_deck("main"),
+                {"$ref": "decks/a.yaml", "name": "a"},
+                {"$ref": "decks/b.yaml"},
+                {"$ref": "decks/missing.yaml", "name": "missing"},
+            ],
+        }
+
+    def _write(self, name: str, data: dict):
+        path = os.path.join(self.deck, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as output:
+            yaml_utils.dump(data, output)
+
+    def test_on_demand(self):
+        with patch.object(
+            selector, "load_deck_file", wraps=selector.load_deck_file
+        ) as load:
+            deckfile = deckfile_selector.get(os.path.join(self.deck, "deck.yaml"))
+            self.assertEqual(deckfile.get_cluster().name, "fragments")
+            self.assertEqual(len(deckfile.get_deck("a").sources), 1)
+            self.assertEqual(load.call_count, 1)
+
+            # only deck files without a name are read to list the decks
+            self.assertEqual(deckfile.get_deck_names(), ["main", "a", "b", "missing"])
+            self.assertEqual(load.call_count, 2)
+
+            # deck files without a name may contain the default deck
+            self.assertEqual(deckfile.get_deck().name, "main")
+            self.assertEqual(load.call_count, 2)
+
+        with self.assertRaises(DeckfileNotFoundError):
+            deckfile.get_deck("missing")
+        errors = deckfile.get_errors()
+        self.assertEqual(len(errors), 1)
+        self.assertIn("missing.yaml", errors[0])
+
+    def test_git(self):
+        repo = Repo.init(self.deck)
+        repo.git.add(".")
+        repo.index.commit("initial", author=ACTOR, committer=ACTOR)
+
+        # the deck files are checked out next to a sparse checkout of the Deckfile
+        with fetch_data(f"file://{self.deck}", fetch_sources_flag=False) as data_aux:
+            self.assertFalse(
+                os.path.exists(os.path.join(data_aux.deckfile_aux.path, "decks"))
+            )
+            self.assertEqual(data_aux.deckfile.get_deck("b").name, "b")
+
+        # deck files can be fetched from git repositories, too
+        self._write(
+            "remote/deck.yaml",
+            self._get_deckfile(
+                [{"$ref": f"file://{self.deck}", "path": "decks/a.yaml", "name": "a"}]
+            ),
+        )
+        deckfile = deckfile_selector.get(os.path.join(self.deck, "remote", "deck.yaml"))
+        self.assertEqual(deckfile.get_deck().name, "a")
+
+    def test_git_outside(self):
+        self._write(
+            "deck.yaml",
+            self._get_deckfile(
+                [
+                    {"$ref": "decks/a.yaml", "name": "a"},
+                    {"$ref": "../other/deck.yaml", "name": "other"},
+                ]
+            ),
+        )
+        repo = Repo.init(self.deck)
+        repo.git.add(".")
+        repo.index.commit("initial", author=ACTOR, committer=ACTOR)
+
+        with fetch_data(f"file://{self.deck}", fetch_sources_flag=False) as data_aux:
+            self.assertEqual(data_aux.deckfile.get_deck("a").name, "a")
+            # deck files outside of the repository do not widen the sparse checkout
+            with self.assertRaises(DeckfileError):
+                data_aux.deckfile.get_deck("other")
+            decks = os.path.join(data_aux.deckfile_aux.path, "decks")
+            self.assertEqual(os.listdir(decks), ["a.yaml"])
+
+    def test_http(self):
+        self._write(
+            "deck.yaml",
+            self._get_deckfile(
+                [{"$ref": "decks/a.yaml", "name": "a"}, {"$ref": "~/b.yaml"}]
+            ),
+        )
+        server = serve_directory(self, self.deck)
+        url = f"{server.url}/deck.yaml"
+
+        # the deck files of a downloaded Deckfile are downloaded from next to it
+        with fetch_data(url, fetch_sources_flag=False) as data_aux:
+            self.assertEqual(data_aux.deckfile.get_deck("a").name, "a")
+            with self.assertRaises(DeckfileError):
+                data_aux.deckfile.get_deck_names()
@@ -0,0 +1,56 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from getdeck.deckfile import file
+from getdeck.deckfile.deckfile_1 import Deckfile_1_0
+from getdeck.deckfile.errors import DeckfileError
+from getdeck.deckfile.file import FileSource, HelmSource, InlineSource
+
+
+class LazySourcesTest(TestCase):
+    def setUp(self):
+        self.deckfile = Deckfile_1_0(
+            file_path=".",
+            file_name="deck.yaml",
+            version="1",
+            decks=[
+                {
+                    "name": "valid",
+                    "sources": [
+                        {"type": "inline", "content": {"kind": "Secret"}},
+                        {"type": "file", "content": {"kind": "ConfigMap"}},
+                        {"type": "helm", "ref": "https://charts", "releaseName": "a"},
+                    ],
+                },
+                {"name": "untyped", "sources": [{"ref": "https://example.com"}]},
+                {"name": "unknown", "sources": [{"type": "jsonnet"}]},
+                {"name": "invalid", "sources": [{"type": "helm", "ref": "a"}]},
+            ],
+        )
+
+    def test_selected_deck_only(self):
+        with patch.object(file, "build_source", wraps=file.build_source) as build:
+            deck = self.deckfile.get_deck("valid")
+            self.assertEqual(build.call_count, 0)
+            self.assertEqual(
+                [type(source) for source in deck.sources],
+                [InlineSource, InlineSource, HelmSource],
+            )
+            self.assertIs(deck.sources, deck.sources)
+            self.assertEqual(build.call_count, 3)
+
+        with self.assertRaises(DeckfileError):
+            _ = self.deckfile.get_deck("invalid").sources
+
+    def test_get_errors(self):
+        self.assertEqual(self.deckfile.get_errors("valid"), [])
+        errors = self.deckfile.get_errors()
+        self.assertEqual(len(errors), 3)
+        self.assertIn("did not specify the 'type' argument", errors[0])
+        self.assertIn("unknown type 'jsonnet'", errors[1])
+        self.assertIn("releaseName", errors[2])
+
+    def test_models(self):
+        source = FileSource(ref="deck.yaml")
+        deck = file.DeckfileDeck(name="models", sources=[source])
+        self.assertIs(deck.sources[0], source)
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from getdeck import cache, configuration, yaml_utils
+from getdeck.deckfile.selector import deckfile_selector, get_cache_key
+
+
+class DeckfileCacheTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _write(self, folder: str, decks: int = 40) -> str:
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, "deck.yaml")
+        deckfile = {
+            "version": "1",
+            "cluster": {"provider": "k3d", "name": "cached"},
+            "decks": [
+                {
+                    "name": f"deck-{i}",
+                    "sources": [{"type": "inline", "content": {"kind": "Secret"}}],
+                }
+                for i in range(decks)
+            ],
+        }
+        with open(path, "w") as output:
+            yaml_utils.dump(deckfile, output)
+        return path
+
+    def test_cached(self):
+        path = self._write(os.path.join(self.folder, "first"))
+        deckfile = deckfile_selector.get(path)
+        self.assertEqual(len(cache.deckfiles.get_entries()), 1)
+
+        # the same content at another location is neither parsed nor validated again
+        other = self._write(os.path.join(self.folder, "second"))
+        with patch.object(yaml_utils, "load", side_effect=AssertionError):
+            cached = deckfile_selector.get(other)
+        self.assertEqual(cached.file_path, os.path.join(self.folder, "second"))
+        self.assertEqual(cached.file_name, "deck.yaml")
+        self.assertEqual(cached.get_decks(), deckfile.get_decks())
+        self.assertEqual(cached.get_cluster().name, "cached")
+
+    def test_invalidated(self):
+        path = self._write(self.folder, decks=1)
+        self.assertEqual(len(deckfile_selector.get(path).get_decks()), 1)
+        path = self._write(self.folder, decks=2)
+        self.assertEqual(len(deckfile_selector.get(path).get_decks()), 2)
+
+        # a new release or a broken entry parse the Deckfile again
+        with open(path, "rb") as deckfile:
+            key = get_cache_key(deckfile.read())
+        for broken in ["broken", '{"version": "1", "decks": 2}']:
+            with open(cache.deckfiles.get_path(f"{key}.json"), "w") as cached_file:
+                cached_file.write(broken)
+            self.assertEqual(len(deckfile_selector.get(path).get_decks()), 2)
+        with patch.object(configuration, "__VERSION__", "0.0.0"):
+            self.assertNotEqual(get_cache_key(b"version: 1"), key)
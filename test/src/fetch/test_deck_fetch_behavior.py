@@ -1,6 +1,11 @@
 import os
+import shutil
+import tempfile
 from unittest import TestCase
-from getdeck import configuration
+
+from git import Actor, Repo
+
+from getdeck import configuration, workspace
 from getdeck.fetch.deck_fetcher import DeckfileAux, FetchError, Git, Http
 
 
@@ -15,7 +20,8 @@ class GitTest(TestCase):
         self.assertEqual(deckfile_aux.name, configuration.DECKFILE_FILE)
 
         path = deckfile_aux.path
-        del deckfile_aux
+        deckfile_aux.cleanup()
+        workspace.close_workspace()
         self.assertFalse(os.path.isdir(path))
 
     def test_branch(self):
@@ -28,7 +34,8 @@ class GitTest(TestCase):
         self.assertEqual(deckfile_aux.name, configuration.DECKFILE_FILE)
 
         path = deckfile_aux.path
-        del deckfile_aux
+        deckfile_aux.cleanup()
+        workspace.close_workspace()
         self.assertFalse(os.path.isdir(path))
 
     def test_branch_invalid(self):
@@ -50,7 +57,8 @@ class GitTest(TestCase):
         self.assertEqual(deckfile_aux.name, configuration.DECKFILE_FILE)
 
         path = deckfile_aux.path
-        del deckfile_aux
+        deckfile_aux.cleanup()
+        workspace.close_workspace()
         self.assertFalse(os.path.isdir(path))
 
 
@@ -78,3 +86,43 @@ class HttpTest(TestCase):
         fetch_behavior = Http()
         with self.assertRaises(FetchError):
             _ = fetch_behavior.fetch(data=deckfile_aux)
+
+
+class GitDeckfileOnlyTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.origin = os.path.join(self.folder, "origin.git")
+        repo = Repo.init(self.origin)
+        shutil.copy("./test/sources/deck.inline.yaml", self.origin)
+        os.rename(
+            os.path.join(self.origin, "deck.inline.yaml"),
+            os.path.join(self.origin, configuration.DECKFILE_FILE),
+        )
+        shutil.copytree("./test/resources", os.path.join(self.origin, "resources"))
+        repo.git.add(".")
+        actor = Actor("deck", "deck@getdeck.dev")
+        repo.index.commit("initial", author=actor, committer=actor)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_deckfile_only(self):
+        deckfile_aux = DeckfileAux(location=self.origin)
+
+        fetch_behavior = Git()
+        deckfile_aux = fetch_behavior.fetch(data=deckfile_aux, deckfile_only=True)
+
+        self.assertEqual(sorted(os.listdir(deckfile_aux.path)), [".git", "deck.yaml"])
+
+        path = deckfile_aux.path
+        deckfile_aux.cleanup()
+        workspace.close_workspace()
+        self.assertFalse(os.path.isdir(path))
+
+    def test_full(self):
+        deckfile_aux = DeckfileAux(location=self.origin)
+
+        fetch_behavior = Git()
+        deckfile_aux = fetch_behavior.fetch(data=deckfile_aux)
+
+        self.assertTrue(os.path.isdir(os.path.join(deckfile_aux.path, "resources")))
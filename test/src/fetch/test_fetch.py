@@ -1,7 +1,20 @@
+import os
+import shutil
+import tarfile
+import tempfile
 from unittest import TestCase
-from getdeck.deckfile.file import FileSource, InlineSource
 
-from getdeck.fetch.fetch import fetch_data, fetch_source
+from conftest import serve_directory
+from getdeck import yaml_utils
+
+from getdeck.deckfile.file import DeckfileDeck, FileSource, InlineSource
+
+from getdeck.fetch.fetch import (
+    FetchError,
+    fetch_all_sources,
+    fetch_data,
+    fetch_source,
+)
 
 
 GIT_REF = "git@github.com:Getdeck/getdeck.git"
@@ -33,6 +46,45 @@ class FetchSourceTest(TestCase):
         self.assertIn("/test/resources/test", source_aux.path)
 
 
+class FetchAllSourcesTest(TestCase):
+    def test_order(self):
+        refs = [
+            "./test/resources/file/hello.yaml",
+            "./test/sources/hello.yaml",
+            "./test/sources/resources/hello.yaml",
+        ]
+        sources = [{"type": "inline", "content": {}}]
+        sources += [{"type": "file", "ref": ref} for ref in refs]
+        deck = DeckfileDeck(name="test", sources=sources)
+
+        source_auxs = fetch_all_sources(deck=deck, workers=2)
+        self.assertEqual(len(source_auxs), 4)
+        self.assertIsNone(source_auxs[0].location)
+        self.assertEqual([source_aux.location for source_aux in source_auxs[1:]], refs)
+
+    def test_error(self):
+        sources = [
+            {"type": "file", "ref": "./test/resources/file/hello.yaml"},
+            {"type": "file", "ref": "/does/not/exist.git", "path": "hello.yaml"},
+        ]
+        deck = DeckfileDeck(name="test", sources=sources)
+
+        with self.assertRaises(FetchError):
+            _ = fetch_all_sources(deck=deck, workers=2)
+
+    def test_offline_missing(self):
+        refs = ["http://127.0.0.1:1/hello.yaml", "http://127.0.0.1:1/world.yaml"]
+        sources = [{"type": "file", "ref": "./test/resources/file/hello.yaml"}]
+        sources += [{"type": "file", "ref": ref} for ref in refs]
+        deck = DeckfileDeck(name="test", sources=sources)
+
+        # all missing sources are reported at once
+        with self.assertRaises(FetchError) as context:
+            _ = fetch_all_sources(deck=deck, workers=1, offline=True)
+        for ref in refs:
+            self.assertIn(ref, str(context.exception))
+
+
 class FetchDataTest(TestCase):
     def test_local_empty(self):
         location = "./test/deckfile/deck.empty.yaml"
@@ -56,11 +108,79 @@ class FetchDataTest(TestCase):
         self.assertEqual(len(data_aux.source_auxs), 6)
 
     def test_local_helm(self):
-        location = "./test/sources/deck.helm.yaml"
-        data_aux = fetch_data(location)
-        self.assertIsNotNone(data_aux.deckfile)
-        self.assertIsNotNone(data_aux.deckfile_aux)
-        self.assertEqual(len(data_aux.source_auxs), 2)
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        # a helm repository with two versions of the chart of the local source
+        entries = []
+        for version in ["0.1.0", "0.2.0"]:
+            with tarfile.open(
+                os.path.join(folder, f"empty-{version}.tgz"), "w:gz"
+            ) as tar:
+                tar.add("./test/resources/helm/empty", arcname="empty")
+            entries.append({"version": version, "urls": [f"empty-{version}.tgz"]})
+        with open(os.path.join(folder, "index.yaml"), "w") as index:
+            yaml_utils.dump({"apiVersion": "v1", "entries": {"empty": entries}}, index)
+
+        server = serve_directory(self, folder)
+
+        sources = [
+            {
+                "type": "helm",
+                "ref": server.url,
+                "chart": "empty",
+                "releaseName": "remote",
+                "helmArgs": ["--create-namespace", "--version", "0.1.0"],
+            },
+            {
+                "type": "helm",
+                "ref": os.path.abspath("./test/resources/helm/empty"),
+                "path": ".",
+                "chart": "empty",
+                "releaseName": "local",
+            },
+        ]
+        with open(os.path.join(folder, "deck.yaml"), "w") as deckfile:
+            yaml_utils.dump(
+                {"version": "1", "decks": [{"name": "test", "sources": sources}]},
+                deckfile,
+            )
+
+        with fetch_data(os.path.join(folder, "deck.yaml")) as data_aux:
+            self.assertIsNotNone(data_aux.deckfile)
+            self.assertIsNotNone(data_aux.deckfile_aux)
+            self.assertEqual(len(data_aux.source_auxs), 2)
+            # the chart is pulled in the version of its helmArgs rather than the latest one
+            self.assertEqual(data_aux.source_auxs[0].lock["version"], "0.1.0")
+
+    def test_all_decks(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        with open(os.path.join(folder, "deck.yaml"), "w") as deckfile:
+            deckfile.write(
+                'version: "1"\n'
+                "cluster:\n  provider: k3d\n  name: all\n"
+                "decks:\n"
+                "  - name: hello\n"
+                "    sources:\n"
+                "      - type: inline\n"
+                "        content: {kind: ConfigMap}\n"
+                "  - name: world\n"
+                "    sources:\n"
+                "      - type: inline\n"
+                "        content: {kind: ConfigMap}\n"
+                "      - type: inline\n"
+                "        content: {kind: Secret}\n"
+            )
+
+        with fetch_data(os.path.join(folder, "deck.yaml"), all_decks=True) as data_aux:
+            # sources shared by decks are fetched once
+            self.assertEqual(len(data_aux.source_auxs), 2)
+
+    def test_local_without_sources(self):
+        location = "./test/sources/deck.file.yaml"
+        data_aux = fetch_data(location, fetch_sources_flag=False)
+        self.assertIsNotNone(data_aux.deckfile.get_cluster())
+        self.assertIsNone(data_aux.source_auxs)
 
     def test_git_with_no_deckfile(self):
         location = GIT_REF
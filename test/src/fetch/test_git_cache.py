@@ -0,0 +1,231 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from git import Actor, Repo
+
+from getdeck import workspace
+from getdeck.fetch import git_cache
+from getdeck.fetch.errors import OfflineError
+
+
+ACTOR = Actor("deck", "deck@getdeck.dev")
+
+
+def create_repository(path: str) -> Repo:
+    repo = Repo.init(path)
+    os.makedirs(os.path.join(path, "manifests"))
+    with open(os.path.join(path, "deck.yaml"), "w") as deckfile:
+        deckfile.write('version: "1"\n')
+    with open(os.path.join(path, "manifests", "hello.yaml"), "w") as manifest:
+        manifest.write("kind: ConfigMap\n")
+    repo.index.add(["deck.yaml", "manifests/hello.yaml"])
+    repo.index.commit("initial", author=ACTOR, committer=ACTOR)
+    return repo
+
+
+class GitCacheTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.origin = os.path.join(self.folder, "origin.git")
+        self.repo = create_repository(self.origin)
+        self.repo.config_writer().set_value(
+            "uploadpack", "allowFilter", "true"
+        ).release()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            git_cache.normalize_url("https://github.com/Getdeck/getdeck.git/"),
+            "https://github.com/Getdeck/getdeck",
+        )
+        self.assertEqual(
+            git_cache.get_mirror_path("https://github.com/Getdeck/getdeck.git"),
+            git_cache.get_mirror_path("https://github.com/Getdeck/getdeck"),
+        )
+
+    def test_mirror(self):
+        mirror = git_cache.update_mirror(self.origin)
+        self.assertTrue(mirror.bare)
+        self.assertEqual(mirror.working_dir, git_cache.get_mirror_path(self.origin))
+
+        # an incremental fetch picks up new commits
+        commit = self.repo.index.commit("second", author=ACTOR, committer=ACTOR)
+        mirror = git_cache.update_mirror(self.origin)
+        self.assertEqual(mirror.commit("HEAD").hexsha, commit.hexsha)
+
+    @patch.object(git_cache, "get_local_path", return_value=None)
+    def test_checkout(self, _):
+        registry = git_cache.CheckoutRegistry()
+        folder = registry.acquire(url=self.origin, rev=None)
+        self.assertTrue(os.path.isfile(os.path.join(folder, "deck.yaml")))
+        self.assertTrue(os.path.isfile(os.path.join(folder, "manifests", "hello.yaml")))
+
+        # the worktree of a removed checkout is pruned with the next update
+        registry.release(folder)
+        workspace.close_workspace()
+        mirror = git_cache.update_mirror(self.origin)
+        self.assertEqual(len(mirror.git.worktree("list").splitlines()), 1)
+
+    @patch.object(git_cache, "get_local_path", return_value=None)
+    def test_offline(self, _):
+        registry = git_cache.CheckoutRegistry()
+        with self.assertRaises(OfflineError):
+            registry.acquire(url=self.origin, rev="HEAD", offline=True)
+
+        git_cache.update_mirror(self.origin)
+        folder = registry.acquire(url=self.origin, rev="HEAD", offline=True)
+        self.assertTrue(os.path.isfile(os.path.join(folder, "deck.yaml")))
+        registry.release(folder)
+
+    def test_sparse_pattern(self):
+        self.assertIsNone(git_cache.get_sparse_pattern(None))
+        self.assertIsNone(git_cache.get_sparse_pattern("."))
+        self.assertIsNone(git_cache.get_sparse_pattern("./"))
+        self.assertIsNone(git_cache.get_sparse_pattern("../other"))
+        self.assertEqual(git_cache.get_sparse_pattern("./manifests/"), "/manifests")
+        self.assertEqual(
+            git_cache.get_sparse_pattern("manifests/hello.yaml"),
+            "/manifests/hello.yaml",
+        )
+
+    @patch.object(git_cache, "get_local_path", return_value=None)
+    def test_sparse_checkout(self, _):
+        url = f"file://{self.origin}"
+        registry = git_cache.CheckoutRegistry()
+        folder = registry.acquire(url=url, rev=None, paths=["manifests"])
+        self.assertTrue(os.path.isfile(os.path.join(folder, "manifests", "hello.yaml")))
+        self.assertFalse(os.path.isfile(os.path.join(folder, "deck.yaml")))
+        registry.release(folder)
+
+        mirror = git_cache.update_mirror(url)
+        self.assertEqual(
+            mirror.git.config("remote.origin.partialclonefilter"), "blob:none"
+        )
+
+    def test_registry(self):
+        url = f"file://{self.origin}"
+        registry = git_cache.CheckoutRegistry()
+        folder = registry.acquire(url=url, rev=None, paths=["manifests/hello.yaml"])
+        self.assertFalse(os.path.isfile(os.path.join(folder, "deck.yaml")))
+
+        # the same revision is shared and widened to the paths of all users
+        self.assertEqual(registry.acquire(url=f"{url}/", rev="HEAD"), folder)
+        self.assertTrue(os.path.isfile(os.path.join(folder, "deck.yaml")))
+
+        registry.release(folder)
+        self.assertTrue(os.path.isdir(folder))
+        registry.release(folder)
+        # checkouts are removed in the background
+        workspace.close_workspace()
+        self.assertFalse(os.path.isdir(folder))
+
+    def test_registry_revisions(self):
+        registry = git_cache.CheckoutRegistry()
+        first = registry.acquire(url=self.origin, rev=None)
+        self.repo.index.commit("second", author=ACTOR, committer=ACTOR)
+        second = registry.acquire(url=self.origin, rev=self.repo.head.commit.hexsha)
+        self.assertNotEqual(first, second)
+
+        registry.release(first)
+        registry.release(second)
+        workspace.close_workspace()
+        self.assertFalse(os.path.isdir(first))
+        self.assertFalse(os.path.isdir(second))
+
+    def test_local_path(self):
+        self.assertEqual(git_cache.get_local_path(self.origin), self.origin)
+        self.assertEqual(git_cache.get_local_path(f"file://{self.origin}"), self.origin)
+        self.assertIsNone(
+            git_cache.get_local_path("git@github.com:Getdeck/getdeck.git")
+        )
+
+    def test_local_checkout(self):
+        registry = git_cache.CheckoutRegistry()
+        folder = registry.acquire(
+            url=f"file://{self.origin}", rev="HEAD", paths=["manifests"]
+        )
+        self.assertTrue(os.path.isfile(os.path.join(folder, "manifests", "hello.yaml")))
+        self.assertFalse(os.path.isfile(os.path.join(folder, "deck.yaml")))
+
+        # objects are shared with the local repository, which is left untouched
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(folder, ".git", "objects", "info", "alternates")
+            )
+        )
+        self.assertEqual(len(self.repo.git.worktree("list").splitlines()), 1)
+        self.assertFalse(os.path.isdir(git_cache.get_mirror_path(self.origin)))
+
+    def test_resolve_submodule_url(self):
+        url = "git@github.com:Getdeck/getdeck.git"
+        self.assertEqual(
+            git_cache.resolve_submodule_url(url, "../charts.git"),
+            "git@github.com:Getdeck/charts.git",
+        )
+        self.assertEqual(
+            git_cache.resolve_submodule_url(
+                "https://github.com/Getdeck/getdeck.git", "../../gefyrahq/gefyra.git"
+            ),
+            "https://github.com/gefyrahq/gefyra.git",
+        )
+        self.assertEqual(
+            git_cache.resolve_submodule_url(url, "https://example.com/lib.git"),
+            "https://example.com/lib.git",
+        )
+
+    def test_recursive_submodule(self):
+        # the submodule refers to an earlier commit of its own superproject
+        self.repo.git(c="protocol.file.allow=always").submodule(
+            "add", "../origin.git", "charts/origin"
+        )
+        self.repo.index.commit("submodule", author=ACTOR, committer=ACTOR)
+
+        registry = git_cache.CheckoutRegistry()
+        folders = []
+        thread = threading.Thread(
+            target=lambda: folders.append(
+                registry.acquire(url=self.origin, rev=None, submodules=True)
+            ),
+            daemon=True,
+        )
+        thread.start()
+        thread.join(timeout=60)
+        self.assertFalse(thread.is_alive())
+        submodule = os.path.join(folders[0], "charts", "origin")
+        self.assertTrue(os.path.isfile(os.path.join(submodule, "deck.yaml")))
+        registry.release(folders[0])
+
+    def test_submodules(self):
+        library = create_repository(os.path.join(self.folder, "library.git"))
+        self.repo.git(c="protocol.file.allow=always").submodule(
+            "add", "../library.git", "charts/library"
+        )
+        self.repo.index.commit("submodule", author=ACTOR, committer=ACTOR)
+
+        registry = git_cache.CheckoutRegistry()
+        folder = registry.acquire(url=self.origin, rev=None)
+        self.assertEqual(os.listdir(os.path.join(folder, "charts", "library")), [])
+
+        # submodules are checked out on request, at the commit of the superproject
+        self.assertEqual(
+            registry.acquire(url=self.origin, rev=None, submodules=True), folder
+        )
+        submodule = os.path.join(folder, "charts", "library")
+        self.assertTrue(os.path.isfile(os.path.join(submodule, "deck.yaml")))
+        self.assertEqual(
+            git_cache.get_submodules(Repo(folder)),
+            [("charts/library", "charts/library", "../library.git")],
+        )
+        self.assertEqual(Repo(submodule).head.commit.hexsha, library.head.commit.hexsha)
+
+        registry.release(folder)
+        registry.release(folder)
+        # checkouts are removed in the background
+        workspace.close_workspace()
+        self.assertFalse(os.path.isdir(folder))
@@ -0,0 +1,175 @@
+import hashlib
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+from unittest import TestCase
+
+import yaml
+
+from conftest import serve_directory
+from getdeck.deckfile.file import HelmSource
+from getdeck.fetch import chart_dependencies, charts, helm_repository
+from getdeck.fetch.errors import OfflineError
+from getdeck.fetch.source_fetcher import HelmRepository
+from getdeck.fetch.types import SourceAux
+
+
+def create_chart(name: str, version: str) -> bytes:
+    content = f"apiVersion: v2\nname: {name}\nversion: {version}\n".encode("utf-8")
+    chart = io.BytesIO()
+    with tarfile.open(fileobj=chart, mode="w:gz") as tar:
+        info = tarfile.TarInfo(f"{name}/Chart.yaml")
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+    return chart.getvalue()
+
+
+def create_repository(folder: str, name: str, versions: list):
+    entries = []
+    for version in versions:
+        chart = create_chart(name, version)
+        with open(os.path.join(folder, f"{name}-{version}.tgz"), "wb") as chart_file:
+            chart_file.write(chart)
+        entries.append(
+            {
+                "version": version,
+                "digest": hashlib.sha256(chart).hexdigest(),
+                "urls": [f"{name}-{version}.tgz"],
+            }
+        )
+    with open(os.path.join(folder, "index.yaml"), "w") as index:
+        yaml.safe_dump({"apiVersion": "v1", "entries": {name: entries}}, index)
+
+
+class HelmRepositoryTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        os.makedirs(os.path.join(self.folder, "www"))
+        create_repository(
+            os.path.join(self.folder, "www"), "hello", ["1.1.0-rc.1", "1.0.0", "0.9.0"]
+        )
+        self.server = serve_directory(self, os.path.join(self.folder, "www"))
+        self.url = self.server.url
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _read_chart(self, folder: str) -> str:
+        with open(os.path.join(folder, "Chart.yaml"), "r") as chart_file:
+            return chart_file.read()
+
+    def test_resolve_chart(self):
+        self.assertEqual(
+            helm_repository.resolve_chart(self.url, "hello")["version"], "1.0.0"
+        )
+        self.assertEqual(
+            helm_repository.resolve_chart(f"{self.url}/", "hello", version="0.9.0")[
+                "urls"
+            ],
+            ["hello-0.9.0.tgz"],
+        )
+        with self.assertRaises(RuntimeError):
+            helm_repository.resolve_chart(self.url, "world")
+        self.assertEqual(
+            helm_repository.resolve_chart(self.url, "hello", devel=True)["version"],
+            "1.1.0-rc.1",
+        )
+
+    def test_resolve_version_constraint(self):
+        for version, resolved in [
+            ("~0.9.0", "0.9.0"),
+            (">=0.9.0, <2.0.0", "1.0.0"),
+            ("1.x", "1.0.0"),
+            ("1.1.0-rc.1", "1.1.0-rc.1"),
+        ]:
+            entry = helm_repository.resolve_chart(self.url, "hello", version=version)
+            self.assertEqual(entry["version"], resolved)
+
+    def test_pull_chart(self):
+        chart = helm_repository.pull_chart(self.url, "hello")
+        self.assertEqual(chart.version, "1.0.0")
+        self.assertEqual(os.path.basename(chart.path), "hello")
+        self.assertIn("version: 1.0.0", self._read_chart(chart.path))
+
+        # a pinned chart is used from the cache without any request
+        self.server.shutdown()
+        pinned = helm_repository.pull_chart(
+            self.url, "hello", version=chart.version, digest=chart.digest
+        )
+        self.assertEqual(pinned, chart)
+
+    def test_helm_args(self):
+        self.assertEqual(
+            charts.get_version_args(["--create-namespace", "--version", "~0.9.0"]),
+            ("~0.9.0", False),
+        )
+        self.assertEqual(charts.get_version_args(["--devel"]), (None, True))
+
+        # the chart to pull is selected by --version and --devel like helm does
+        for helm_args, version in [
+            (["--version=0.9.0"], "0.9.0"),
+            (["--devel"], "1.1.0-rc.1"),
+            (None, "1.0.0"),
+        ]:
+            source = HelmSource(
+                ref=self.url, chart="hello", releaseName="hello", helmArgs=helm_args
+            )
+            source_aux = SourceAux(location=source.ref)
+            source_aux.source = source
+            source_aux = HelmRepository().fetch(source_aux, **source.dict())
+            self.assertEqual(source_aux.lock["version"], version)
+
+    def test_pull_offline(self):
+        chart = helm_repository.pull_chart(self.url, "hello")
+        self.server.shutdown()
+
+        self.assertEqual(
+            helm_repository.pull_chart(self.url, "hello", offline=True), chart
+        )
+        with self.assertRaises(OfflineError):
+            helm_repository.pull_chart(self.url, "hello", version="0.9.0", offline=True)
+
+    def test_pull_dependencies(self):
+        chart_path = os.path.join(self.folder, "chart")
+        os.makedirs(chart_path)
+        dependencies = [
+            {"name": "hello", "version": "~0.9.0", "repository": self.url},
+            {
+                "name": "hello",
+                "alias": "latest",
+                "version": "*",
+                "repository": self.url,
+            },
+        ]
+        with open(os.path.join(chart_path, "Chart.yaml"), "w") as chart_file:
+            yaml.safe_dump(
+                {"apiVersion": "v2", "dependencies": dependencies}, chart_file
+            )
+
+        pulled = chart_dependencies.pull_dependencies(chart_path)
+        self.assertEqual(pulled["hello"].version, "0.9.0")
+        self.assertEqual(pulled["latest"].version, "1.0.0")
+        self.assertIn("version: 0.9.0", self._read_chart(pulled["hello"].path))
+
+        # locked dependencies are used from the cache
+        self.server.shutdown()
+        locked = {"hello": pulled["hello"]._asdict()}
+        self.assertEqual(
+            chart_dependencies.pull_dependencies(
+                chart_path, locked=locked, offline=True
+            )["hello"],
+            pulled["hello"],
+        )
+
+        # local dependencies are left to helm
+        dependencies.append({"name": "world", "repository": "file://../world"})
+        with open(os.path.join(chart_path, "Chart.yaml"), "w") as chart_file:
+            yaml.safe_dump(
+                {"apiVersion": "v2", "dependencies": dependencies}, chart_file
+            )
+        self.assertIsNone(
+            chart_dependencies.pull_dependencies(chart_path, offline=True)
+        )
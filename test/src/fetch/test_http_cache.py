@@ -0,0 +1,68 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from http.server import SimpleHTTPRequestHandler
+from unittest import TestCase
+
+from conftest import serve_directory
+from getdeck.fetch import http_cache
+from getdeck.fetch.errors import OfflineError
+
+
+CONTENT = b"kind: ConfigMap\n"
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    status_codes = []
+
+    def log_request(self, code="-", size="-"):
+        self.status_codes.append(int(code))
+
+
+class HttpCacheTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.folder, "www"))
+        with open(os.path.join(self.folder, "www", "hello.yaml"), "wb") as manifest:
+            manifest.write(CONTENT)
+
+        RecordingHandler.status_codes = []
+        self.server = serve_directory(
+            self, os.path.join(self.folder, "www"), handler=RecordingHandler
+        )
+        self.url = f"{self.server.url}/hello.yaml"
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_not_modified(self):
+        target = io.BytesIO()
+        digest = http_cache.download(self.url, target)
+        self.assertEqual(target.getvalue(), CONTENT)
+        self.assertEqual(digest, hashlib.sha256(CONTENT).hexdigest())
+        self.assertTrue(os.path.isfile(http_cache.get_blob_path(digest)))
+
+        target = io.BytesIO()
+        self.assertEqual(http_cache.download(self.url, target), digest)
+        self.assertEqual(target.getvalue(), CONTENT)
+        self.assertEqual(RecordingHandler.status_codes, [200, 304])
+
+    def test_not_found(self):
+        with self.assertRaises(Exception):
+            http_cache.download(self.url.replace("hello", "missing"), io.BytesIO())
+
+    def test_offline(self):
+        digest = http_cache.download(self.url, io.BytesIO())
+
+        # offline the cached content is used without revalidation
+        target = io.BytesIO()
+        self.assertEqual(http_cache.download(self.url, target, offline=True), digest)
+        self.assertEqual(target.getvalue(), CONTENT)
+        self.assertEqual(RecordingHandler.status_codes, [200])
+
+        with self.assertRaises(OfflineError):
+            http_cache.download(
+                self.url.replace("hello", "world"), io.BytesIO(), offline=True
+            )
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import shutil
+import tarfile
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from git import Actor, Repo
+
+from conftest import serve_directory
+from getdeck import configuration
+from getdeck.cli.lock import run_lock
+from getdeck.deckfile.file import FileSource, HelmSource
+from getdeck.fetch import git_cache, lock
+from getdeck.fetch.fetch import fetch_data
+from getdeck.fetch.types import DeckfileAux
+
+
+ACTOR = Actor("deck", "deck@getdeck.dev")
+
+HELM_CHART = "apiVersion: v2\nname: hello\nversion: 1.0.0\n"
+
+
+class LockTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        os.makedirs(os.path.join(self.folder, "www", "hello"))
+        self._write(os.path.join(self.folder, "www", "hello", "Chart.yaml"), HELM_CHART)
+        chart_path = os.path.join(self.folder, "www", "hello-1.0.0.tgz")
+        with tarfile.open(chart_path, "w:gz") as chart:
+            chart.add(os.path.join(self.folder, "www", "hello"), arcname="hello")
+        with open(chart_path, "rb") as chart:
+            digest = hashlib.sha256(chart.read()).hexdigest()
+        self._write(
+            os.path.join(self.folder, "www", "index.yaml"),
+            "apiVersion: v1\nentries:\n  hello:\n"
+            f"    - version: 1.0.0\n      digest: {digest}\n"
+            "      urls: [hello-1.0.0.tgz]\n",
+        )
+        self._write(os.path.join(self.folder, "www", "hello.yaml"), "hello: 1\n")
+        self.server = serve_directory(self, os.path.join(self.folder, "www"))
+        self.url = self.server.url
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _write(self, path: str, content: str):
+        with open(path, "w") as output:
+            output.write(content)
+
+    def _read(self, path: str) -> str:
+        with open(path, "r") as source:
+            return source.read()
+
+    def test_source_key(self):
+        source = FileSource(ref="https://example.com/hello.yaml")
+        self.assertEqual(
+            lock.get_source_key(source),
+            lock.get_source_key(FileSource(ref="https://example.com/hello.yaml")),
+        )
+        self.assertNotEqual(
+            lock.get_source_key(source),
+            lock.get_source_key(FileSource(ref="https://example.com/world.yaml")),
+        )
+
+    def test_read_write(self):
+        deckfile_aux = DeckfileAux(location=self.folder, path=self.folder)
+        self.assertIsNone(lock.read_lock(deckfile_aux))
+
+        source = FileSource(ref="https://example.com/hello.yaml")
+        entry = {"ref": source.ref, "sha256": "0" * 64}
+        lock_path = lock.write_lock(deckfile_aux, {lock.get_source_key(source): entry})
+        self.assertEqual(lock_path, os.path.join(self.folder, configuration.LOCK_FILE))
+        self.assertEqual(
+            lock.get_source_lock(lock.read_lock(deckfile_aux), source), entry
+        )
+        other = HelmSource(ref=self.url, chart="hello", releaseName="hello")
+        self.assertIsNone(lock.get_source_lock(lock.read_lock(deckfile_aux), other))
+
+    def test_locked_fetch(self):
+        origin = os.path.join(self.folder, "origin")
+        repo = Repo.init(origin)
+        self._write(os.path.join(origin, "world.yaml"), "world: 1\n")
+        repo.index.add(["world.yaml"])
+        repo.index.commit("initial", author=ACTOR, committer=ACTOR)
+
+        deck = os.path.join(self.folder, "deck")
+        os.makedirs(deck)
+        self._write(
+            os.path.join(deck, "deck.yaml"),
+            'version: "1"\n'
+            "cluster:\n  provider: k3d\n  name: lock\n"
+            "decks:\n"
+            "  - name: lock\n"
+            "    sources:\n"
+            "      - type: file\n"
+            f"        ref: {self.url}/hello.yaml\n"
+            "      - type: file\n"
+            f"        ref: file://{origin}\n"
+            "        path: world.yaml\n"
+            "      - type: helm\n"
+            f"        ref: {self.url}\n"
+            "        chart: hello\n"
+            "        releaseName: hello\n",
+        )
+
+        lock_path = run_lock(os.path.join(deck, "deck.yaml"))
+        self.assertEqual(lock_path, os.path.join(deck, "deck.lock"))
+        sources = lock.read_lock(DeckfileAux(location=deck, path=deck))["sources"]
+        self.assertEqual(len(sources), 3)
+        entries = {entry["ref"]: entry for entry in sources.values()}
+        self.assertEqual(entries[self.url]["version"], "1.0.0")
+        self.assertEqual(
+            entries[f"file://{origin}"]["revision"], repo.head.commit.hexsha
+        )
+
+        # changes upstream do not affect locked fetches
+        self._write(os.path.join(self.folder, "www", "hello.yaml"), "hello: 2\n")
+        self._write(os.path.join(origin, "world.yaml"), "world: 2\n")
+        repo.index.add(["world.yaml"])
+        repo.index.commit("second", author=ACTOR, committer=ACTOR)
+
+        with fetch_data(os.path.join(deck, "deck.yaml"), deck_name="lock") as data_aux:
+            hello, world, helm = data_aux.source_auxs
+            self.assertEqual(
+                self._read(os.path.join(hello.path, hello.name)), "hello: 1\n"
+            )
+            self.assertEqual(
+                self._read(os.path.join(world.path, world.name)), "world: 1\n"
+            )
+            self.assertEqual({"ref": self.url, **helm.lock}, entries[self.url])
+
+    @patch.object(git_cache, "get_local_path", return_value=None)
+    def test_pinned_commit(self, _):
+        origin = os.path.join(self.folder, "origin.git")
+        repo = Repo.init(origin)
+        self._write(os.path.join(origin, "world.yaml"), "world: 1\n")
+        repo.index.add(["world.yaml"])
+        commit = repo.index.commit("initial", author=ACTOR, committer=ACTOR)
+        git_cache.update_mirror(origin)
+
+        # a commit which is in the mirror already is checked out without fetching
+        registry = git_cache.CheckoutRegistry()
+        with patch.object(git_cache, "update_mirror") as update_mirror:
+            folder = registry.acquire(url=origin, rev=commit.hexsha)
+            update_mirror.assert_not_called()
+        self.assertEqual(git_cache.get_revision(folder), commit.hexsha)
+        registry.release(folder)
@@ -0,0 +1,189 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase
+from urllib.parse import parse_qs
+
+from conftest import serve
+from getdeck.fetch import oci
+
+
+def create_chart(name: str, version: str) -> bytes:
+    content = f"apiVersion: v2\nname: {name}\nversion: {version}\n".encode("utf-8")
+    chart = io.BytesIO()
+    with tarfile.open(fileobj=chart, mode="w:gz") as tar:
+        info = tarfile.TarInfo(f"{name}/Chart.yaml")
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+    return chart.getvalue()
+
+
+def get_digest(content: bytes) -> str:
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """
+    a minimal oci distribution api requiring anonymous bearer tokens
+    """
+
+    blobs = {}
+    tags = {}
+    requests = []
+    # the number of tags per page of the tag list
+    page_size = 2
+
+    def _send(self, status: int, body: bytes = b"", headers: dict = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        host = f"{self.server.server_address[0]}:{self.server.server_port}"
+        if self.path.startswith("/token"):
+            self._send(200, json.dumps({"token": "deck"}).encode("utf-8"))
+            return
+        if self.headers.get("Authorization") != "Bearer deck":
+            challenge = (
+                f'Bearer realm="http://{host}/token",service="{host}",'
+                'scope="repository:charts/hello:pull"'
+            )
+            self._send(401, headers={"WWW-Authenticate": challenge})
+            return
+
+        path, _, query = self.path.partition("?")
+        _, _, repository_path = path.partition("/v2/charts/hello/")
+        kind, _, reference = repository_path.partition("/")
+        if kind == "tags" and reference == "list":
+            tags = sorted(self.tags)
+            last = parse_qs(query).get("last")
+            if last:
+                tags = [tag for tag in tags if tag > last[0]]
+            headers = {}
+            if len(tags) > self.page_size:
+                tags = tags[: self.page_size]
+                headers[
+                    "Link"
+                ] = f'</v2/charts/hello/tags/list?n={self.page_size}&last={tags[-1]}>; rel="next"'
+            body = {"name": "charts/hello", "tags": tags}
+            self._send(200, json.dumps(body).encode("utf-8"), headers)
+        elif kind == "manifests" and reference in self.tags:
+            self._send(200, self.blobs[self.tags[reference]])
+        elif kind in ["manifests", "blobs"] and reference in self.blobs:
+            self._send(200, self.blobs[reference])
+        else:
+            self._send(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OciTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        RegistryHandler.blobs = {}
+        RegistryHandler.tags = {}
+        RegistryHandler.requests = []
+        for version in ["0.9.0", "1.0.0+build", "1.2.0", "2.0.0-rc.1"]:
+            chart = create_chart("hello", version)
+            manifest = json.dumps(
+                {
+                    "schemaVersion": 2,
+                    "layers": [
+                        {
+                            "mediaType": oci.CHART_LAYER_MEDIA_TYPE,
+                            "digest": get_digest(chart),
+                            "size": len(chart),
+                        }
+                    ],
+                }
+            ).encode("utf-8")
+            RegistryHandler.blobs[get_digest(chart)] = chart
+            RegistryHandler.blobs[get_digest(manifest)] = manifest
+            RegistryHandler.tags[version.replace("+", "_")] = get_digest(manifest)
+
+        self.server = serve(self, RegistryHandler)
+        self.ref = f"oci://127.0.0.1:{self.server.server_port}/charts"
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        oci._tokens.clear()
+
+    def _read_chart(self, folder: str) -> str:
+        with open(os.path.join(folder, "Chart.yaml"), "r") as chart_file:
+            return chart_file.read()
+
+    def test_parse_reference(self):
+        self.assertIsNone(oci.parse_reference("https://charts.example.com"))
+        self.assertEqual(
+            oci.parse_reference("oci://ghcr.io/org/charts", chart="app"),
+            oci.Reference("ghcr.io", "org/charts/app"),
+        )
+        self.assertEqual(
+            oci.parse_reference("oci://localhost:5000/app:1.0.0+1"),
+            oci.Reference("localhost:5000", "app", tag="1.0.0_1"),
+        )
+        reference = oci.parse_reference(f"oci://ghcr.io/app@sha256:{'0' * 64}")
+        self.assertEqual(reference.digest, f"sha256:{'0' * 64}")
+        self.assertEqual(reference.url, "https://ghcr.io/v2/app")
+
+    def test_pull_chart(self):
+        chart = oci.pull_chart(self.ref, chart="hello", version="1.0.0+build")
+        folder = chart.path
+        self.assertEqual(chart.digest, RegistryHandler.tags["1.0.0_build"])
+        self.assertEqual(os.path.basename(folder), "hello")
+        self.assertIn("version: 1.0.0+build", self._read_chart(folder))
+
+        # the chart layer is only downloaded once
+        blob_requests = [path for path in RegistryHandler.requests if "/blobs/" in path]
+        self.assertEqual(len(blob_requests), 1)
+        self.assertEqual(
+            oci.pull_chart(self.ref, chart="hello", version="1.0.0+build").path,
+            folder,
+        )
+        blob_requests = [path for path in RegistryHandler.requests if "/blobs/" in path]
+        self.assertEqual(len(blob_requests), 1)
+
+    def test_pull_latest_chart(self):
+        chart = oci.pull_chart(f"{self.ref}/hello")
+        self.assertEqual(chart.version, "1.2.0")
+        self.assertIn("version: 1.2.0", self._read_chart(chart.path))
+
+    def test_resolve_tag(self):
+        reference = oci.parse_reference(f"{self.ref}/hello")
+        # prereleases are skipped like by helm, all pages of tags are read
+        self.assertEqual(oci.resolve_tag(reference), "1.2.0")
+        self.assertIn(
+            "/v2/charts/hello/tags/list?n=2&last=1.0.0_build", RegistryHandler.requests
+        )
+        self.assertEqual(oci.resolve_tag(reference, devel=True), "2.0.0-rc.1")
+
+        self.assertEqual(oci.resolve_tag(reference, offline=True), "1.2.0")
+        self.assertEqual(
+            oci.resolve_tag(reference, devel=True, offline=True), "2.0.0-rc.1"
+        )
+
+    def test_pull_cached_digest(self):
+        digest = RegistryHandler.tags["0.9.0"]
+        folder = oci.pull_chart(f"{self.ref}/hello@{digest}").path
+        self.assertIn("version: 0.9.0", self._read_chart(folder))
+
+        # manifests referenced by digest are immutable
+        self.server.shutdown()
+        chart = oci.pull_chart(self.ref, chart="hello", version="0.9.0", digest=digest)
+        self.assertEqual(chart.path, folder)
+        self.assertEqual(chart.version, "0.9.0")
+
+    def test_pull_missing_chart(self):
+        with self.assertRaises(oci.OciError):
+            oci.pull_chart(self.ref, chart="hello", version="2.0.0")
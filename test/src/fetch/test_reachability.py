@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from git import Actor, Repo
+
+from conftest import serve_directory
+from getdeck.deckfile.file import ArchiveSource, FileSource, InlineSource
+from getdeck.fetch import http_cache
+from getdeck.fetch.reachability import check_source, check_sources
+
+ACTOR = Actor("deck", "deck@getdeck.dev")
+
+
+class ReachabilityTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.folder, "www"))
+        with open(os.path.join(self.folder, "www", "hello.yaml"), "w") as manifest:
+            manifest.write("kind: ConfigMap\n")
+        with open(os.path.join(self.folder, "local.yaml"), "w") as manifest:
+            manifest.write("kind: ConfigMap\n")
+
+        self.server = serve_directory(self, os.path.join(self.folder, "www"))
+        self.url = self.server.url
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_local(self):
+        self.assertIsNone(check_source(InlineSource(), self.folder))
+        self.assertIsNone(check_source(FileSource(ref="./local.yaml"), self.folder))
+        error = check_source(FileSource(ref="./missing.yaml"), self.folder)
+        self.assertIn("missing.yaml does not exist", error)
+
+    def test_http(self):
+        sources = [
+            FileSource(ref=f"{self.url}/hello.yaml"),
+            FileSource(ref=f"{self.url}/missing.yaml"),
+            ArchiveSource(ref=f"{self.url}/missing.tgz"),
+        ]
+        errors = check_sources(sources, self.folder)
+        self.assertEqual(len(errors), 2)
+        self.assertIn("404", errors[0])
+
+        # offline, the sources have to be in the local cache
+        self.assertIsNotNone(check_source(sources[0], self.folder, offline=True))
+        http_cache.fetch(sources[0].ref)
+        self.assertIsNone(check_source(sources[0], self.folder, offline=True))
+
+    def test_git(self):
+        path = os.path.join(self.folder, "repository")
+        repo = Repo.init(path, initial_branch="main")
+        shutil.copy(os.path.join(self.folder, "local.yaml"), path)
+        repo.git.add(".")
+        repo.index.commit("initial", author=ACTOR, committer=ACTOR)
+        repo.create_tag("v1")
+
+        self.assertIsNone(check_source(FileSource(ref=path), self.folder))
+        remote = f"file://{path}"
+        self.assertIsNone(
+            check_source(FileSource(ref=remote, targetRevision="v1"), self.folder)
+        )
+        self.assertIn(
+            "has no branch or tag v2",
+            check_source(FileSource(ref=f"{remote}#v2"), self.folder),
+        )
+        # commits cannot be looked up remotely, neither by their full nor their short sha
+        sha = repo.head.commit.hexsha
+        for rev in [sha, sha[:7]]:
+            self.assertIsNone(
+                check_source(FileSource(ref=f"{remote}#{rev}"), self.folder)
+            )
+        self.assertIsNotNone(
+            check_source(
+                FileSource(ref=f"file://{self.folder}/missing.git"), self.folder
+            )
+        )
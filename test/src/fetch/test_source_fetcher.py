@@ -1,13 +1,29 @@
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
 from unittest import TestCase
+
+from conftest import serve_directory
 from getdeck.deckfile.file import (
+    ArchiveSource,
+    BundleSource,
     FileSource,
     HelmSource,
     InlineSource,
 )
+from getdeck.fetch import bundle
 from getdeck.fetch.source_fetcher import (
+    Archive,
+    Bundle,
+    FetchError,
     Git,
+    HelmRepository,
     Http,
     Local,
+    Oci,
     SourceFetcher,
     select_source_fetch_behavior,
 )
@@ -32,6 +48,28 @@ class SelectSourceFetchBehaviorTest(TestCase):
         fetch_behavior = select_source_fetch_behavior(source=source)
         self.assertIsInstance(fetch_behavior, Git)
 
+    def test_git_file_source_local(self):
+        source = FileSource(ref="file:///path/to/repository")
+        fetch_behavior = select_source_fetch_behavior(source=source)
+        self.assertIsInstance(fetch_behavior, Git)
+
+    def test_archive_source(self):
+        source = ArchiveSource(ref="https://example.com/manifests-1.0.0.tar.gz")
+        fetch_behavior = select_source_fetch_behavior(source=source)
+        self.assertIsInstance(fetch_behavior, Archive)
+
+    def test_oci_helm_source(self):
+        source = HelmSource(
+            ref="oci://ghcr.io/getdeck/charts", chart="hello", releaseName="test"
+        )
+        fetch_behavior = select_source_fetch_behavior(source=source)
+        self.assertIsInstance(fetch_behavior, Oci)
+
+    def test_bundle_source(self):
+        source = BundleSource(refs=["https://example.com/hello.yaml"])
+        fetch_behavior = select_source_fetch_behavior(source=source)
+        self.assertIsInstance(fetch_behavior, Bundle)
+
     def test_http_file_source(self):
         source = FileSource(
             ref="https://raw.githubusercontent.com/Getdeck/getdeck/main/test/sources/resources/hello.yaml"
@@ -54,14 +92,14 @@ class SelectSourceFetchBehaviorTest(TestCase):
         fetch_behavior = select_source_fetch_behavior(source=source)
         self.assertIsNone(fetch_behavior)
 
-    def test_none_helm_source(self):
+    def test_helm_repository_source(self):
         source = HelmSource(
             ref="https://kubernetes.github.io/dashboard/",
             chart="kubernetes-dashboard",
             releaseName="dashboard",
         )
         fetch_behavior = select_source_fetch_behavior(source=source)
-        self.assertIsNone(fetch_behavior)
+        self.assertIsInstance(fetch_behavior, HelmRepository)
 
 
 class SourceFetcherTest(TestCase):
@@ -74,3 +112,125 @@ class SourceFetcherTest(TestCase):
         fetch_behavior = select_source_fetch_behavior(source=source)
         deck_fetcher = SourceFetcher(fetch_behavior=fetch_behavior)
         source_aux = deck_fetcher.fetch(data=source_aux)
+
+
+class ArchiveTest(TestCase):
+    FILES = {
+        "manifests-1.0.0/deploy/hello.yaml": b"kind: ConfigMap\n",
+        "manifests-1.0.0/deploy/nested/world.yaml": b"kind: Secret\n",
+        "manifests-1.0.0/README.md": b"# manifests\n",
+    }
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        with tarfile.open(os.path.join(self.folder, "manifests.tar.gz"), "w:gz") as tar:
+            for name, content in self.FILES.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+        with zipfile.ZipFile(os.path.join(self.folder, "manifests.zip"), "w") as zip:
+            for name, content in self.FILES.items():
+                zip.writestr(name, content)
+
+        self.server = serve_directory(self, self.folder)
+        self.url = self.server.url
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _fetch(self, name: str, path: str, offline: bool = False) -> SourceAux:
+        source = ArchiveSource(ref=f"{self.url}/{name}", path=path)
+        source_aux = SourceAux(location=source.ref)
+        source_aux.source = source
+        return Archive().fetch(source_aux, offline=offline, **source.dict())
+
+    def test_tar(self):
+        source_aux = self._fetch("manifests.tar.gz", "manifests-1.0.0/deploy/")
+        self.assertIsNone(source_aux.name)
+        self.assertTrue(source_aux.path.endswith("manifests-1.0.0/deploy/"))
+        self.assertTrue(os.path.isfile(os.path.join(source_aux.path, "hello.yaml")))
+        self.assertTrue(
+            os.path.isfile(os.path.join(source_aux.path, "nested", "world.yaml"))
+        )
+        root = source_aux.temporary_data.data
+        self.assertFalse(
+            os.path.isfile(os.path.join(root, "manifests-1.0.0", "README.md"))
+        )
+
+    def test_zip_file(self):
+        source_aux = self._fetch("manifests.zip", "manifests-1.0.0/deploy/hello.yaml")
+        self.assertEqual(source_aux.name, "hello.yaml")
+        with open(os.path.join(source_aux.path, source_aux.name), "rb") as manifest:
+            self.assertEqual(manifest.read(), b"kind: ConfigMap\n")
+
+    def test_missing_path(self):
+        with self.assertRaises(FetchError):
+            _ = self._fetch("manifests.tar.gz", "manifests-2.0.0")
+
+    def test_offline(self):
+        _ = self._fetch("manifests.tar.gz", "manifests-1.0.0/deploy/")
+        self.server.shutdown()
+
+        source_aux = self._fetch(
+            "manifests.tar.gz", "manifests-1.0.0/deploy/hello.yaml", offline=True
+        )
+        with open(os.path.join(source_aux.path, source_aux.name), "rb") as manifest:
+            self.assertEqual(manifest.read(), b"kind: ConfigMap\n")
+        with self.assertRaises(FetchError):
+            _ = self._fetch("manifests.zip", "manifests-1.0.0/deploy/", offline=True)
+
+
+class BundleTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.folder, "www", "deploy"))
+        for name in ["zz", "aa", "mm"]:
+            with open(
+                os.path.join(self.folder, "www", "deploy", f"{name}.yaml"), "w"
+            ) as manifest:
+                manifest.write(f"kind: ConfigMap\nmetadata:\n  name: {name}\n")
+        with open(os.path.join(self.folder, "www", "index.txt"), "w") as index:
+            index.write("# manifests\ndeploy/zz.yaml\ndeploy/aa.yaml\nREADME.md\n")
+
+        self.server = serve_directory(self, os.path.join(self.folder, "www"))
+        self.url = self.server.url
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _fetch(self, source: BundleSource) -> SourceAux:
+        source_aux = SourceAux(location=source.ref)
+        source_aux.source = source
+        return Bundle().fetch(source_aux, **source.dict())
+
+    def test_refs_and_index(self):
+        source = BundleSource(
+            ref=f"{self.url}/index.txt",
+            include="*.yaml",
+            refs=[f"{self.url}/deploy/mm.yaml"],
+        )
+        source_aux = self._fetch(source)
+        self.assertIsNone(source_aux.name)
+        # files are numbered in the order of the urls
+        self.assertEqual(
+            sorted(os.listdir(source_aux.path)),
+            ["0-mm.yaml", "1-zz.yaml", "2-aa.yaml"],
+        )
+
+    def test_file_name(self):
+        urls = [f"{self.url}/deploy/{number}" for number in range(1200)]
+        names = [
+            bundle.get_file_name(number, url, len(str(len(urls))))
+            for number, url in enumerate(urls)
+        ]
+        self.assertEqual(names[101], "0101-101.yaml")
+        self.assertEqual(sorted(names), names)
+
+    def test_missing_manifest(self):
+        source = BundleSource(refs=[f"{self.url}/deploy/missing.yaml"])
+        with self.assertRaises(FetchError):
+            _ = self._fetch(source)
+
+    def test_empty(self):
+        with self.assertRaises(FetchError):
+            _ = self._fetch(BundleSource())
@@ -0,0 +1,69 @@
+import io
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase
+from unittest.mock import patch
+
+from conftest import serve
+from getdeck.fetch import transport
+
+
+CONTENT = b"0123456789" * 100000
+
+
+class InterruptingHandler(BaseHTTPRequestHandler):
+    """
+    drops the connection in the middle of the first response
+    """
+
+    requests = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        self.requests.append(range_header)
+
+        if range_header:
+            offset = int(range_header.removeprefix("bytes=").rstrip("-"))
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {offset}-{len(CONTENT) - 1}/{len(CONTENT)}"
+            )
+            body = CONTENT[offset:]
+        else:
+            self.send_response(200)
+            body = CONTENT
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"deck"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if len(self.requests) == 1:
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TransportTest(TestCase):
+    def setUp(self):
+        InterruptingHandler.requests = []
+        self.server = serve(self, InterruptingHandler)
+        self.url = f"{self.server.url}/chart.tgz"
+
+    def test_session(self):
+        self.assertIs(transport.get_session(), transport.get_session())
+
+    @patch.object(transport, "BACKOFF_FACTOR", 0)
+    def test_resume(self):
+        target = io.BytesIO()
+        with transport.get(self.url) as response:
+            transport.write_response(self.url, response, target)
+
+        self.assertEqual(target.getvalue(), CONTENT)
+        # the second request continues after the last chunk which has been written
+        first, second = InterruptingHandler.requests
+        self.assertIsNone(first)
+        self.assertRegex(second, r"^bytes=[1-9][0-9]*-$")
@@ -1,7 +1,15 @@
+import os
+import shutil
+import tempfile
 from unittest import TestCase
-from getdeck.deckfile.file import InlineSource
+from unittest.mock import patch
+
+from getdeck.deckfile.file import HelmSource, InlineSource, KustomizeSource
 from getdeck.fetch.types import DeckfileAux, SourceAux
+from getdeck.sources.generator import RenderError
+from getdeck.sources.helm import Helm
 from getdeck.sources.inline import Inline
+from getdeck.sources.kustomize import Kustomize
 import itertools
 
 
@@ -27,3 +35,263 @@ class InlineTest(TestCase):
             source_file = source_files[0]
             self.assertEqual(source_file.namespace, namespace or "default")
             self.assertEqual(source_file.content, content)
+
+
+class HelmTest(TestCase):
+    def test_oci_command(self):
+        source = HelmSource(
+            ref="oci://ghcr.io/getdeck/charts",
+            chart="hello",
+            releaseName="hello",
+        )
+        source_aux = SourceAux(location=source.ref, path="/tmp/cache/oci/hello")
+        source_aux.source = source
+
+        render_behavior = Helm(config=None)
+        render_behavior.source = source
+        render_behavior.namespace = "default"
+        render_behavior.k8s_api_version = "1.24"
+
+        self.assertEqual(render_behavior.type, "oci")
+        self.assertEqual(
+            render_behavior.get_cache_path(source_aux), "/tmp/cache/oci/hello"
+        )
+        command = render_behavior.build_command()
+        self.assertEqual(command[:4], ["helm", "template", "hello", "/cache/"])
+        self.assertNotIn("&&", command)
+
+    def test_repository_command(self):
+        source = HelmSource(
+            ref="https://charts.example.com", chart="hello", releaseName="hello"
+        )
+        source_aux = SourceAux(location=source.ref, path="/tmp/cache/charts/hello")
+        source_aux.source = source
+
+        render_behavior = Helm(config=None)
+        render_behavior.source = source
+        render_behavior.namespace = "default"
+        render_behavior.k8s_api_version = "1.24"
+
+        # charts of helm repositories are pulled to the cache by the fetcher as well
+        self.assertEqual(
+            render_behavior.get_cache_path(source_aux), "/tmp/cache/charts/hello"
+        )
+        command = render_behavior.build_command()
+        self.assertEqual(command[:4], ["helm", "template", "hello", "/cache/"])
+        self.assertNotIn("repo", command)
+
+    def test_offline_command(self):
+        source = HelmSource(
+            ref="git@github.com:Getdeck/charts.git",
+            path="hello",
+            releaseName="hello",
+        )
+        render_behavior = Helm(config=None)
+        render_behavior.source = source
+        render_behavior.namespace = "default"
+        render_behavior.k8s_api_version = "1.24"
+        self.assertEqual(render_behavior.build_command()[:3], ["helm", "dep", "up"])
+
+        # dependencies are not updated offline, the vendored charts are used
+        render_behavior.offline = True
+        command = render_behavior.build_command()
+        self.assertEqual(command[:3], ["helm", "template", "hello"])
+
+    def test_chart_dependencies(self):
+        source = HelmSource(
+            ref="git@github.com:Getdeck/charts.git",
+            path="hello",
+            releaseName="hello",
+        )
+        cache = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache)
+        dependency = os.path.join(cache, "0123456789abcdef")
+        os.makedirs(os.path.join(dependency, "world"))
+        with open(os.path.join(dependency, "world", "Chart.yaml"), "w") as chart:
+            chart.write("name: world\n")
+
+        render_behavior = Helm(config=None)
+        render_behavior.source = source
+        render_behavior.namespace = "default"
+        render_behavior.k8s_api_version = "1.24"
+        render_behavior.chart_dependencies = [os.path.join(dependency, "world")]
+
+        # dependencies pulled by the fetcher are vendored instead of updated by helm
+        self.assertEqual(render_behavior.build_command()[:2], ["helm", "template"])
+        render_behavior.prepare_sources()
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(
+                    render_behavior.tmp_source.name,
+                    "hello",
+                    "charts",
+                    "world-0123456789ab",
+                    "Chart.yaml",
+                )
+            )
+        )
+        render_behavior.cleanup()
+
+    def test_render_key(self):
+        source = HelmSource(
+            ref="oci://ghcr.io/getdeck/charts", chart="hello", releaseName="hello"
+        )
+        source_aux = SourceAux(
+            location=source.ref,
+            path="/tmp/cache/oci/hello",
+            lock={"version": "1.0.0", "digest": "sha256:0123"},
+        )
+        source_aux.source = source
+
+        render_behavior = Helm(config=None)
+        render_behavior.source = source
+        render_behavior.namespace = "default"
+        render_behavior.k8s_api_version = "1.24"
+        keys = {render_behavior.get_render_key(source_aux, source_aux.path)}
+
+        # the output changes with the cluster, the values and the chart
+        render_behavior.k8s_api_version = "1.25"
+        keys.add(render_behavior.get_render_key(source_aux, source_aux.path))
+        render_behavior.source = source.copy(
+            update={"parameters": [{"name": "replicas", "value": 2}]}
+        )
+        keys.add(render_behavior.get_render_key(source_aux, source_aux.path))
+        self.assertEqual(len(keys), 3)
+
+        source_aux.lock = {"version": "1.0.1", "digest": "sha256:4567"}
+        self.assertNotIn(
+            render_behavior.get_render_key(source_aux, source_aux.path), keys
+        )
+
+    def test_dependency_update_render_key(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        chart_path = os.path.join(folder, "hello")
+        os.makedirs(chart_path)
+        with open(os.path.join(chart_path, "Chart.yaml"), "w") as chart:
+            chart.write("apiVersion: v2\nname: hello\nversion: 1.0.0\n")
+
+        source = HelmSource(ref="./hello", releaseName="hello")
+        source_aux = SourceAux(location=source.ref, path=chart_path)
+        source_aux.source = source
+        render_behavior = Helm(config=None)
+        render_behavior.source = source
+        render_behavior.namespace = "default"
+        render_behavior.k8s_api_version = "1.24"
+        self.assertIsNotNone(render_behavior.get_render_key(source_aux, chart_path))
+
+        # helm resolves the dependencies within the tooler, the output is not cached
+        with open(os.path.join(chart_path, "Chart.yaml"), "a") as chart:
+            chart.write(
+                "dependencies:\n- name: world\n  version: ^1.0.0\n"
+                "  repository: https://charts.example.com\n"
+            )
+        self.assertIsNone(render_behavior.get_render_key(source_aux, chart_path))
+        render_behavior.offline = True
+        self.assertIsNotNone(render_behavior.get_render_key(source_aux, chart_path))
+
+        # unless the fetcher has pulled them already
+        source = HelmSource(
+            ref="git@github.com:Getdeck/charts.git", path="hello", releaseName="hello"
+        )
+        source_aux = SourceAux(
+            location=source.ref, lock={"revision": "0123", "dependencies": {}}
+        )
+        source_aux.source = source
+        render_behavior.source = source
+        render_behavior.offline = False
+        self.assertIsNone(render_behavior.get_render_key(source_aux, folder))
+        render_behavior.chart_dependencies = []
+        self.assertIsNotNone(render_behavior.get_render_key(source_aux, folder))
+
+
+class KustomizeTest(TestCase):
+    def test_offline_remote_target(self):
+        render_behavior = Kustomize(config=None)
+        render_behavior.source = KustomizeSource(
+            ref="https://github.com/Getdeck/getdeck/test/kustomize"
+        )
+        self.assertIn("kustomize", render_behavior.build_command())
+
+        render_behavior.offline = True
+        with self.assertRaises(RenderError):
+            render_behavior.build_command()
+
+
+class RenderCacheTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+        os.makedirs(os.path.join(self.folder, "overlay"))
+        self._write_kustomization("a")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _write_kustomization(self, name: str, content: str = "", folder="overlay"):
+        path = os.path.join(self.folder, folder, "kustomization.yaml")
+        with open(path, "w") as kustomization:
+            kustomization.write(f"namePrefix: {name}-\n{content}")
+
+    def _render(self, source: KustomizeSource, namespace: str = "default"):
+        renders = []
+
+        def run_tooler(render_behavior, cmd):
+            renders.append(cmd)
+            with open(
+                os.path.join(render_behavior.tmp_output.name, "manifest.yaml"), "w"
+            ) as manifest:
+                manifest.write(f"kind: ConfigMap\nmetadata:\n  name: {len(renders)}\n")
+
+        local = source.ref.startswith(".")
+        source_aux = SourceAux(location=source.ref, path=source.ref if local else None)
+        source_aux.source = source
+        with patch.object(Kustomize, "run_tooler", run_tooler):
+            source_files = Kustomize(config=None).render(
+                deckfile_aux=DeckfileAux(location=".", path=self.folder),
+                source_aux=source_aux,
+                namespace=namespace,
+            )
+        return len(renders), source_files
+
+    def test_cached(self):
+        source = KustomizeSource(ref="./overlay")
+        rendered, source_files = self._render(source)
+        self.assertEqual(rendered, 1)
+        self.assertEqual(source_files[0].content["kind"], "ConfigMap")
+
+        # the tooler does not run again for the same source, files and namespace
+        rendered, cached = self._render(source)
+        self.assertEqual(rendered, 0)
+        self.assertEqual(cached, source_files)
+        self.assertEqual(self._render(source, namespace="other")[0], 1)
+
+        self._write_kustomization("b")
+        self.assertEqual(self._render(source)[0], 1)
+        self.assertEqual(self._render(KustomizeSource(ref="./overlay/"))[0], 1)
+
+    def test_remote_resources(self):
+        source = KustomizeSource(ref="./overlay")
+        os.makedirs(os.path.join(self.folder, "overlay", "base"))
+        self._write_kustomization("base", folder="overlay/base")
+        self._write_kustomization("a", "resources:\n- base\n")
+        self.assertEqual(self._render(source)[0], 1)
+        self.assertEqual(self._render(source)[0], 0)
+
+        # kustomize fetches remote resources itself, also those of included kustomizations
+        for content in [
+            "resources:\n- https://example.com/manifests.yaml\n",
+            "bases:\n- github.com/Getdeck/getdeck/test/kustomize?ref=main\n",
+            "components:\n- ../../component\n",
+        ]:
+            self._write_kustomization("base", content, folder="overlay/base")
+            self.assertEqual(self._render(source)[0], 1)
+            self.assertEqual(self._render(source)[0], 1)
+
+    def test_not_cached(self):
+        # kustomize fetches remote targets itself
+        source = KustomizeSource(
+            ref="https://github.com/Getdeck/getdeck/test/kustomize"
+        )
+        self.assertEqual(self._render(source)[0], 1)
+        self.assertEqual(self._render(source)[0], 1)
@@ -0,0 +1,142 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from getdeck import cache
+
+
+class CacheTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _add_entry(self, region: cache.Cache, name: str, size: int, age: int) -> str:
+        path = region.get_path(name)
+        with open(path, "wb") as entry:
+            entry.write(b"0" * size)
+        last_used = time.time() - age
+        os.utime(path, (last_used, last_used))
+        return path
+
+    def test_parse_size(self):
+        self.assertEqual(cache.parse_size("1024"), 1024)
+        self.assertEqual(cache.parse_size("500M"), 500 * 1024**2)
+        self.assertEqual(cache.parse_size("10GiB"), 10 * 1024**3)
+        with self.assertRaises(ValueError):
+            cache.parse_size("ten")
+
+    def test_atomic_write(self):
+        path = os.path.join(self.folder, "cache", "file")
+        with cache.atomic_write(path, "w") as output:
+            output.write("hello")
+        with open(path, "r") as output:
+            self.assertEqual(output.read(), "hello")
+
+        # an interrupted write leaves the file as it was
+        with self.assertRaises(RuntimeError):
+            with cache.atomic_write(path, "w") as output:
+                output.write("world")
+                raise RuntimeError()
+        with open(path, "r") as output:
+            self.assertEqual(output.read(), "hello")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["file"])
+
+    def test_lock(self):
+        lock = cache.get_lock("test")
+        self.assertIs(lock, cache.get_lock("test"))
+        with lock:
+            # re-entrant within a thread
+            self.assertTrue(lock.acquire(blocking=False))
+            lock.release()
+
+            acquired = []
+            thread = threading.Thread(
+                target=lambda: acquired.append(lock.acquire(blocking=False))
+            )
+            thread.start()
+            thread.join()
+            self.assertEqual(acquired, [False])
+
+            # other processes are locked out as well
+            script = (
+                "import fcntl, sys\n"
+                "try:\n"
+                f"    fcntl.flock(open({lock.path!r}, 'a+b'), fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+                "except OSError:\n"
+                "    sys.exit(1)\n"
+            )
+            if sys.platform != "win32":
+                self.assertEqual(
+                    subprocess.run([sys.executable, "-c", script]).returncode, 1
+                )
+        self.assertTrue(lock.acquire(blocking=False))
+        lock.release()
+
+    def test_prune(self):
+        oldest = self._add_entry(cache.http, "a" * 64, 100, age=7200)
+        older = self._add_entry(cache.charts, "b" * 64, 100, age=3900)
+        recent = self._add_entry(cache.http, "c" * 64, 100, age=60)
+        self.assertEqual(
+            [entry.path for entry in cache.get_entries()], [oldest, older, recent]
+        )
+
+        # least recently used entries are evicted first
+        evicted = cache.prune(max_size=200)
+        self.assertEqual([entry.path for entry in evicted], [oldest])
+        self.assertFalse(os.path.exists(oldest))
+
+        # entries which are locked by another run or used recently are kept
+        locked, done = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with cache.charts.lock("b" * 64):
+                locked.set()
+                done.wait()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+        self.assertEqual(cache.prune(max_size=0), [])
+        done.set()
+        thread.join()
+        self.assertTrue(os.path.exists(older))
+        self.assertEqual(len(cache.prune(max_size=0)), 1)
+        self.assertTrue(os.path.exists(recent))
+        self.assertEqual(len(cache.prune(max_size=0, grace_period=0)), 1)
+        self.assertEqual(cache.get_entries(), [])
+
+    def test_prune_periodically(self):
+        self._add_entry(cache.http, "a" * 64, 100, age=7200)
+        self.assertEqual(len(cache.prune_periodically()), 0)
+        self.assertEqual(len(cache.get_entries()), 1)
+
+        # the entries are only read again once the interval is over
+        self.assertEqual(cache.prune_periodically(), [])
+        with patch.object(cache, "prune", return_value=[]) as prune:
+            self.assertEqual(cache.prune_periodically(), [])
+            prune.assert_not_called()
+            cache.prune_periodically(interval=0)
+            prune.assert_called_once()
+
+    def test_statistics(self):
+        # start without the counts of other tests
+        cache.save_statistics()
+        cache.reset_statistics()
+        cache.http.hit()
+        cache.http.hit()
+        cache.http.miss()
+        cache.save_statistics()
+        cache.http.miss()
+        cache.save_statistics()
+        self.assertEqual(cache.read_statistics()["http"], {"hits": 2, "misses": 2})
+
+        cache.reset_statistics()
+        self.assertEqual(cache.read_statistics(), {})
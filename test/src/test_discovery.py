@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from getdeck import discovery
+from getdeck.discovery import find_deckfiles, is_ignored, parse_gitignore, GitIgnore
+
+
+class GitIgnoreTest(TestCase):
+    def _is_ignored(self, lines: list, path: str, is_dir: bool = False) -> bool:
+        return is_ignored([GitIgnore("", parse_gitignore(tuple(lines)))], path, is_dir)
+
+    def test_patterns(self):
+        self.assertTrue(self._is_ignored(["build"], "a/b/build", is_dir=True))
+        self.assertTrue(self._is_ignored(["/build"], "build", is_dir=True))
+        self.assertFalse(self._is_ignored(["/build"], "a/build", is_dir=True))
+        self.assertTrue(self._is_ignored(["out/"], "out", is_dir=True))
+        self.assertFalse(self._is_ignored(["out/"], "out"))
+        self.assertTrue(self._is_ignored(["*.yml", "!deck.yml"], "a/b.yml"))
+        self.assertFalse(self._is_ignored(["*.yml", "!deck.yml"], "a/deck.yml"))
+        self.assertTrue(self._is_ignored(["a/**/c"], "a/b/b/c", is_dir=True))
+        self.assertTrue(self._is_ignored(["dist-[0-9]"], "dist-1", is_dir=True))
+        self.assertFalse(self._is_ignored(["# build", ""], "# build", is_dir=True))
+
+        # the rules of a .gitignore file are relative to its folder
+        gitignores = [
+            GitIgnore("", parse_gitignore(("/vendor",))),
+            GitIgnore("services/a", parse_gitignore(("/vendor",))),
+        ]
+        self.assertTrue(is_ignored(gitignores, "services/a/vendor", is_dir=True))
+        self.assertFalse(is_ignored(gitignores, "services/b/vendor", is_dir=True))
+
+
+class DiscoveryTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.racy_period = patch.object(discovery, "RACY_PERIOD", 0)
+        self.racy_period.start()
+
+        self.root = os.path.join(self.folder, "repo")
+        for path in [
+            "deck.yaml",
+            "services/a/deck.yaml",
+            "services/b/deck.yml",
+            "services/b/deck.yaml",
+            "services/c/node_modules/d/deck.yaml",
+            "services/c/build/deck.yaml",
+            ".git/deck.yaml",
+        ]:
+            self._write(path)
+        self._write(".gitignore", "node_modules/\n")
+        self._write("services/c/.gitignore", "/build\n")
+
+    def tearDown(self):
+        self.racy_period.stop()
+        shutil.rmtree(self.folder)
+
+    def _write(self, path: str, content: str = "version: '1'\n"):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as output:
+            output.write(content)
+
+    def test_find_deckfiles(self):
+        expected = ["deck.yaml", "services/a/deck.yaml", "services/b/deck.yaml"]
+        self.assertEqual(find_deckfiles(self.root), expected)
+
+        # unchanged folders are taken from the index
+        with patch("os.scandir", side_effect=AssertionError):
+            self.assertEqual(find_deckfiles(self.root, workers=1), expected)
+
+        self._write("services/d/deck.yaml")
+        self._write(".gitignore", "node_modules/\nservices/a\n")
+        self.assertEqual(
+            find_deckfiles(self.root),
+            ["deck.yaml", "services/b/deck.yaml", "services/d/deck.yaml"],
+        )
+        # the .gitignore files of the repository apply to its subfolders, too
+        self.assertEqual(find_deckfiles(os.path.join(self.root, "services", "c")), [])
+
+    def test_racy(self):
+        with patch.object(discovery, "RACY_PERIOD", 3600):
+            find_deckfiles(self.root)
+        # folders modified right before the previous scan are scanned again
+        with patch("os.scandir", wraps=os.scandir) as scandir:
+            find_deckfiles(self.root)
+            self.assertGreater(scandir.call_count, 0)
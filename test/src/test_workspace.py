@@ -0,0 +1,96 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from getdeck import configuration, workspace
+from getdeck.cache import FileLock
+from getdeck.fetch.types import DataAux, DeckfileAux, SourceAux, TemporaryData
+
+
+class WorkspaceTest(TestCase):
+    def setUp(self):
+        self.folder = configuration.WORKDIR
+        os.makedirs(self.folder)
+
+    def _add_stale_workspace(self, age: int = 3600) -> str:
+        path = tempfile.mkdtemp(dir=self.folder, prefix=workspace.WORKSPACE_PREFIX)
+        with open(os.path.join(path, "file"), "w") as stale_file:
+            stale_file.write("stale")
+        with open(f"{path}.lock", "w"):
+            pass
+        last_used = time.time() - age
+        os.utime(path, (last_used, last_used))
+        return path
+
+    def test_workspace(self):
+        run = workspace.get_workspace()
+        self.assertIs(run, workspace.get_workspace())
+        self.assertEqual(os.path.dirname(run.path), self.folder)
+
+        folder = run.mkdtemp(prefix="checkout-")
+        self.assertTrue(folder.startswith(run.path))
+        with run.named_temporary_file() as temporary_file:
+            temporary_file.write(b"hello")
+        run.remove(folder)
+
+        workspace.close_workspace()
+        self.assertFalse(os.path.exists(folder))
+        self.assertFalse(os.path.exists(temporary_file.name))
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_reclaim(self):
+        stale = self._add_stale_workspace()
+        recent = self._add_stale_workspace(age=0)
+        alive = self._add_stale_workspace()
+        lock = FileLock(f"{alive}.lock")
+        lock.acquire()
+        try:
+            reclaimed = workspace.reclaim_stale_workspaces(self.folder)
+        finally:
+            lock.release()
+
+        self.assertEqual(reclaimed, [stale])
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(f"{stale}.lock"))
+        self.assertTrue(os.path.exists(recent))
+        self.assertTrue(os.path.exists(alive))
+
+    def test_reclaim_on_start(self):
+        stale = self._add_stale_workspace()
+        run = workspace.get_workspace()
+        workspace.close_workspace()
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(run.path))
+
+    def test_other_thread(self):
+        # the workspace is created by the threads fetching the sources and closed at exit
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            run = executor.submit(workspace.get_workspace).result()
+        self.assertFalse(FileLock(f"{run.path}.lock").acquire(blocking=False))
+        workspace.close_workspace()
+        self.assertFalse(os.path.exists(run.path))
+        self.assertFalse(os.path.exists(f"{run.path}.lock"))
+
+    def test_data_aux(self):
+        run = workspace.get_workspace()
+        deckfile_folder = run.mkdtemp()
+        source_folder = run.mkdtemp()
+        with DataAux() as data_aux:
+            data_aux.deckfile_aux = DeckfileAux(
+                location="test",
+                temporary_data=TemporaryData(data=deckfile_folder, is_folder=True),
+            )
+            data_aux.source_auxs = [
+                SourceAux(
+                    temporary_data=TemporaryData(data=source_folder, is_folder=True)
+                )
+            ]
+
+        self.assertIsNone(data_aux.deckfile_aux.temporary_data)
+        self.assertIsNone(data_aux.source_auxs[0].temporary_data)
+        # the folders are removed in the background
+        workspace.close_workspace()
+        self.assertFalse(os.path.exists(deckfile_folder))
+        self.assertFalse(os.path.exists(source_folder))
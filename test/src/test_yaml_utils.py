@@ -0,0 +1,25 @@
+import io
+from unittest import TestCase
+
+from getdeck import yaml_utils
+
+
+class YamlUtilsTest(TestCase):
+    def test_load(self):
+        self.assertEqual(yaml_utils.load("version: '1'\n"), {"version": "1"})
+        self.assertEqual(
+            list(yaml_utils.load_all(io.StringIO("kind: A\n---\n---\nkind: B\n"))),
+            [{"kind": "A"}, None, {"kind": "B"}],
+        )
+        with self.assertRaises(yaml_utils.YAMLError):
+            yaml_utils.load("kind: [A\n")
+        # only plain YAML is loaded, no Python objects
+        with self.assertRaises(yaml_utils.YAMLError):
+            yaml_utils.load("!!python/object/apply:os.getcwd []\n")
+
+    def test_dump(self):
+        data = {"sources": {"b": [1, 2]}, "version": "1"}
+        output = io.StringIO()
+        yaml_utils.dump(data, output, sort_keys=True)
+        self.assertEqual(yaml_utils.load(output.getvalue()), data)
+        self.assertEqual(yaml_utils.dump({"a": 1}), "a: 1\n")